@@ -1,10 +1,93 @@
 from django.contrib import admin
-from .models import CustomUser
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from coreapp.paginators import EstimatedCountPaginator
+
+from .exporters import CONTENT_TYPES, export_users
+from .models import AuthEvent, CustomUser, OutboundEmail, SocialIdentity, UserSession
+
+
+class SocialIdentityInline(admin.TabularInline):
+    model = SocialIdentity
+    extra = 0
+    readonly_fields = ("social_type", "provider_user_id", "created_at")
+    can_delete = True
 
 
 @admin.register(CustomUser)
 class CustomUserAdmin(admin.ModelAdmin):
+    """
+    회원 수가 많을 때를 위한 설정
+
+    - 검색은 접두어(^) 검색이라 username / email 인덱스를 사용한다. (icontains 는 전체 스캔)
+    - list_filter 조합은 CustomUser.Meta.indexes 의 user_admin_* 인덱스로 처리한다.
+    - 페이지 수는 EstimatedCountPaginator 로 추정하고, 전체 건수 COUNT(*) 는 따로 하지 않는다.
+    - 내보내기 action 은 선택한 회원을 keyset pagination 으로 읽어서 StreamingHttpResponse 로 보낸다.
+    """
+
     list_display = ("username", "email", "social_type")
     list_filter = ("social_type", "is_active", "email_is_verified", "is_superuser")
-    search_fields = ("username", "email")
+    search_fields = ("^email", "^username")
+    search_help_text = "Search by the beginning of an email or username."
     exclude = ("password",)
+    inlines = (SocialIdentityInline,)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ("export_csv", "export_jsonl", "logout_everywhere")
+
+    @admin.action(description="Export selected users as CSV")
+    def export_csv(self, request, queryset):
+        return self.export_response(queryset, "csv")
+
+    @admin.action(description="Export selected users as JSONL")
+    def export_jsonl(self, request, queryset):
+        return self.export_response(queryset, "jsonl")
+
+    @admin.action(description="Log out selected users everywhere")
+    def logout_everywhere(self, request, queryset):
+        revoked = sum(UserSession.objects.revoke(user) for user in queryset.only("pk"))
+        self.message_user(request, f"Revoked {revoked} sessions.")
+
+    @staticmethod
+    def export_response(queryset, fmt):
+        response = StreamingHttpResponse(export_users(queryset, fmt), content_type=CONTENT_TYPES[fmt])
+        filename = f"users-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+@admin.register(SocialIdentity)
+class SocialIdentityAdmin(admin.ModelAdmin):
+    list_display = ("social_type", "provider_user_id", "user", "created_at")
+    list_filter = ("social_type",)
+    search_fields = ("provider_user_id", "user__email")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    readonly_fields = ("created_at",)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "sent_at", "last_error")
+
+
+@admin.register(AuthEvent)
+class AuthEventAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "event", "email", "user_id", "ip", "social_type")
+    list_filter = ("event",)
+    search_fields = ("^email",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # append-only 감사 로그
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in
+
+        from . import signals  # noqa: F401
+        from .last_login import defer_last_login
+
+        # 로그인할 때마다 하던 last_login UPDATE 를 LastLoginBuffer 로 모아서 반영한다.
+        user_logged_in.disconnect(dispatch_uid="update_last_login")
+        user_logged_in.connect(defer_last_login, dispatch_uid="defer_last_login")
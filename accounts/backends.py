@@ -0,0 +1,84 @@
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+from .cache import user_cache
+from .models import CustomUser
+
+
+class EmailBackend(ModelBackend):
+    """
+    이메일 기반 인증 백엔드
+
+    - email(USERNAME_FIELD) 의 unique 인덱스로 한 번만 조회하고, 비밀번호 해시도 한 번만 검증한다.
+    - admin 로그인처럼 username 으로 넘어오는 경우도 email 로 취급한다.
+    """
+
+    def authenticate(self, request, email=None, password=None, username=None, **kwargs):
+        email = email or username
+
+        if email is None or password is None:
+            return None
+
+        user = self.get_user_by_email(email)
+
+        if user is None:
+            # 존재하지 않는 이메일도 해시 한 번을 수행해서 응답 시간 차이를 줄인다.
+            hashing.make_password(password)
+            return None
+
+        if hashing.check_password(user, password) and self.user_can_authenticate(user):
+            return user
+
+        return None
+
+    async def aauthenticate(self, request, email=None, password=None, username=None, **kwargs):
+        email = email or username
+
+        if email is None or password is None:
+            return None
+
+        user = await self.aget_user_by_email(email)
+
+        if user is None:
+            await hashing.amake_password(password)
+            return None
+
+        if await hashing.acheck_password(user, password) and self.user_can_authenticate(user):
+            return user
+
+        return None
+
+    @staticmethod
+    def get_user_by_email(email):
+        return CustomUser.objects.get_by_email(email)
+
+    @staticmethod
+    async def aget_user_by_email(email):
+        return await CustomUser.objects.aget_by_email(email)
+
+    def get_user(self, user_id):
+        user = user_cache.get(user_id, self.load_user)
+
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    @staticmethod
+    def load_user(user_id):
+        try:
+            return CustomUser.objects.get(pk=user_id)
+
+        except CustomUser.DoesNotExist:
+            return None
+
+    # request.auser() (async 뷰) 도 같은 user_cache 를 거치도록 ModelBackend.aget_user 를 덮어쓴다.
+    async def aget_user(self, user_id):
+        user = await user_cache.aget(user_id, self.aload_user)
+
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    @staticmethod
+    async def aload_user(user_id):
+        try:
+            return await CustomUser.objects.aget(pk=user_id)
+
+        except CustomUser.DoesNotExist:
+            return None
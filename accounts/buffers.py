@@ -0,0 +1,80 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlushMixin:
+    """
+    메모리에 모아둔 쓰기를 flush_interval 초마다 반영하는 버퍼의 공통 부분 (LastLoginBuffer, AuthEventLog)
+
+    - flush_if_due() 는 마지막 flush 후 flush_interval 초가 지났을 때만 flush 한다. (request_finished 에서 호출)
+    - start() 한 프로세스에서는 요청이 없어도 백그라운드 스레드가 flush_if_due() 를 호출한다.
+      fork 이후에도 동작하도록 스레드는 각 프로세스의 첫 쓰기(maybe_start_thread)에서 띄운다.
+    - 프로세스가 정상 종료될 때(atexit) 남은 값을 flush 한다.
+
+    하위 클래스는 flush_interval, _lock 을 갖고 __len__() 과 flush() 를 구현한다.
+    """
+
+    flush_name = "buffer"
+
+    def init_flushing(self):
+        self._last_flush = time.monotonic()
+        self._autostart = False
+        self._thread_pid = None
+
+        atexit.register(self._flush_at_exit)
+
+    def mark_flushed(self):
+        self._last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        if len(self) and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def start(self):
+        """
+        서버 프로세스에서 호출한다. (coreapp.wsgi, coreapp.asgi)
+        """
+        self._autostart = True
+
+    def maybe_start_thread(self):
+        if not self._autostart or self._thread_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+
+            self._thread_pid = os.getpid()
+
+        threading.Thread(target=self._run, name=f"{self.flush_name}-flusher", daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+
+            try:
+                self.flush_if_due()
+
+            except Exception:
+                logger.exception("Failed to flush %s", self.flush_name)
+
+            finally:
+                # 이 스레드의 DB 연결은 요청 주기와 상관없으므로 매번 닫는다.
+                connection.close()
+
+    def _flush_at_exit(self):
+        if not len(self):
+            return
+
+        try:
+            self.flush()
+
+        except Exception:
+            logger.exception("Failed to flush %s at exit", self.flush_name)
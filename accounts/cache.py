@@ -0,0 +1,169 @@
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+
+
+class UserCache:
+    """
+    request.user 조회용 CustomUser 캐시 (user id + version)
+
+    - 한 번의 get_many 로 사용자와 version 을 같이 읽고, version 이 같을 때만 hit 으로 본다.
+    - CustomUser 가 저장/삭제되면 invalidate() 로 version 을 올려서 이전 값을 버린다.
+    - hit/miss 는 프로세스 안에서 세다가 stats_flush_every 번마다 공유 cache 카운터에 더한다.
+    - 비밀번호 해시는 공유 cache 에 넣지 않는다. password 를 뺀 필드와 세션 검증용 session auth hash 만 넣고,
+      꺼낸 사용자의 password 는 지연 필드라서 비밀번호를 확인할 때만 DB 에서 다시 읽는다.
+    """
+
+    prefix = "user-cache"
+
+    def __init__(self, timeout=300, stats_flush_every=100):
+        self.timeout = timeout
+        self.stats_flush_every = stats_flush_every
+
+        self.hits = 0
+        self.misses = 0
+        self._pending_hits = 0
+        self._pending_misses = 0
+        self._lock = threading.Lock()
+
+    def data_key(self, user_id):
+        return f"{self.prefix}:fields:{user_id}"
+
+    def version_key(self, user_id):
+        return f"{self.prefix}:version:{user_id}"
+
+    def get(self, user_id, loader):
+        data_key = self.data_key(user_id)
+        version_key = self.version_key(user_id)
+
+        cached = cache.get_many([data_key, version_key])
+        version = cached.get(version_key, 0)
+        entry = cached.get(data_key)
+
+        if entry is not None and entry[0] == version:
+            self.record(hit=True)
+            return self.restore(entry[1])
+
+        self.record(hit=False)
+        user = loader(user_id)
+
+        if user is not None:
+            cache.set(data_key, (version, self.dump(user)), self.timeout)
+
+        return user
+
+    async def aget(self, user_id, aloader):
+        data_key = self.data_key(user_id)
+        version_key = self.version_key(user_id)
+
+        cached = await cache.aget_many([data_key, version_key])
+        version = cached.get(version_key, 0)
+        entry = cached.get(data_key)
+
+        if entry is not None and entry[0] == version:
+            await self.arecord(hit=True)
+            return self.restore(entry[1])
+
+        await self.arecord(hit=False)
+        user = await aloader(user_id)
+
+        if user is not None:
+            await cache.aset(data_key, (version, self.dump(user)), self.timeout)
+
+        return user
+
+    @staticmethod
+    def dump(user):
+        fields = {field.attname: getattr(user, field.attname) for field in user._meta.concrete_fields}
+        del fields["password"]
+
+        return fields, user.get_session_auth_hash()
+
+    @staticmethod
+    def restore(data):
+        fields, session_auth_hash = data
+        model = apps.get_model(settings.AUTH_USER_MODEL)
+
+        # from_db 는 빠진 필드(password)를 지연 필드로 만든다.
+        user = model.from_db(router.db_for_read(model), list(fields), list(fields.values()))
+        user._session_auth_hash = session_auth_hash
+
+        return user
+
+    def invalidate(self, user_id):
+        cache.delete(self.data_key(user_id))
+
+        version_key = self.version_key(user_id)
+        try:
+            cache.incr(version_key)
+
+        except ValueError:
+            cache.set(version_key, 1, None)
+
+    def record(self, hit):
+        pending = self.count(hit)
+
+        if pending is not None:
+            self.flush_stats(pending)
+
+    async def arecord(self, hit):
+        pending = self.count(hit)
+
+        if pending is not None:
+            await self.aflush_stats(pending)
+
+    def count(self, hit):
+        """
+        프로세스 카운터를 올리고, 공유 cache 에 더할 차례가 되면 그 값을 돌려준다.
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self._pending_hits += 1
+            else:
+                self.misses += 1
+                self._pending_misses += 1
+
+            if self._pending_hits + self._pending_misses < self.stats_flush_every:
+                return None
+
+            pending = {"hits": self._pending_hits, "misses": self._pending_misses}
+            self._pending_hits = self._pending_misses = 0
+
+        return pending
+
+    def flush_stats(self, pending):
+        for name, delta in pending.items():
+            if not delta:
+                continue
+
+            key = f"{self.prefix}:stats:{name}"
+            if not cache.add(key, delta, None):
+                cache.incr(key, delta)
+
+    async def aflush_stats(self, pending):
+        for name, delta in pending.items():
+            if not delta:
+                continue
+
+            key = f"{self.prefix}:stats:{name}"
+            if not await cache.aadd(key, delta, None):
+                await cache.aincr(key, delta)
+
+    def stats(self):
+        keys = {name: f"{self.prefix}:stats:{name}" for name in ("hits", "misses")}
+        shared = cache.get_many(keys.values())
+
+        return {
+            "process": {"hits": self.hits, "misses": self.misses},
+            "shared": {name: shared.get(key, 0) for name, key in keys.items()},
+        }
+
+
+user_cache = UserCache(
+    timeout=getattr(settings, "USER_CACHE_TIMEOUT", 300),
+    stats_flush_every=getattr(settings, "USER_CACHE_STATS_FLUSH_EVERY", 100),
+)
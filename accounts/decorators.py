@@ -0,0 +1,119 @@
+import json
+from functools import wraps
+
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import (
+    APIException,
+    AuthenticationFailed,
+    NotAuthenticated,
+    ParseError,
+    PermissionDenied,
+    Throttled,
+)
+
+
+def async_api_view(methods, permission_classes=(), throttle_classes=()):
+    """
+    @api_view + @permission_classes + @throttle_classes 의 async 버전 (ASGI 용)
+
+    DRF 의 APIView 는 동기 dispatch 라서 ASGI 에서도 요청마다 스레드를 점유한다.
+    이 데코레이터는 DRF 가 해주던 일을 이벤트 루프 위에서 그대로 한다.
+
+    - request.user 를 await request.auser() 로 채운다. (세션/사용자 조회는 async)
+    - 세션으로 인증된 요청만 CSRF 를 검사한다. (SessionAuthentication 과 같음)
+    - permission_classes 를 ahas_permission 으로 확인하고, 실패 응답도 DRF 와 같은 형식으로 돌려준다.
+    - JSON / form 본문을 request.data 로 넘긴다.
+    - throttle_classes 를 aallow_request 로 확인하고, 거절하면 Retry-After 헤더와 함께 429 로 응답한다.
+    """
+
+    methods = [method.upper() for method in methods]
+
+    def decorator(func):
+        @csrf_exempt
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+
+            try:
+                request.user = await request.auser()
+
+                if request.user.is_authenticated:
+                    SessionAuthentication().enforce_csrf(request)
+
+                await check_permissions(request, permission_classes)
+
+                request.data = parse_body(request)
+
+                await check_throttles(request, throttle_classes)
+
+                return await func(request, *args, **kwargs)
+
+            except APIException as e:
+                return error_response(e)
+
+        return view
+
+    return decorator
+
+
+async def check_permissions(request, permission_classes):
+    for permission in (permission_class() for permission_class in permission_classes):
+        if hasattr(permission, "ahas_permission"):
+            allowed = await permission.ahas_permission(request, None)
+        else:
+            allowed = permission.has_permission(request, None)
+
+        if not allowed:
+            # DRF 와 마찬가지로 인증되지 않은 요청은 NotAuthenticated 로 응답한다.
+            if not request.user.is_authenticated:
+                raise NotAuthenticated()
+
+            raise PermissionDenied(getattr(permission, "message", None))
+
+
+async def check_throttles(request, throttle_classes):
+    # DRF APIView.check_throttles 와 같이 모든 throttle 을 확인하고 가장 긴 대기 시간으로 응답한다.
+    waits = []
+
+    for throttle in (throttle_class() for throttle_class in throttle_classes):
+        if hasattr(throttle, "aallow_request"):
+            allowed = await throttle.aallow_request(request, None)
+        else:
+            allowed = throttle.allow_request(request, None)
+
+        if not allowed:
+            waits.append(throttle.wait())
+
+    if waits:
+        waits = [wait for wait in waits if wait is not None]
+        raise Throttled(max(waits, default=None))
+
+
+def parse_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+
+        except ValueError as e:
+            raise ParseError(f"JSON parse error - {e}")
+
+    return request.POST
+
+
+def error_response(exc):
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        # SessionAuthentication 은 WWW-Authenticate 헤더가 없으므로 DRF 와 같이 403 으로 응답한다.
+        exc.status_code = status.HTTP_403_FORBIDDEN
+
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+    response = JsonResponse(data, status=exc.status_code or status.HTTP_400_BAD_REQUEST, safe=False)
+
+    if isinstance(exc, Throttled) and exc.wait is not None:
+        response["Retry-After"] = "%d" % exc.wait
+
+    return response
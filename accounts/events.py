@@ -0,0 +1,235 @@
+import glob
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .buffers import PeriodicFlushMixin
+
+logger = logging.getLogger(__name__)
+
+# (event, user_id, email, ip, social_type, created_at)
+FIELDS = ("event", "user_id", "email", "ip", "social_type", "created_at")
+
+
+def client_ip(request):
+    if request is None:
+        return None
+
+    return request.META.get("REMOTE_ADDR") or None
+
+
+class DatabaseSink:
+    """
+    AuthEvent 테이블에 batch_size 개씩 bulk INSERT 한다.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+
+    def write(self, records):
+        from .models import AuthEvent
+
+        AuthEvent.objects.bulk_create(
+            [AuthEvent(**dict(zip(FIELDS, record))) for record in records], batch_size=self.batch_size
+        )
+
+    def query(self, event=None, user_id=None, email=None, since=None, until=None, chunk_size=2000):
+        from .models import AuthEvent
+
+        queryset = AuthEvent.objects.order_by("pk")
+        if event:
+            queryset = queryset.filter(event=event)
+        if user_id is not None:
+            queryset = queryset.filter(user_id=user_id)
+        if email:
+            queryset = queryset.filter(email=email)
+        if since:
+            queryset = queryset.filter(created_at__gte=since)
+        if until:
+            queryset = queryset.filter(created_at__lt=until)
+
+        queryset = queryset.values("pk", *FIELDS)
+        last_pk = 0
+
+        # export_users 와 같이 pk keyset pagination 으로 chunk 씩 읽는다.
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                return
+
+            last_pk = chunk[-1]["pk"]
+
+            for row in chunk:
+                row.pop("pk")
+                yield row
+
+
+class JsonlSegmentSink:
+    """
+    directory 아래 JSONL segment 파일에 이어서 쓴다. 파일이 max_bytes 를 넘으면 새 segment 로 넘어간다.
+
+    segment 이름은 만든 시각(UTC)과 pid 라서 이름 순서가 시간 순서다. 오래된 segment 는 그대로 지우거나 옮기면 된다.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._path = None
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.directory, "auth-events-*.jsonl")))
+
+    def current_path(self):
+        if self._path is None or not os.path.exists(self._path) or os.path.getsize(self._path) >= self.max_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"auth-events-{timezone.now():%Y%m%dT%H%M%S%f}-{os.getpid()}.jsonl"
+            self._path = os.path.join(self.directory, name)
+
+        return self._path
+
+    def write(self, records):
+        lines = []
+        for record in records:
+            row = dict(zip(FIELDS, record))
+            row["created_at"] = row["created_at"].isoformat()
+            lines.append(json.dumps(row, ensure_ascii=False) + "\n")
+
+        with open(self.current_path(), "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    def query(self, event=None, user_id=None, email=None, since=None, until=None, chunk_size=None):
+        for path in self.segments():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    row = json.loads(line)
+                    created_at = datetime.fromisoformat(row["created_at"])
+
+                    if event and row["event"] != event:
+                        continue
+                    if user_id is not None and row["user_id"] != user_id:
+                        continue
+                    if email and row["email"] != email:
+                        continue
+                    if since and created_at < since:
+                        continue
+                    if until and created_at >= until:
+                        continue
+
+                    row["created_at"] = created_at
+                    yield row
+
+
+class AuthEventLog(PeriodicFlushMixin):
+    """
+    인증 이벤트 로그 (로그인, 로그인 실패, 가입, 활성화, 비밀번호 변경)
+
+    - record() 는 튜플 하나를 ring buffer(deque) 에 넣기만 하므로 요청 안에서 DB 쓰기가 없다.
+    - flush_interval 초마다 (PeriodicFlushMixin) 또는 batch_size 개가 쌓이면 sink 에 한 번에 쓴다.
+      sink 는 DatabaseSink(AuthEvent bulk INSERT) 또는 JsonlSegmentSink(JSONL segment 파일) 이다.
+    - sink 가 느리거나 실패해서 capacity 를 넘으면 가장 오래된 이벤트부터 버리고 dropped 로 센다.
+      (감사 로그 때문에 로그인이 느려지거나 메모리가 늘어나지 않도록)
+    """
+
+    flush_name = "auth_events"
+
+    def __init__(self, sink, capacity=10000, flush_interval=2, batch_size=500):
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.dropped = 0
+        self._buffer = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.init_flushing()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, "AUTH_EVENT_LOG", {})
+
+        if config.get("SINK", "db") == "jsonl":
+            sink = JsonlSegmentSink(config["SEGMENT_DIR"], config.get("SEGMENT_MAX_BYTES", 64 * 1024 * 1024))
+        else:
+            sink = DatabaseSink(config.get("BATCH_SIZE", 500))
+
+        return cls(
+            sink,
+            capacity=config.get("CAPACITY", 10000),
+            flush_interval=config.get("FLUSH_INTERVAL", 2),
+            batch_size=config.get("BATCH_SIZE", 500),
+        )
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def record(self, event, request=None, user=None, email="", social_type=""):
+        if self.append(event, request, user, email, social_type):
+            self.flush()
+
+    async def arecord(self, event, request=None, user=None, email="", social_type=""):
+        if self.append(event, request, user, email, social_type):
+            await sync_to_async(self.flush)()
+
+    def append(self, event, request, user, email, social_type):
+        """
+        ring buffer 에 넣고, batch_size 개가 쌓였으면 True 를 돌려준다.
+        """
+        record = (
+            event,
+            user.pk if user is not None else None,
+            str(email or (user.email if user is not None else ""))[:254],
+            client_ip(request),
+            social_type,
+            timezone.now(),
+        )
+
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+
+        self.maybe_start_thread()
+
+        return full
+
+    def flush(self):
+        # 동시에 flush 하면 순서가 섞이므로 한 번에 하나만 한다.
+        with self._flush_lock:
+            with self._lock:
+                records = list(self._buffer)
+                self._buffer.clear()
+                self.mark_flushed()
+
+            if not records:
+                return 0
+
+            try:
+                self.sink.write(records)
+
+            except Exception:
+                # 감사 로그 때문에 기록 대상인 요청이 실패하면 안 되므로 예외를 올리지 않는다.
+                # 다음 flush 때 다시 쓰도록 앞쪽에 되돌린다. (capacity 를 넘는 만큼은 버려진다)
+                with self._lock:
+                    overflow = len(records) + len(self._buffer) - self._buffer.maxlen
+                    self.dropped += max(0, overflow)
+                    self._buffer.extendleft(reversed(records[max(0, overflow) :]))
+
+                logger.exception("Failed to write %d auth events, will retry", len(records))
+                return 0
+
+            return len(records)
+
+    def query(self, **filters):
+        return self.sink.query(**filters)
+
+
+auth_events = AuthEventLog.from_settings()
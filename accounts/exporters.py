@@ -0,0 +1,83 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import CustomUser
+
+EXPORT_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "social_type",
+    "is_active",
+    "email_is_verified",
+    "is_staff",
+    "is_superuser",
+    "date_joined",
+    "last_login",
+    "deleted_at",
+)
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class _Echo:
+    # csv.writer 가 쓴 한 줄을 버퍼에 쌓지 않고 그대로 돌려준다.
+    def write(self, value):
+        return value
+
+
+def iter_user_rows(queryset=None, fields=EXPORT_FIELDS, chunk_size=2000):
+    """
+    회원을 pk 순서로 chunk_size 개씩 keyset pagination 해서 dict 로 돌려준다.
+
+    OFFSET 을 쓰지 않으므로 뒤쪽 페이지도 pk 인덱스로 바로 찾고, 한 번에 메모리에 있는 행은 chunk_size 개뿐이다.
+    """
+    queryset = (CustomUser.objects.all() if queryset is None else queryset).order_by("pk").values(*fields)
+    last_pk = 0
+
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+
+        yield from chunk
+
+        if len(chunk) < chunk_size:
+            return
+
+        last_pk = chunk[-1]["id"]
+
+
+def iter_csv(rows, fields=EXPORT_FIELDS):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+
+    for row in rows:
+        yield writer.writerow(
+            [value.isoformat() if hasattr(value, "isoformat") else value for value in (row[f] for f in fields)]
+        )
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def export_users(queryset=None, fmt="csv", chunk_size=2000):
+    """
+    회원 목록을 CSV / JSONL 문자열 조각으로 스트리밍한다. (StreamingHttpResponse, export_users 명령어 공용)
+    """
+    rows = iter_user_rows(queryset, chunk_size=chunk_size)
+
+    if fmt == "csv":
+        return iter_csv(rows)
+
+    if fmt == "jsonl":
+        return iter_jsonl(rows)
+
+    raise ValueError(f"Unknown export format {fmt!r}")
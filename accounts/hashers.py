@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PASSWORD_HASHER_ITERATIONS 로 반복 횟수를 조정할 수 있는 PBKDF2 해셔
+
+    - 값은 `manage.py calibrate_hashers` 로 서버 성능에 맞춰 구한다.
+    - algorithm 이름이 같으므로 기존 pbkdf2_sha256 해시를 그대로 검증하고,
+      반복 횟수가 다르면 로그인 시 새 값으로 다시 해시된다.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_HASHER_ITERATIONS", None) or PBKDF2PasswordHasher.iterations
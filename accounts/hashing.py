@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.db.models import Case, F, Q, Value, When
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolFull(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password requests. Please try again later."
+    default_code = "hashing_pool_full"
+
+
+class PasswordHashingPool:
+    """
+    비밀번호 해시(PBKDF2 등)를 요청 스레드/이벤트 루프 밖에서 실행하는 풀
+
+    - hashlib 의 C 구현은 GIL 을 놓기 때문에 스레드 풀로 여러 코어를 쓸 수 있다.
+    - MAX_WORKERS 만큼 동시에 해시하고, MAX_QUEUE 만큼만 대기시킨다.
+    - 대기열이 가득 차면 기다리지 않고 바로 HashingPoolFull(503) 을 발생시킨다.
+    - timeout 초 안에 끝나지 않아도 HashingPoolFull(503) 로 응답한다.
+    """
+
+    def __init__(self, max_workers=4, max_queue=64, timeout=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, "PASSWORD_HASHING_POOL", {})
+
+        return cls(
+            max_workers=config.get("MAX_WORKERS", 4),
+            max_queue=config.get("MAX_QUEUE", 64),
+            timeout=config.get("TIMEOUT"),
+        )
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hashing",
+                    )
+
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolFull()
+
+        def call():
+            try:
+                return fn(*args, **kwargs)
+
+            finally:
+                self._slots.release()
+
+        try:
+            return self.executor.submit(call)
+
+        except Exception:
+            self._slots.release()
+            raise
+
+    def run(self, fn, *args, **kwargs):
+        future = self.submit(fn, *args, **kwargs)
+
+        try:
+            return future.result(timeout=self.timeout)
+
+        except TimeoutError:
+            # 아직 시작하지 않았으면 대기열에서 빼고, 500 대신 과부하와 같은 503 으로 응답한다.
+            future.cancel()
+            raise HashingPoolFull() from None
+
+    async def arun(self, fn, *args, **kwargs):
+        future = self.submit(fn, *args, **kwargs)
+
+        try:
+            # 시간이 지나면 wait_for 가 감싼 future 를 취소하고, 그 취소가 future 에도 전달된다.
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+        except TimeoutError:
+            future.cancel()
+            raise HashingPoolFull() from None
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+hashing_pool = PasswordHashingPool.from_settings()
+
+
+def _verify(raw_password, encoded):
+    must_update = []
+    is_correct = hashers.check_password(raw_password, encoded, setter=lambda _: must_update.append(True))
+
+    return is_correct, bool(must_update)
+
+
+def _apply_password(user, raw_password, encoded):
+    user.password = encoded
+    user._password = raw_password
+
+
+class PasswordRehashBuffer:
+    """
+    로그인 시 재해시된 비밀번호를 모아뒀다가 한 번의 UPDATE 로 반영하는 버퍼
+
+    - 로그인 응답에서는 UPDATE 를 하지 않고, request_finished 시점에 flush 된다.
+    - 그 사이에 비밀번호가 바뀐 사용자는 이전 해시 조건에 걸리지 않아 덮어쓰지 않는다.
+    """
+
+    def __init__(self, batch_size=100):
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, user_id, old_encoded, new_encoded):
+        with self._lock:
+            self._pending[user_id] = (old_encoded, new_encoded)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        items = list(pending.items())
+        updated = 0
+
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start : start + self.batch_size]
+
+            try:
+                updated += self.update_batch(batch)
+
+            except Exception:
+                # 세션 해시는 이미 새 해시로 만들어졌으므로 버리면 다음 요청에서 로그아웃된다. 다음 flush 때 다시 쓴다.
+                # 그 사이에 같은 회원이 다시 재해시되었으면 나중 값을 둔다.
+                with self._lock:
+                    for user_id, hashes in items[start:]:
+                        self._pending.setdefault(user_id, hashes)
+
+                logger.exception("Failed to flush %d password rehashes, will retry", len(items) - start)
+                break
+
+            # update() 는 post_save 를 보내지 않으므로 직접 캐시를 비운다.
+            for user_id, _ in batch:
+                user_cache.invalidate(user_id)
+
+        return updated
+
+    @staticmethod
+    def update_batch(batch):
+        from .models import CustomUser
+
+        cases = [When(pk=user_id, password=old, then=Value(new)) for user_id, (old, new) in batch]
+
+        matches = reduce(or_, (Q(pk=user_id, password=old) for user_id, (old, _) in batch))
+
+        return CustomUser.objects.filter(matches).update(password=Case(*cases, default=F("password")))
+
+
+rehash_buffer = PasswordRehashBuffer(batch_size=getattr(settings, "PASSWORD_REHASH_BATCH_SIZE", 100))
+
+
+def _defer_rehash(user, encoded):
+    # login() 이 세션 해시(get_session_auth_hash)를 새 해시로 만들도록 메모리의 값은 바로 바꾸고,
+    # DB 반영은 rehash_buffer 로 미룬다.
+    rehash_buffer.add(user.pk, user.password, encoded)
+    user.password = encoded
+
+
+def defer_rehash(user, raw_password):
+    try:
+        encoded = make_password(raw_password)
+
+    except HashingPoolFull:
+        # 다음 로그인 때 다시 시도한다.
+        return
+
+    _defer_rehash(user, encoded)
+
+
+async def adefer_rehash(user, raw_password):
+    try:
+        encoded = await amake_password(raw_password)
+
+    except HashingPoolFull:
+        return
+
+    _defer_rehash(user, encoded)
+
+
+def make_password(raw_password):
+    return hashing_pool.run(hashers.make_password, raw_password)
+
+
+async def amake_password(raw_password):
+    return await hashing_pool.arun(hashers.make_password, raw_password)
+
+
+def set_password(user, raw_password):
+    if raw_password is None:
+        user.set_unusable_password()
+        return
+
+    _apply_password(user, raw_password, make_password(raw_password))
+
+
+def check_password(user, raw_password):
+    is_correct, must_update = hashing_pool.run(_verify, raw_password, user.password)
+
+    if is_correct and must_update:
+        defer_rehash(user, raw_password)
+
+    return is_correct
+
+
+async def aset_password(user, raw_password):
+    if raw_password is None:
+        user.set_unusable_password()
+        return
+
+    _apply_password(user, raw_password, await amake_password(raw_password))
+
+
+async def acheck_password(user, raw_password):
+    if "password" in user.get_deferred_fields():
+        # user_cache 에서 꺼낸 사용자는 password 가 없다. 지연 필드를 그대로 읽으면 동기 쿼리가 되므로 async 로 읽는다.
+        await user.arefresh_from_db(fields=["password"])
+
+    is_correct, must_update = await hashing_pool.arun(_verify, raw_password, user.password)
+
+    if is_correct and must_update:
+        await adefer_rehash(user, raw_password)
+
+    return is_correct
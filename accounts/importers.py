@@ -0,0 +1,256 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import hashers
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import CustomUser
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+
+def iter_rows(path, fmt=None):
+    """
+    CSV / JSONL 파일을 한 줄씩 읽어서 (줄 번호, dict) 를 돌려준다. 파일 전체를 메모리에 올리지 않는다.
+    """
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            # 헤더가 1번째 줄이므로 데이터는 2번째 줄부터
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+
+                try:
+                    yield line_no, json.loads(line)
+
+                except ValueError as e:
+                    yield line_no, {"_error": f"invalid JSON: {e}"}
+
+
+def _init_hashing_worker():
+    # spawn 방식으로 뜬 워커에서도 PASSWORD_HASHERS 설정을 읽을 수 있도록 한다.
+    import django
+
+    django.setup()
+
+
+def _to_bool(value, default):
+    if value is None or value == "":
+        return default
+
+    if isinstance(value, bool):
+        return value
+
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class UserImporter:
+    """
+    대량 회원 가져오기 (manage.py import_users)
+
+    - 입력은 iter_rows 로 스트리밍하고 batch_size 줄씩 처리한다.
+    - 평문 비밀번호는 프로세스 풀에서 병렬로 해시하고, password_hash 컬럼의 해시는 형식만 확인해서 그대로 쓴다.
+    - 이메일은 CustomUserManager.canonical_email 로 정규화하고, 파일 안/DB 에 이미 있는 이메일은 건너뛴다.
+    - batch 마다 bulk_create 한 번(한 트랜잭션)으로 넣고, 다음 batch 의 해시는 그동안 프로세스 풀에서 계산한다.
+    - 커밋 후 마지막 줄 번호를 checkpoint 에 기록한다.
+      checkpoint 기록 전에 중단되어도 다시 실행하면 그 batch 는 중복으로 걸러지므로 두 번 들어가지 않는다.
+    """
+
+    def __init__(self, batch_size=1000, workers=None, checkpoint_path=None, rejects_path=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_path = checkpoint_path
+        self.rejects_path = rejects_path
+
+        self.social_types = {choice for choice, _ in CustomUser.SocialChoices.choices}
+        self._rejects = None
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {"line": 0, "created": 0, "duplicates": 0, "rejected": 0}
+
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, checkpoint):
+        if not self.checkpoint_path:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def reject(self, line_no, row, error):
+        if self._rejects is not None:
+            self._rejects.write(json.dumps({"line": line_no, "email": row.get("email"), "error": error}) + "\n")
+
+    def build_user(self, line_no, row):
+        """
+        한 줄을 검증해서 (CustomUser, 평문 비밀번호) 를 돌려준다. 잘못된 줄이면 None.
+        """
+        if "_error" in row:
+            self.reject(line_no, row, row["_error"])
+            return None
+
+        email = CustomUser.objects.canonical_email(row.get("email") or "")
+        try:
+            validate_email(email)
+
+        except ValidationError:
+            self.reject(line_no, row, "invalid email")
+            return None
+
+        social_type = row.get("social_type") or CustomUser.SocialChoices.COMMON
+        if social_type not in self.social_types:
+            self.reject(line_no, row, f"invalid social_type {social_type!r}")
+            return None
+
+        user = CustomUser(
+            email=email,
+            username=row.get("username") or "anonym",
+            social_type=social_type,
+            is_active=_to_bool(row.get("is_active"), False),
+            email_is_verified=_to_bool(row.get("email_is_verified"), False),
+        )
+
+        password_hash = row.get("password_hash")
+        if password_hash:
+            try:
+                hashers.identify_hasher(password_hash)
+
+            except ValueError:
+                self.reject(line_no, row, "unknown password_hash format")
+                return None
+
+            user.password = password_hash
+            return user, None
+
+        password = row.get("password") or None
+        if password is None:
+            user.set_unusable_password()
+
+        return user, password
+
+    def insert(self, users):
+        """
+        이미 있는 이메일을 빼고 bulk_create 한다. 동시에 가입한 회원과 겹치면 한 번 더 걸러서 다시 시도한다.
+        """
+        for attempt in range(2):
+            existing = set(
+                CustomUser.objects.filter(email__in=[u.email for u in users]).values_list("email", flat=True)
+            )
+            new_users = [user for user in users if user.email not in existing]
+
+            try:
+                with transaction.atomic():
+                    CustomUser.objects.bulk_create(new_users, batch_size=self.batch_size)
+
+                return len(new_users), len(users) - len(new_users)
+
+            except IntegrityError:
+                if attempt:
+                    raise
+
+    def prepare(self, executor, batch):
+        """
+        batch 를 검증하고 평문 비밀번호 해시를 프로세스 풀에 넘긴다. (결과는 commit 에서 기다린다)
+        """
+        prepared = {"line": batch[-1][0], "rows": len(batch), "users": [], "hashed": [], "rejected": 0, "duplicates": 0}
+        pending = []
+        seen = set()
+
+        for line_no, row in batch:
+            built = self.build_user(line_no, row)
+            if built is None:
+                prepared["rejected"] += 1
+                continue
+
+            user, password = built
+
+            if user.email in seen:
+                prepared["duplicates"] += 1
+                continue
+
+            seen.add(user.email)
+            prepared["users"].append(user)
+            if password is not None:
+                pending.append((user, password))
+
+        if pending:
+            chunksize = max(1, len(pending) // (self.workers * 4))
+            encoded = executor.map(hashers.make_password, [password for _, password in pending], chunksize=chunksize)
+            prepared["hashed"] = zip([user for user, _ in pending], encoded)
+
+        return prepared
+
+    def commit(self, prepared, checkpoint):
+        for user, encoded in prepared["hashed"]:
+            user.password = encoded
+
+        if prepared["users"]:
+            created, duplicates = self.insert(prepared["users"])
+            checkpoint["created"] += created
+            checkpoint["duplicates"] += duplicates
+
+        checkpoint["duplicates"] += prepared["duplicates"]
+        checkpoint["rejected"] += prepared["rejected"]
+        checkpoint["line"] = prepared["line"]
+        self.save_checkpoint(checkpoint)
+
+    def run(self, path, fmt=None, resume=False, progress=None):
+        checkpoint = self.load_checkpoint() if resume else {"line": 0, "created": 0, "duplicates": 0, "rejected": 0}
+        started_at = time.monotonic()
+        rows_this_run = 0
+
+        rows = ((line_no, row) for line_no, row in iter_rows(path, fmt) if line_no > checkpoint["line"])
+
+        if self.rejects_path:
+            self._rejects = open(self.rejects_path, "a" if resume else "w")
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_hashing_worker) as executor:
+                # 다음 batch 를 해시하는 동안 이전 batch 를 INSERT 한다.
+                previous = None
+
+                while True:
+                    batch = list(islice(rows, self.batch_size))
+                    current = self.prepare(executor, batch) if batch else None
+
+                    if previous is not None:
+                        self.commit(previous, checkpoint)
+
+                        rows_this_run += previous["rows"]
+                        if progress:
+                            progress(checkpoint, rows_this_run / max(time.monotonic() - started_at, 1e-9))
+
+                    if current is None:
+                        break
+
+                    previous = current
+
+        finally:
+            if self._rejects is not None:
+                self._rejects.close()
+                self._rejects = None
+
+        elapsed = time.monotonic() - started_at
+
+        return {
+            **checkpoint,
+            "elapsed": elapsed,
+            "rate": rows_this_run / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,123 @@
+import logging
+import threading
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .buffers import PeriodicFlushMixin
+from .cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer(PeriodicFlushMixin):
+    """
+    login() 마다 요청 안에서 하던 last_login UPDATE 를 모아뒀다가 batch 로 반영하는 버퍼
+
+    - 같은 회원의 여러 로그인은 가장 최근 시각 하나로 합쳐지므로 로그인이 몰리는 계정도 행 락을 한 번만 잡는다.
+    - flush 는 batch_size 명씩 CASE WHEN UPDATE 한 번이고, DB 에 더 최근 값이 있으면 덮어쓰지 않는다.
+    - flush_interval 초가 지나면 request_finished 또는 백그라운드 스레드에서 flush 하므로 (PeriodicFlushMixin)
+      DB 의 last_login 은 최대 flush_interval 초 늦다. max_pending 명이 쌓이면 바로 flush 한다.
+    """
+
+    flush_name = "last_login"
+
+    def __init__(self, flush_interval=5, max_pending=1000, batch_size=100):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        self.init_flushing()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, "LAST_LOGIN_BUFFER", {})
+
+        return cls(
+            flush_interval=config.get("FLUSH_INTERVAL", 5),
+            max_pending=config.get("MAX_PENDING", 1000),
+            batch_size=config.get("BATCH_SIZE", 100),
+        )
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, user_id, logged_in_at):
+        with self._lock:
+            previous = self._pending.get(user_id)
+            if previous is None or previous < logged_in_at:
+                self._pending[user_id] = logged_in_at
+
+            full = len(self._pending) >= self.max_pending
+
+        self.maybe_start_thread()
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self.mark_flushed()
+
+        items = list(pending.items())
+        updated = 0
+
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start : start + self.batch_size]
+
+            try:
+                updated += self.update_batch(batch)
+
+            except Exception:
+                # 로그인 기록 때문에 로그인(요청)이 실패하면 안 되므로 예외를 올리지 않는다.
+                # 아직 못 쓴 값은 다음 flush 때 쓰도록 되돌리고, 그 사이에 더 최근 로그인이 들어왔으면 그 값을 둔다.
+                self.requeue(items[start:])
+                logger.exception("Failed to flush %d last_login updates, will retry", len(items) - start)
+                break
+
+            # update() 는 post_save 를 보내지 않으므로 직접 캐시를 비운다.
+            for user_id, _ in batch:
+                user_cache.invalidate(user_id)
+
+        return updated
+
+    @staticmethod
+    def update_batch(batch):
+        from .models import CustomUser
+
+        cases = [When(pk=user_id, then=Value(logged_in_at)) for user_id, logged_in_at in batch]
+
+        matches = reduce(
+            or_,
+            (
+                Q(pk=user_id) & (Q(last_login__isnull=True) | Q(last_login__lt=logged_in_at))
+                for user_id, logged_in_at in batch
+            ),
+        )
+
+        return CustomUser.objects.filter(matches).update(last_login=Case(*cases, default=F("last_login")))
+
+    def requeue(self, items):
+        with self._lock:
+            for user_id, logged_in_at in items:
+                previous = self._pending.get(user_id)
+                if previous is None or previous < logged_in_at:
+                    self._pending[user_id] = logged_in_at
+
+
+last_login_buffer = LastLoginBuffer.from_settings()
+
+
+def defer_last_login(sender, user, **kwargs):
+    """
+    django.contrib.auth.models.update_last_login 대신 user_logged_in 에 연결된다. (AccountsConfig.ready)
+    """
+    user.last_login = timezone.now()
+    last_login_buffer.add(user.pk, user.last_login)
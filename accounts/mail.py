@@ -1,7 +1,22 @@
-from django.core.mail import send_mail
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
-from django.core import signing
-from django.core.signing import TimestampSigner
+from django.db import transaction
+from django.template import Context, Template
+from django.utils import timezone
+
+from .models import CustomUser, OutboundEmail
+from .tokens import email_token_generator
+
+logger = logging.getLogger(__name__)
 
 
 class EmailService:
@@ -11,22 +26,34 @@ class EmailService:
         self.email_from = settings.EMAIL_HOST_USER
         self.recipient_list = [user.email]
 
-    def signer(self):
-        signer = TimestampSigner()
-        signed_user_email = signer.sign(self.user.email)
-        signer_dump = signing.dumps(signed_user_email)
-        return signer_dump
+    def signer(self, purpose):
+        return email_token_generator.make_token(self.user, purpose)
 
-    def get_url(self, uri):
-        link = f"/account/{uri}/?code={self.signer()}"
+    def get_url(self, uri, purpose):
+        link = f"/account/{uri}/?code={self.signer(purpose)}"
         return f"{self.request.scheme}://{self.request.get_host()}{link}"
 
     def send_email(self, subject, message):
-        send_mail(subject, message, self.email_from, self.recipient_list)
+        enqueue_mail(subject, message, self.email_from, self.recipient_list)
+
+    async def asend_email(self, subject, message):
+        await aenqueue_mail(subject, message, self.email_from, self.recipient_list)
 
     def send_register_mail(self):
+        self.send_email(*self.register_mail())
+
+    async def asend_register_mail(self):
+        await self.asend_email(*self.register_mail())
+
+    def send_change_email_mail(self):
+        self.send_email(*self.change_email_mail())
+
+    async def asend_change_email_mail(self):
+        await self.asend_email(*self.change_email_mail())
+
+    def register_mail(self):
         uri = "active"
-        activation_url = self.get_url(uri)
+        activation_url = self.get_url(uri, "activate")
 
         subject = "Confirm your Account"
         message = (
@@ -34,11 +61,11 @@ class EmailService:
             f"Please click the link below to confirm your account:\n{activation_url}"
         )
 
-        self.send_email(subject, message)
+        return subject, message
 
-    def send_change_email_mail(self):
+    def change_email_mail(self):
         uri = "verify"
-        verification_url = self.get_url(uri)
+        verification_url = self.get_url(uri, "verify")
 
         subject = "Confirm Your Email Change"
         message = (
@@ -47,4 +74,384 @@ class EmailService:
             f"To confirm this change, please click the link below:\n{verification_url}"
         )
 
-        self.send_email(subject, message)
+        return subject, message
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """
+    메일을 바로 보내지 않고 outbox(OutboundEmail) 에 넣는다.
+    실제 발송은 `manage.py send_queued_mail` 워커가 담당한다.
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email or "",
+        recipients=list(recipient_list),
+    )
+
+
+async def aenqueue_mail(subject, message, from_email, recipient_list):
+    return await OutboundEmail.objects.acreate(
+        subject=subject,
+        message=message,
+        from_email=from_email or "",
+        recipients=list(recipient_list),
+    )
+
+
+class MailOutboxWorker:
+    """
+    outbox 를 비우는 워커
+
+    - SMTP 연결 하나를 열어두고 재사용하며, 오류가 나면 닫았다가 다음 발송 때 다시 연다.
+    - 실패한 메일은 attempts 에 따라 지수 백오프로 재시도하고, max_attempts 를 넘으면 failed 로 둔다.
+    - 짧은 트랜잭션에서 select_for_update(skip_locked=True) 로 batch 를 가져와 next_attempt_at 을 lease 초 뒤로 미루고
+      바로 커밋한다. (lease) 발송은 트랜잭션 밖에서 하므로 SMTP 지연 동안 행 락을 잡고 있지 않고,
+      워커를 여러 개 띄워도 lease 동안 다른 워커는 같은 메일을 가져가지 않는다.
+    - 메일마다 보낸 직후 그 행을 갱신한다. 보낸 뒤 갱신 전에 워커가 죽은 메일만 lease 가 끝난 뒤 한 번 더 나간다.
+    """
+
+    def __init__(self, batch_size=50, max_attempts=5, backoff_base=30, backoff_max=3600, lease=300, connection=None):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+
+        self._connection = connection
+        self._stopped = False
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        config = {key.lower(): value for key, value in getattr(settings, "EMAIL_OUTBOX", {}).items()}
+        config.pop("poll_interval", None)
+        config.update({key: value for key, value in overrides.items() if value is not None})
+
+        return cls(**config)
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            self._connection = get_connection()
+            self._connection.open()
+
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+
+            except Exception:
+                logger.exception("Error closing mail connection")
+
+            self._connection = None
+
+    def backoff(self, attempts):
+        return timedelta(seconds=min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max))
+
+    def send(self, outbound):
+        message = EmailMessage(
+            outbound.subject,
+            outbound.message,
+            outbound.from_email or None,
+            outbound.recipients,
+            connection=self.connection,
+        )
+        message.send()
+
+    def claim(self, now):
+        with transaction.atomic():
+            batch = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboundEmail.StatusChoices.PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at")[: self.batch_size]
+            )
+
+            for outbound in batch:
+                outbound.attempts += 1
+                outbound.next_attempt_at = now + timedelta(seconds=self.lease)
+
+            OutboundEmail.objects.bulk_update(batch, ["attempts", "next_attempt_at"])
+
+        return batch
+
+    def process_batch(self):
+        now = timezone.now()
+        sent = 0
+
+        batch = self.claim(now)
+
+        for outbound in batch:
+            try:
+                self.send(outbound)
+
+            except Exception as e:
+                logger.warning("Failed to send outbound email %s: %s", outbound.pk, e)
+                self.close()
+
+                update = {"last_error": str(e)}
+                if outbound.attempts >= self.max_attempts:
+                    update["status"] = OutboundEmail.StatusChoices.FAILED
+                else:
+                    update["next_attempt_at"] = timezone.now() + self.backoff(outbound.attempts)
+
+            else:
+                sent += 1
+                update = {"status": OutboundEmail.StatusChoices.SENT, "sent_at": timezone.now(), "last_error": ""}
+
+            OutboundEmail.objects.filter(pk=outbound.pk).update(**update)
+
+        return len(batch), sent
+
+    def drain(self):
+        total_sent = 0
+
+        while not self._stopped:
+            processed, sent = self.process_batch()
+            total_sent += sent
+
+            if processed < self.batch_size:
+                break
+
+        return total_sent
+
+    def stop(self, *args):
+        self._stopped = True
+
+    def run_forever(self, poll_interval=2):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        try:
+            while not self._stopped:
+                self.drain()
+                time.sleep(poll_interval)
+
+        finally:
+            self.close()
+
+
+def iter_verified_recipients(chunk_size=500, after_id=0):
+    """
+    email_is_verified 사용자를 pk 순서로 chunk_size 개씩 가져오는 keyset 페이지네이션 iterator
+    OFFSET 을 쓰지 않으므로 뒤쪽 chunk 도 같은 비용으로 읽는다.
+    """
+    while True:
+        chunk = list(
+            CustomUser.objects.filter(email_is_verified=True, pk__gt=after_id)
+            .order_by("pk")
+            .values_list("pk", "email", "username")[:chunk_size]
+        )
+        if not chunk:
+            return
+
+        yield chunk
+        after_id = chunk[-1][0]
+
+
+class RateLimiter:
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait_until = max(self._next, now)
+            self._next = wait_until + self.interval
+
+        if wait_until > now:
+            time.sleep(wait_until - now)
+
+
+class AnnouncementMailer:
+    """
+    인증된 전체 사용자에게 공지 메일을 보내는 서비스
+
+    - 수신자는 iter_verified_recipients 로 chunk 단위로 읽어서 테이블 전체를 메모리에 올리지 않는다.
+    - 제목/본문 템플릿은 한 번만 컴파일하고 chunk 마다 메시지를 만든다.
+    - parallelism 개의 스레드가 각자 SMTP 연결 하나를 계속 재사용하고, rate_limit(초당 메일 수)를 함께 지킨다.
+    - chunk 를 다 보낼 때마다 마지막 user id 를 checkpoint 파일에 기록해서 중단된 지점부터 다시 시작할 수 있다.
+    - 보내지 못한 수신자 id 는 checkpoint 의 failed_ids 에 남기고, resume 하면 그 수신자부터 다시 보낸다.
+    """
+
+    def __init__(
+        self,
+        subject,
+        body,
+        from_email=None,
+        parallelism=4,
+        rate_limit=None,
+        chunk_size=500,
+        checkpoint_path=None,
+    ):
+        self.subject_template = Template(subject)
+        self.body_template = Template(body)
+        self.from_email = from_email or settings.EMAIL_HOST_USER
+
+        self.parallelism = parallelism
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path
+        self.rate_limiter = RateLimiter(rate_limit)
+
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return self.new_checkpoint()
+
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+
+        # failed_ids 가 없는 예전 checkpoint
+        checkpoint.setdefault("failed_ids", [])
+
+        return checkpoint
+
+    @staticmethod
+    def new_checkpoint():
+        return {"last_id": 0, "sent": 0, "failed": 0, "failed_ids": []}
+
+    def save_checkpoint(self, checkpoint):
+        if not self.checkpoint_path:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def render_chunk(self, chunk):
+        messages = []
+
+        for _, email, username in chunk:
+            context = Context({"email": email, "username": username})
+            messages.append(
+                EmailMessage(
+                    self.subject_template.render(context).strip(),
+                    self.body_template.render(context),
+                    self.from_email,
+                    [email],
+                )
+            )
+
+        return messages
+
+    def get_connection(self):
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            connection = get_connection()
+            connection.open()
+            self._local.connection = connection
+
+            with self._connections_lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def reset_connection(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+
+        if connection is not None:
+            try:
+                connection.close()
+
+            except Exception:
+                logger.exception("Error closing mail connection")
+
+    def send(self, message):
+        self.rate_limiter.wait()
+
+        try:
+            return self.get_connection().send_messages([message]) == 1
+
+        except Exception as e:
+            logger.warning("Failed to send announcement to %s: %s", message.to, e)
+            self.reset_connection()
+            return False
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+
+        for connection in connections:
+            try:
+                connection.close()
+
+            except Exception:
+                logger.exception("Error closing mail connection")
+
+    def iter_retry_recipients(self, failed_ids):
+        """
+        지난 실행에서 보내지 못한 수신자를 chunk_size 개씩 다시 읽는다. (그 사이 인증이 풀린 사용자는 빠진다)
+        """
+        for start in range(0, len(failed_ids), self.chunk_size):
+            ids = failed_ids[start : start + self.chunk_size]
+            chunk = list(
+                CustomUser.objects.filter(email_is_verified=True, pk__in=ids)
+                .order_by("pk")
+                .values_list("pk", "email", "username")
+            )
+
+            yield ids, chunk
+
+    def send_chunk(self, executor, chunk, checkpoint, failed):
+        results = list(executor.map(self.send, self.render_chunk(chunk)))
+        sent = sum(results)
+
+        for (pk, _, _), ok in zip(chunk, results):
+            if not ok:
+                failed.add(pk)
+
+        checkpoint["sent"] += sent
+        checkpoint["failed_ids"] = sorted(failed)
+        checkpoint["failed"] = len(failed)
+
+        return sent
+
+    def run(self, resume=False, progress=None):
+        checkpoint = self.load_checkpoint() if resume else self.new_checkpoint()
+        failed = set(checkpoint["failed_ids"])
+        started_at = time.monotonic()
+        sent_this_run = 0
+
+        def report(sent):
+            nonlocal sent_this_run
+
+            self.save_checkpoint(checkpoint)
+
+            sent_this_run += sent
+            if progress:
+                progress(checkpoint, sent_this_run / max(time.monotonic() - started_at, 1e-9))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="announcement") as executor:
+                # 지난 실행에서 실패한 수신자부터 다시 보낸다.
+                for ids, chunk in self.iter_retry_recipients(sorted(failed)):
+                    failed.difference_update(ids)
+                    report(self.send_chunk(executor, chunk, checkpoint, failed))
+
+                for chunk in iter_verified_recipients(self.chunk_size, after_id=checkpoint["last_id"]):
+                    checkpoint["last_id"] = chunk[-1][0]
+                    report(self.send_chunk(executor, chunk, checkpoint, failed))
+
+        finally:
+            self.close()
+
+        elapsed = time.monotonic() - started_at
+
+        return {
+            **checkpoint,
+            "elapsed": elapsed,
+            "rate": sent_this_run / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,69 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.events import auth_events
+from accounts.models import AuthEvent
+
+UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_time(value):
+    """
+    ISO 시각(2026-01-31T12:00:00+09:00) 또는 지금부터 거슬러 올라간 시간(30m, 12h, 7d)
+    """
+    if value is None:
+        return None
+
+    if value[-1:] in UNITS and value[:-1].isdigit():
+        return timezone.now() - timedelta(**{UNITS[value[-1]]: int(value[:-1])})
+
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Invalid time {value!r}, expected ISO 8601 or e.g. 30m, 12h, 7d")
+
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = "Query or export the authentication event log as JSONL (from the AuthEvent table or JSONL segments)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--event", choices=AuthEvent.EventChoices.values, help="Only this event type.")
+        parser.add_argument("--user-id", type=int, help="Only events of this user id.")
+        parser.add_argument("--email", help="Only events for this email.")
+        parser.add_argument("--since", help="Start time, ISO 8601 or relative (30m, 12h, 7d).")
+        parser.add_argument("--until", help="End time (exclusive), ISO 8601 or relative.")
+        parser.add_argument("--limit", type=int, help="Stop after this many events.")
+        parser.add_argument("--output", help="Output file. Defaults to stdout.")
+
+    def handle(self, *args, **options):
+        events = auth_events.query(
+            event=options["event"],
+            user_id=options["user_id"],
+            email=options["email"],
+            since=parse_time(options["since"]),
+            until=parse_time(options["until"]),
+        )
+
+        out = open(options["output"], "w", encoding="utf-8") if options["output"] else self.stdout
+        count = 0
+
+        try:
+            for row in events:
+                if options["limit"] is not None and count >= options["limit"]:
+                    break
+
+                out.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n")
+                count += 1
+
+        finally:
+            if options["output"]:
+                out.close()
+
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(f"Exported {count} events to {options['output']}"))
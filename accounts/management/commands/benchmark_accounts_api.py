@@ -0,0 +1,130 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import aiohttp
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the accounts API of running deployments, e.g. the WSGI (gunicorn) and ASGI (uvicorn) "
+        "servers side by side. Each client logs in once and then requests the profile repeatedly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base_url of a deployment, e.g. wsgi=http://127.0.0.1:8000 (repeatable).",
+        )
+        parser.add_argument("--email", required=True, help="Email of an active, verified user.")
+        parser.add_argument("--password", required=True, help="Password of that user.")
+        parser.add_argument("--requests", type=int, default=2000, help="Profile requests per target.")
+        parser.add_argument("--concurrency", type=int, default=100, help="Concurrent clients per target.")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, sep, base_url = target.partition("=")
+            if not sep or not base_url:
+                raise CommandError(f"Invalid --target {target!r}, expected name=base_url")
+            targets.append((name, base_url.rstrip("/")))
+
+        for name, base_url in targets:
+            result = asyncio.run(
+                self.run_target(
+                    base_url,
+                    options["email"],
+                    options["password"],
+                    options["requests"],
+                    options["concurrency"],
+                )
+            )
+
+            for phase in ("login", "profile"):
+                self.stdout.write(f"{name:<8} {self.format_phase(phase, result[phase])}")
+
+            if result["errors"]:
+                errors = ", ".join(f"{error}={count}" for error, count in result["errors"].most_common())
+                self.stdout.write(self.style.WARNING(f"{name:<8} errors: {errors}"))
+
+    async def run_target(self, base_url, email, password, total, concurrency):
+        result = {
+            "login": {"latencies": [], "elapsed": 0.0},
+            "profile": {"latencies": [], "elapsed": 0.0},
+            "errors": Counter(),
+        }
+        connector = aiohttp.TCPConnector(limit=concurrency)
+
+        # 클라이언트마다 세션 쿠키가 따로 있어야 하므로 연결 풀만 공유하고 cookie jar 는 나눈다.
+        clients = [
+            aiohttp.ClientSession(connector=connector, connector_owner=False, cookie_jar=aiohttp.CookieJar(unsafe=True))
+            for _ in range(concurrency)
+        ]
+
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    self.request(
+                        client,
+                        "POST",
+                        f"{base_url}/account/login/",
+                        result,
+                        "login",
+                        json={"email": email, "password": password},
+                    )
+                    for client in clients
+                )
+            )
+            result["login"]["elapsed"] = time.perf_counter() - start
+
+            per_client = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+            async def profile_loop(client, count):
+                for _ in range(count):
+                    await self.request(client, "GET", f"{base_url}/account/profile/", result, "profile")
+
+            start = time.perf_counter()
+            await asyncio.gather(*(profile_loop(client, count) for client, count in zip(clients, per_client)))
+            result["profile"]["elapsed"] = time.perf_counter() - start
+
+        finally:
+            await asyncio.gather(*(client.close() for client in clients))
+            await connector.close()
+
+        return result
+
+    @staticmethod
+    async def request(client, method, url, result, phase, **kwargs):
+        start = time.perf_counter()
+        try:
+            async with client.request(method, url, **kwargs) as response:
+                await response.read()
+                error = None if response.status == 200 else f"{phase} {response.status}"
+
+        except aiohttp.ClientError as e:
+            error = f"{phase} {type(e).__name__}"
+
+        result[phase]["latencies"].append(time.perf_counter() - start)
+        if error:
+            result["errors"][error] += 1
+
+    @staticmethod
+    def format_phase(phase, data):
+        latencies = sorted(data["latencies"])
+        if not latencies:
+            return f"{phase:<8} no requests"
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        return (
+            f"{phase:<8} {len(latencies):6d} req in {data['elapsed']:6.2f}s  "
+            f"{len(latencies) / max(data['elapsed'], 0.001):8.1f} req/s  "
+            f"avg={statistics.mean(latencies) * 1000:7.1f}ms p50={percentile(0.5):7.1f}ms "
+            f"p95={percentile(0.95):7.1f}ms p99={percentile(0.99):7.1f}ms"
+        )
@@ -0,0 +1,51 @@
+import time
+
+from django.core import signing
+from django.core.management.base import BaseCommand
+from django.core.signing import TimestampSigner
+
+from accounts.models import CustomUser
+from accounts.tokens import email_token_generator
+
+
+class Command(BaseCommand):
+    help = "Compare sign/verify throughput of the legacy signing token and the compact email token."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        user = CustomUser(pk=123456, email="benchmark-user@example.com")
+        signer = TimestampSigner()
+
+        def legacy_sign():
+            return signing.dumps(signer.sign(user.email))
+
+        def legacy_verify(token):
+            return signer.unsign(signing.loads(token), max_age=60 * 3)
+
+        def compact_sign():
+            return email_token_generator.make_token(user, "activate")
+
+        def compact_verify(token):
+            return email_token_generator.verify(user, token, "activate")
+
+        for name, sign, verify in (
+            ("legacy (TimestampSigner + signing.dumps)", legacy_sign, legacy_verify),
+            ("compact (EmailTokenGenerator)", compact_sign, compact_verify),
+        ):
+            token = sign()
+            sign_rate = self.measure(sign, iterations)
+            verify_rate = self.measure(lambda: verify(token), iterations)
+
+            self.stdout.write(
+                f"{name:<42} len={len(token):>3}  sign={sign_rate:>10,.0f}/s  verify={verify_rate:>10,.0f}/s"
+            )
+
+    @staticmethod
+    def measure(fn, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return iterations / (time.perf_counter() - start)
@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import CustomUser
+
+SOCIAL_TYPES = [choice for choice, _ in CustomUser.SocialChoices.choices]
+
+# 이름 -> changelist 쿼리 스트링
+SCENARIOS = {
+    "all": {},
+    "social+active": {"social_type__exact": "kakao", "is_active__exact": "1"},
+    "active+verified": {"is_active__exact": "1", "email_is_verified__exact": "0"},
+    "superuser": {"is_superuser__exact": "1"},
+    "search email": {"q": "bench-user-12345"},
+    "search username": {"q": "bench12345"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the CustomUser admin changelist for common filters and searches. "
+        "Use --seed to bulk insert synthetic users first (e.g. --seed 10000000)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0, help="Synthetic users to insert before timing.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per INSERT while seeding.")
+        parser.add_argument("--runs", type=int, default=5, help="Renders per scenario.")
+        parser.add_argument("--budget-ms", type=float, default=200.0, help="Render time budget per changelist.")
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"], options["verbosity"])
+
+        model_admin = admin.site._registry[CustomUser]
+        # 권한 확인은 is_superuser 만 보므로 저장하지 않은 관리자 객체로 충분하다.
+        superuser = CustomUser(email="admin-benchmark@example.com", is_active=True, is_staff=True, is_superuser=True)
+        factory = RequestFactory()
+        over_budget = False
+
+        for name, params in SCENARIOS.items():
+            timings = []
+
+            for _ in range(options["runs"]):
+                request = factory.get("/admin/accounts/customuser/", params)
+                request.user = superuser
+
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    model_admin.changelist_view(request).render()
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            median = statistics.median(timings)
+            over_budget |= median > options["budget_ms"]
+
+            line = f"{name:<16} median={median:8.1f}ms max={max(timings):8.1f}ms queries={len(queries)}"
+            style = self.style.SUCCESS if median <= options["budget_ms"] else self.style.ERROR
+            self.stdout.write(style(line))
+
+        if over_budget:
+            self.stdout.write(self.style.WARNING(f"Some changelists exceeded {options['budget_ms']:.0f} ms."))
+
+    def seed(self, total, batch_size, verbosity):
+        start_id = (CustomUser.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+        started = time.perf_counter()
+
+        for offset in range(0, total, batch_size):
+            users = [
+                CustomUser(
+                    email=f"bench-user-{n}@example.com",
+                    username=f"bench{n}",
+                    password="!benchmark",
+                    social_type=SOCIAL_TYPES[n % len(SOCIAL_TYPES)],
+                    is_active=n % 10 != 0,
+                    email_is_verified=n % 3 != 0,
+                )
+                for n in range(start_id + offset, start_id + min(offset + batch_size, total))
+            ]
+            CustomUser.objects.bulk_create(users, batch_size=batch_size)
+
+            if verbosity > 1:
+                self.stdout.write(f"seeded {offset + len(users)}/{total}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"seeded {total} users in {elapsed:.1f}s ({total / max(elapsed, 0.001):.0f} rows/s)")
@@ -0,0 +1,109 @@
+import math
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand
+
+# 비용 파라미터 이름 -> 검증 시간과의 관계
+LINEAR_COST_PARAMS = ("iterations", "time_cost")
+LOG2_COST_PARAMS = ("rounds",)
+POWER_OF_TWO_COST_PARAMS = ("work_factor",)
+
+ENV_KEY = "PASSWORD_HASHER_ITERATIONS"
+
+
+class Command(BaseCommand):
+    help = "Benchmark PASSWORD_HASHERS on this host and recommend cost parameters for a target verify time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=50.0, help="Target verify latency in milliseconds.")
+        parser.add_argument("--samples", type=int, default=5, help="Verify runs per hasher.")
+        parser.add_argument(
+            "--write",
+            action="store_true",
+            help=f"Write the recommended iterations of the default hasher to {ENV_KEY} in .env.",
+        )
+
+    def handle(self, *args, **options):
+        target_ms = options["target_ms"]
+        samples = options["samples"]
+        default_hasher = get_hasher()
+        recommended_default = None
+
+        for hasher in get_hashers():
+            try:
+                elapsed_ms = self.measure(hasher, samples)
+
+            except ValueError as e:
+                self.stdout.write(f"{hasher.algorithm:<24} skipped ({e})")
+                continue
+
+            param, current, recommended = self.recommend(hasher, elapsed_ms, target_ms)
+
+            line = f"{hasher.algorithm:<24} {elapsed_ms:8.1f} ms"
+            if param:
+                line += f"  {param}={current} -> {recommended}"
+            self.stdout.write(line)
+
+            if hasher is default_hasher and param == "iterations":
+                recommended_default = recommended
+
+        if recommended_default is None:
+            self.stdout.write(self.style.WARNING("The default hasher has no iterations parameter to calibrate."))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"{ENV_KEY}={recommended_default}"))
+
+        if options["write"]:
+            env_path = os.path.join(settings.BASE_DIR, ".env")
+            self.write_env(env_path, ENV_KEY, recommended_default)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {ENV_KEY} to {env_path}"))
+
+    @staticmethod
+    def measure(hasher, samples):
+        encoded = hasher.encode("calibrate-password", hasher.salt())
+        timings = []
+
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.verify("calibrate-password", encoded)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return statistics.median(timings)
+
+    @staticmethod
+    def recommend(hasher, elapsed_ms, target_ms):
+        ratio = target_ms / max(elapsed_ms, 0.001)
+
+        for param in LINEAR_COST_PARAMS:
+            current = getattr(hasher, param, None)
+            if current:
+                step = 1000 if current >= 10_000 else 1
+                return param, current, max(step, math.ceil(current * ratio / step) * step)
+
+        for param in LOG2_COST_PARAMS:
+            current = getattr(hasher, param, None)
+            if current:
+                return param, current, max(4, current + round(math.log2(ratio)))
+
+        for param in POWER_OF_TWO_COST_PARAMS:
+            current = getattr(hasher, param, None)
+            if current:
+                return param, current, 2 ** max(1, round(math.log2(current * ratio)))
+
+        return None, None, None
+
+    @staticmethod
+    def write_env(env_path, key, value):
+        lines = []
+        if os.path.exists(env_path):
+            with open(env_path) as f:
+                lines = [line for line in f.read().splitlines() if not line.startswith(f"{key}=")]
+
+        lines.append(f"{key}={value}")
+
+        with open(env_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
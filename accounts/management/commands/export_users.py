@@ -0,0 +1,41 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.exporters import export_users
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Stream all users to a CSV or JSONL file (or stdout) without loading the whole table into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Output format.")
+        parser.add_argument("--output", help="Output file. Defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per query.")
+        parser.add_argument("--active-only", action="store_true", help="Export only active users.")
+
+    def handle(self, *args, **options):
+        queryset = CustomUser.objects.all()
+        if options["active_only"]:
+            queryset = queryset.filter(is_active=True)
+
+        chunks = export_users(queryset, options["format"], options["chunk_size"])
+        started_at = time.monotonic()
+        lines = 0
+
+        out = open(options["output"], "w", newline="", encoding="utf-8") if options["output"] else sys.stdout
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                lines += 1
+
+        finally:
+            if options["output"]:
+                out.close()
+
+        if options["output"]:
+            rows = lines - 1 if options["format"] == "csv" else lines
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(self.style.SUCCESS(f"Exported {rows} users to {options['output']} in {elapsed:.1f}s"))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.purge import DeletedUserPurger
+
+
+class Command(BaseCommand):
+    help = "Permanently delete soft-deleted users and their related rows in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Delete what is pending once and exit.")
+        parser.add_argument("--batch-size", type=int, help="Maximum users deleted per transaction.")
+        parser.add_argument("--sleep", type=float, help="Seconds to pause between batches.")
+        parser.add_argument("--max-lag", type=float, help="Wait while replication lag exceeds this many seconds.")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to wait between polls.")
+        parser.add_argument("--status", action="store_true", help="Show the progress of the last or running pass.")
+
+    def handle(self, *args, **options):
+        if options["status"]:
+            progress = DeletedUserPurger.progress()
+            if progress is None:
+                self.stdout.write("No hard delete has run yet.")
+            else:
+                self.stdout.write(" ".join(f"{key}={value}" for key, value in progress.items()))
+            return
+
+        purger = DeletedUserPurger.from_settings(
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            max_lag=options["max_lag"],
+        )
+
+        def log(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"batch={stats['batches']} deleted={stats['deleted']} related_deleted={stats['related_deleted']} "
+                    f"batch_size={stats['batch_size']}"
+                )
+
+        if options["once"]:
+            stats = purger.run_until_stopped(log)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"deleted={stats['deleted']} related_deleted={stats['related_deleted']} "
+                    f"elapsed={stats['elapsed']:.1f}s rate={stats['rate']:.1f} users/s"
+                )
+            )
+            return
+
+        poll_interval = options["poll_interval"] or getattr(settings, "ACCOUNT_HARD_DELETE", {}).get(
+            "POLL_INTERVAL", 10
+        )
+        purger.run_forever(poll_interval=poll_interval, log=log)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import UserImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import users from a CSV or JSONL file. Columns: email, username, password or password_hash, "
+        "social_type, is_active, email_is_verified."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with header) or JSONL file.")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format. Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per bulk INSERT.")
+        parser.add_argument("--workers", type=int, help="Password hashing processes. Defaults to the CPU count.")
+        parser.add_argument("--checkpoint", help="Checkpoint file used to resume after a failure.")
+        parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint file.")
+        parser.add_argument("--rejects", help="Write rejected rows (line, email, error) to this JSONL file.")
+
+    def handle(self, *args, **options):
+        if options["resume"] and not options["checkpoint"]:
+            raise CommandError("--resume requires --checkpoint")
+
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            checkpoint_path=options["checkpoint"],
+            rejects_path=options["rejects"],
+        )
+
+        try:
+            result = importer.run(
+                options["path"], fmt=options["format"], resume=options["resume"], progress=self.report
+            )
+
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"created={result['created']} duplicates={result['duplicates']} rejected={result['rejected']} "
+                f"last_line={result['line']} elapsed={result['elapsed']:.1f}s rate={result['rate']:.1f} rows/s"
+            )
+        )
+
+    def report(self, checkpoint, rate):
+        self.stdout.write(
+            f"line={checkpoint['line']} created={checkpoint['created']} duplicates={checkpoint['duplicates']} "
+            f"rejected={checkpoint['rejected']} rate={rate:.1f} rows/s"
+        )
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from accounts.services import get_async_provider_client
+from accounts.views import AsyncKakaoLoginCallback, KakaoLoginCallback
+
+KAKAO_PROFILE = {"id": 1234567890, "kakao_account": {"email": "load@example.com", "profile": {"nickname": "load"}}}
+
+
+class FakeProvider:
+    """
+    토큰/프로필 요청마다 latency 초 뒤에 응답하는 로컬 provider (HTTP/1.1 keep-alive)
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.port = None
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+
+    async def _shutdown(self):
+        self.server.close()
+
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.loop.call_soon(self.loop.stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, "127.0.0.1", 0, backlog=4096))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        self.loop.run_forever()
+        self.loop.close()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                content_length = 0
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        content_length = int(value)
+
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                await asyncio.sleep(self.latency)
+
+                path = request_line.split()[1]
+                body = json.dumps({"access_token": "token"} if path == b"/token" else KAKAO_PROFILE).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # 클라이언트가 연결을 끊었거나 stop() 으로 종료되는 경우
+            pass
+
+        finally:
+            writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the social callback provider round trips against a local fake provider, "
+        "comparing the sync (thread per request) and async (event loop) paths."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000, help="Number of callback flows.")
+        parser.add_argument("--latency", type=float, default=0.2, help="Provider latency per call (seconds).")
+        parser.add_argument("--threads", type=int, default=16, help="Worker threads for the sync path.")
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        latency = options["latency"]
+
+        provider = FakeProvider(latency)
+        provider.start()
+        base_url = f"http://127.0.0.1:{provider.port}"
+
+        try:
+            sync_elapsed = self.run_sync(base_url, total, options["threads"])
+            async_elapsed = asyncio.run(self.run_async(base_url, total))
+
+        finally:
+            provider.stop()
+
+        # 각 흐름은 provider 를 두 번 호출하므로 2 * latency 동안 in-flight 상태다.
+        for name, elapsed in (("sync", sync_elapsed), ("async", async_elapsed)):
+            self.stdout.write(
+                f"{name:<6} {total} flows in {elapsed:6.2f}s  "
+                f"{total / elapsed:8.1f} flows/s  avg in-flight={total * 2 * latency / elapsed:7.1f}"
+            )
+
+    @staticmethod
+    def build_view(view_class, base_url):
+        view = view_class()
+        view.code = "code"
+        view.token_uri = f"{base_url}/token"
+        view.profile_uri = f"{base_url}/me"
+        return view
+
+    def run_sync(self, base_url, total, threads):
+        def flow(_):
+            return self.build_view(KakaoLoginCallback, base_url).get_user_info_json()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(flow, range(total)))
+
+        return time.perf_counter() - start
+
+    async def run_async(self, base_url, total):
+        async def flow():
+            return await self.build_view(AsyncKakaoLoginCallback, base_url).aget_user_info_json()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(flow() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+        await get_async_provider_client("kakao").aclose()
+
+        return elapsed
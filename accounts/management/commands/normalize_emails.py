@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from accounts.manager import normalize_stored_emails
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Lowercase stored user emails in small committed chunks (safe to run while serving traffic)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows scanned per chunk.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between chunks.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        def log(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"scanned={stats['scanned']} updated={stats['updated']}")
+
+        stats = normalize_stored_emails(
+            CustomUser,
+            chunk_size=options["chunk_size"],
+            sleep=options["sleep"],
+            dry_run=options["dry_run"],
+            log=log,
+        )
+
+        verb = "would update" if options["dry_run"] else "updated"
+        self.stdout.write(self.style.SUCCESS(f"scanned={stats['scanned']} {verb}={stats['updated']}"))
+
+        for pk, email in stats["conflicts"]:
+            self.stdout.write(
+                self.style.WARNING(f"conflict: user {pk} <{email}> differs only in case from another user")
+            )
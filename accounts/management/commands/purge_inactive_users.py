@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from accounts.purge import InactiveUserPurger
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete accounts that never activated their email in small primary-key ordered batches, "
+        "pausing between batches and while replicas are lagging."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Only purge accounts that joined more than this many days ago.")
+        parser.add_argument("--batch-size", type=int, help="Maximum users deleted per transaction.")
+        parser.add_argument("--sleep", type=float, help="Seconds to pause between batches.")
+        parser.add_argument("--max-lag", type=float, help="Wait while replication lag exceeds this many seconds.")
+        parser.add_argument("--dry-run", action="store_true", help="Count matching accounts without deleting.")
+        parser.add_argument("--status", action="store_true", help="Show the progress of the last or running purge.")
+
+    def handle(self, *args, **options):
+        if options["status"]:
+            progress = InactiveUserPurger.progress()
+            if progress is None:
+                self.stdout.write("No purge has run yet.")
+            else:
+                self.stdout.write(" ".join(f"{key}={value}" for key, value in progress.items()))
+            return
+
+        purger = InactiveUserPurger.from_settings(
+            inactive_days=options["days"],
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            max_lag=options["max_lag"],
+            dry_run=options["dry_run"],
+        )
+
+        def log(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"batch={stats['batches']} deleted={stats['deleted']} last_pk={stats['last_pk']} "
+                    f"batch_size={stats['batch_size']} rate={stats['rate']:.1f} users/s"
+                )
+
+        stats = purger.run_until_stopped(log)
+
+        verb = "would delete" if options["dry_run"] else "deleted"
+        style = self.style.SUCCESS if stats["finished"] else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"{verb}={stats['deleted']} related_deleted={stats['related_deleted']} batches={stats['batches']} "
+                f"lag_wait={stats['lag_wait']:.1f}s elapsed={stats['elapsed']:.1f}s rate={stats['rate']:.1f} users/s"
+                + ("" if stats["finished"] else " (stopped)")
+            )
+        )
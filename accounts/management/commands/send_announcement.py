@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.mail import AnnouncementMailer
+
+
+class Command(BaseCommand):
+    help = "Send an announcement email to every verified user."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subject", required=True, help="Subject template, e.g. 'Hi {{ username }}'.")
+        parser.add_argument("--body-file", required=True, help="Path to the body template file.")
+        parser.add_argument("--from-email", help="Sender address. Defaults to EMAIL_HOST_USER.")
+        parser.add_argument("--parallelism", type=int, default=4, help="Number of SMTP connections.")
+        parser.add_argument("--rate-limit", type=float, help="Maximum emails per second.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Recipients read per query.")
+        parser.add_argument("--checkpoint", help="Checkpoint file used to resume after a crash.")
+        parser.add_argument(
+            "--resume", action="store_true", help="Continue from the checkpoint file, retrying failed recipients first."
+        )
+
+    def handle(self, *args, **options):
+        if options["resume"] and not options["checkpoint"]:
+            raise CommandError("--resume requires --checkpoint")
+
+        try:
+            with open(options["body_file"]) as f:
+                body = f.read()
+
+        except OSError as e:
+            raise CommandError(str(e))
+
+        mailer = AnnouncementMailer(
+            subject=options["subject"],
+            body=body,
+            from_email=options["from_email"],
+            parallelism=options["parallelism"],
+            rate_limit=options["rate_limit"],
+            chunk_size=options["chunk_size"],
+            checkpoint_path=options["checkpoint"],
+        )
+
+        result = mailer.run(resume=options["resume"], progress=self.report)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"sent={result['sent']} failed={result['failed']} last_id={result['last_id']} "
+                f"elapsed={result['elapsed']:.1f}s rate={result['rate']:.1f} msg/s"
+            )
+        )
+
+    def report(self, checkpoint, rate):
+        self.stdout.write(
+            f"last_id={checkpoint['last_id']} sent={checkpoint['sent']} failed={checkpoint['failed']} "
+            f"rate={rate:.1f} msg/s"
+        )
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.mail import MailOutboxWorker
+
+
+class Command(BaseCommand):
+    help = "Send queued outbound emails over a persistent SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit.")
+        parser.add_argument("--batch-size", type=int, help="Emails claimed per transaction.")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to wait between polls.")
+
+    def handle(self, *args, **options):
+        worker = MailOutboxWorker.from_settings(batch_size=options["batch_size"])
+
+        if options["once"]:
+            try:
+                sent = worker.drain()
+
+            finally:
+                worker.close()
+
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails"))
+            return
+
+        poll_interval = options["poll_interval"] or getattr(settings, "EMAIL_OUTBOX", {}).get("POLL_INTERVAL", 2)
+        worker.run_forever(poll_interval=poll_interval)
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from coreapp.sessions.sweeper import ExpiredSessionSweeper
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired rows from django_session in small batches ordered by expire_date, "
+        "throttled and pausing while replicas are lagging."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Sweep what is expired now and exit.")
+        parser.add_argument("--batch-size", type=int, help="Sessions deleted per statement.")
+        parser.add_argument("--sleep", type=float, help="Minimum seconds to pause between batches.")
+        parser.add_argument("--max-rows-per-second", type=int, help="Upper bound on the delete rate.")
+        parser.add_argument("--max-lag", type=float, help="Wait while replication lag exceeds this many seconds.")
+        parser.add_argument("--poll-interval", type=float, help="Seconds to wait between sweeps.")
+        parser.add_argument("--status", action="store_true", help="Show the metrics of the last or running sweep.")
+
+    def handle(self, *args, **options):
+        if options["status"]:
+            progress = ExpiredSessionSweeper.progress()
+            if progress is None:
+                self.stdout.write("No sweep has run yet.")
+            else:
+                self.stdout.write(" ".join(f"{key}={value}" for key, value in progress.items()))
+            return
+
+        sweeper = ExpiredSessionSweeper.from_settings(
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            max_rows_per_second=options["max_rows_per_second"],
+            max_lag=options["max_lag"],
+        )
+
+        def log(stats):
+            if options["verbosity"] > 1:
+                self.stdout.write(
+                    f"batch={stats['batches']} deleted={stats['deleted']} rate={stats['rate']:.1f} rows/s "
+                    f"throttle_wait={stats['throttle_wait']:.1f}s lag_wait={stats['lag_wait']:.1f}s"
+                )
+
+        if options["once"]:
+            stats = sweeper.run_until_stopped(log)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"deleted={stats['deleted']} batches={stats['batches']} elapsed={stats['elapsed']:.1f}s "
+                    f"rate={stats['rate']:.1f} rows/s lag_wait={stats['lag_wait']:.1f}s"
+                )
+            )
+            return
+
+        poll_interval = options["poll_interval"] or getattr(settings, "SESSION_SWEEPER", {}).get("POLL_INTERVAL", 60)
+        sweeper.run_forever(poll_interval=poll_interval, log=log)
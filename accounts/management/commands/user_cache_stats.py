@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.cache import user_cache
+
+
+class Command(BaseCommand):
+    help = "Show request.user cache hit/miss counters shared by all workers."
+
+    def handle(self, *args, **options):
+        shared = user_cache.stats()["shared"]
+        total = shared["hits"] + shared["misses"]
+        ratio = shared["hits"] / total if total else 0.0
+
+        self.stdout.write(f"hits={shared['hits']} misses={shared['misses']} hit_ratio={ratio:.2%}")
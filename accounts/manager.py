@@ -1,15 +1,58 @@
+import time
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import IntegrityError, models, transaction
+
+from . import hashing
+from .cache import user_cache
 
 
 class CustomUserManager(BaseUserManager):
+    """
+    이메일 조회는 모두 canonical_email() 로 정규화한 값으로 email 의 unique 인덱스를 탄다.
+    (저장할 때도 CustomUser.save() 가 같은 형태로 정규화한다.)
+    iexact 는 DB collation 에 따라 인덱스를 못 쓸 수 있으므로 사용하지 않는다.
+    """
 
     use_in_migrations = True
 
+    @classmethod
+    def canonical_email(cls, email):
+        if email is None:
+            return None
+
+        return email.strip().lower()
+
+    def filter_by_email(self, email):
+        return self.filter(email=self.canonical_email(email))
+
+    def get_by_email(self, email):
+        return self.filter_by_email(email).first()
+
+    async def aget_by_email(self, email):
+        return await self.filter_by_email(email).afirst()
+
+    def email_exists(self, email):
+        return self.filter_by_email(email).exists()
+
+    async def aemail_exists(self, email):
+        return await self.filter_by_email(email).aexists()
+
+    def get_by_natural_key(self, username):
+        # admin 로그인 / authenticate() 도 같은 정규화를 거친다.
+        return self.get(email=self.canonical_email(username))
+
+    async def aget_by_natural_key(self, username):
+        return await self.aget(email=self.canonical_email(username))
+
     def create_user(self, email, password=None, **extra_fields):
-        email = self.normalize_email(email)
+        email = self.canonical_email(email)
         user = self.model(email=email, **extra_fields)
 
-        user.set_password(password)
+        hashing.set_password(user, password)
         user.save(using=self._db)
 
         return user
@@ -21,3 +64,170 @@ class CustomUserManager(BaseUserManager):
         extra_fields.setdefault("username", "admin")
 
         return self.create_user(email, password, **extra_fields)
+
+    def create_social_user(self, email, username, social_type):
+        """
+        소셜 회원을 INSERT 한 번으로 만든다. (활성화, 이메일 인증, 사용 불가 비밀번호까지 같이 설정)
+
+        같은 사용자의 콜백이 동시에 들어와서 먼저 INSERT 된 경우에는 그 사용자를 다시 읽어서 돌려주고,
+        이미 다른 가입 방식(social_type)으로 쓰이는 이메일이면 None 을 돌려준다.
+        """
+        user = self.model(
+            email=email,
+            username=username,
+            social_type=social_type,
+            is_active=True,
+            email_is_verified=True,
+        )
+        user.set_unusable_password()
+
+        try:
+            with transaction.atomic(using=self._db):
+                user.save(force_insert=True, using=self._db)
+
+        except IntegrityError:
+            return self.filter_by_email(email).filter(social_type=social_type).first()
+
+        return user
+
+    async def acreate_social_user(self, email, username, social_type):
+        # transaction.atomic 은 async 에서 쓸 수 없으므로 스레드에서 실행한다.
+        return await sync_to_async(self.create_social_user)(email, username, social_type)
+
+
+def normalize_stored_emails(model, chunk_size=1000, sleep=0.0, dry_run=False, log=None):
+    """
+    save() 를 거치지 않고 들어간 대소문자 섞인 이메일을 pk 순서로 chunk_size 개씩 정규화한다.
+
+    - 한 chunk 씩 따로 커밋되므로 서비스 중에도 돌릴 수 있고, sleep 으로 chunk 사이에 쉬어갈 수 있다.
+    - MySQL 의 기본 collation 은 대소문자를 구분하지 않아서 DB 에서 email <> LOWER(email) 로 거를 수 없으므로,
+      email 만 읽어서 Python 에서 비교한다.
+    - 정규화한 값이 이미 다른 회원의 이메일이면 건드리지 않고 conflicts 에 남긴다.
+    """
+    manager = model._default_manager
+    stats = {"scanned": 0, "updated": 0, "conflicts": []}
+    last_pk = 0
+
+    while True:
+        rows = list(manager.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "email")[:chunk_size])
+        if not rows:
+            break
+
+        last_pk = rows[-1][0]
+        stats["scanned"] += len(rows)
+
+        for pk, email in rows:
+            normalized = CustomUserManager.canonical_email(email)
+            if normalized == email:
+                continue
+
+            if manager.filter(email=normalized).exclude(pk=pk).exists():
+                stats["conflicts"].append((pk, email))
+                continue
+
+            if dry_run or manager.filter(pk=pk, email=email).update(email=normalized):
+                stats["updated"] += 1
+
+                if not dry_run:
+                    # update() 는 post_save 를 보내지 않으므로 직접 캐시를 비운다.
+                    user_cache.invalidate(pk)
+
+        if log is not None:
+            log(stats)
+
+        if sleep:
+            time.sleep(sleep)
+
+    return stats
+
+
+class SocialIdentityManager(models.Manager):
+
+    def get_user(self, social_type, provider_user_id):
+        if not provider_user_id:
+            return None
+
+        identity = (
+            self.select_related("user").filter(social_type=social_type, provider_user_id=provider_user_id).first()
+        )
+
+        return identity.user if identity is not None else None
+
+    async def aget_user(self, social_type, provider_user_id):
+        if not provider_user_id:
+            return None
+
+        identity = await (
+            self.select_related("user").filter(social_type=social_type, provider_user_id=provider_user_id).afirst()
+        )
+
+        return identity.user if identity is not None else None
+
+    def link(self, user, social_type, provider_user_id):
+        """
+        회원과 provider 식별자를 연결한다. 이미 연결되어 있으면 (동시에 연결된 경우 포함) 그대로 둔다.
+        """
+        if not provider_user_id:
+            return None
+
+        identity, _ = self.get_or_create(
+            social_type=social_type,
+            provider_user_id=provider_user_id,
+            defaults={"user": user},
+        )
+
+        return identity
+
+    async def alink(self, user, social_type, provider_user_id):
+        return await sync_to_async(self.link)(user, social_type, provider_user_id)
+
+
+def _session_store(session_key):
+    return import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+
+
+class UserSessionManager(models.Manager):
+    """
+    회원별 세션 키 색인 (UserSession)
+
+    django_session 에는 회원 컬럼이 없으므로, 로그인/로그아웃 신호로 이 색인을 유지하고
+    "모든 기기에서 로그아웃" 은 색인에 있는 그 회원의 세션만 지운다. (그 회원의 세션 수만큼만 비용이 든다)
+    """
+
+    def register(self, user, session_key):
+        self.update_or_create(session_key=session_key, defaults={"user": user})
+
+    def forget(self, session_key):
+        self.filter(session_key=session_key).delete()
+
+    def rekey(self, user, old_session_key, new_session_key):
+        # update_session_auth_hash 처럼 로그인 신호 없이 세션 키가 바뀐 경우
+        self.forget(old_session_key)
+        self.register(user, new_session_key)
+
+    def revoke(self, user, keep=None):
+        """
+        user 의 세션을 keep 만 남기고 모두 지운다. 지운 세션 수를 돌려준다.
+
+        세션 엔진(cache, cached_db)과 프로세스 로컬 캐시에서 지우며, 다른 워커의 로컬 캐시에는
+        SESSION_LOCAL_CACHE["TTL"] 초 동안 남을 수 있다.
+        """
+        session_keys = list(self.filter(user=user).exclude(session_key=keep).values_list("session_key", flat=True))
+
+        for session_key in session_keys:
+            _session_store(session_key).delete()
+
+        self.filter(session_key__in=session_keys).delete()
+
+        return len(session_keys)
+
+    async def arevoke(self, user, keep=None):
+        queryset = self.filter(user=user).exclude(session_key=keep).values_list("session_key", flat=True)
+        session_keys = [session_key async for session_key in queryset]
+
+        for session_key in session_keys:
+            await _session_store(session_key).adelete()
+
+        await self.filter(session_key__in=session_keys).adelete()
+
+        return len(session_keys)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_outboundemail"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["email", "social_type"], name="user_email_social_type"),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_customuser_email_social_type_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SocialIdentity",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "social_type",
+                    models.CharField(
+                        choices=[("common", "Common"), ("kakao", "Kakao"), ("naver", "Naver"), ("google", "Google")],
+                        max_length=20,
+                    ),
+                ),
+                ("provider_user_id", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="social_identities",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("social_type", "provider_user_id"), name="social_identity_provider_uid"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+CHUNK_SIZE = 1000
+
+
+def normalize_emails(apps, schema_editor):
+    # 회원이 많으면 배포 전에 `manage.py normalize_emails --sleep 0.1` 로 미리 정규화해 두면
+    # 이 단계는 읽기만 하고 지나간다.
+    # 마이그레이션은 앱 코드가 바뀌어도 같게 동작해야 하므로 accounts.manager.normalize_stored_emails 를
+    # 가져오지 않고 이 시점의 정규화(strip + lower)를 그대로 옮겨 둔다. (캐시는 건드리지 않는다)
+    CustomUser = apps.get_model("accounts", "CustomUser")
+    manager = CustomUser._default_manager
+    conflicts = []
+    last_pk = 0
+
+    while True:
+        rows = list(manager.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "email")[:CHUNK_SIZE])
+        if not rows:
+            break
+
+        last_pk = rows[-1][0]
+
+        for pk, email in rows:
+            normalized = email.strip().lower()
+            if normalized == email:
+                continue
+
+            if manager.filter(email=normalized).exclude(pk=pk).exists():
+                conflicts.append((pk, email))
+                continue
+
+            manager.filter(pk=pk, email=email).update(email=normalized)
+
+    if conflicts:
+        raise RuntimeError(
+            "Emails that differ only in case must be merged before adding user_email_lower_unique: "
+            + ", ".join(f"{pk}:{email}" for pk, email in conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    # chunk 마다 따로 커밋한다.
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0009_socialidentity"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="customuser",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"), name="user_email_lower_unique"
+            ),
+        ),
+    ]
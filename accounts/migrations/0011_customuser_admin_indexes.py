@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_normalize_customuser_email"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["username"], name="user_username"),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(
+                fields=["social_type", "is_active", "email_is_verified"], name="user_admin_social_active"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["is_active", "email_is_verified"], name="user_admin_active_verified"),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["is_superuser"], name="user_admin_superuser"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0011_customuser_admin_indexes"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="customuser",
+            index=models.Index(fields=["deleted_at"], name="user_deleted_at"),
+        ),
+    ]
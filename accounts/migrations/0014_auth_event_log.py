@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0013_user_session_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("login", "Login"),
+                            ("login_failed", "Login failed"),
+                            ("register", "Register"),
+                            ("activate", "Activate"),
+                            ("password_reset", "Password reset"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                ("email", models.CharField(blank=True, max_length=254)),
+                ("ip", models.GenericIPAddressField(blank=True, null=True)),
+                ("social_type", models.CharField(blank=True, max_length=20)),
+                ("created_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user_id", "created_at"], name="auth_event_user_created"),
+                    models.Index(fields=["event", "created_at"], name="auth_event_event_created"),
+                    models.Index(fields=["created_at"], name="auth_event_created"),
+                ],
+            },
+        ),
+    ]
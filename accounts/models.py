@@ -1,7 +1,15 @@
 from django.contrib.auth.models import AbstractUser, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
 
-from .manager import CustomUserManager
+from asgiref.sync import sync_to_async
+
+from .manager import CustomUserManager, SocialIdentityManager, UserSessionManager
+
+
+# 탈퇴한 회원의 이메일을 바꿔 둘 도메인 (.invalid 는 메일을 보낼 수 없는 예약 TLD)
+DELETED_EMAIL_DOMAIN = "deleted.invalid"
 
 
 class CustomUser(AbstractUser, PermissionsMixin):
@@ -25,6 +33,8 @@ class CustomUser(AbstractUser, PermissionsMixin):
     is_superuser = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=False)
+    # 탈퇴 시각. 값이 있으면 accounts.purge.DeletedUserPurger 가 실제로 삭제한다.
+    deleted_at = models.DateTimeField(null=True, blank=True)
 
     EMAIL_FIELD = "email"
     USERNAME_FIELD = "email"
@@ -32,9 +42,165 @@ class CustomUser(AbstractUser, PermissionsMixin):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # 소셜 로그인 조회 (accounts.services.social_login_or_register)
+            models.Index(fields=["email", "social_type"], name="user_email_social_type"),
+            # admin 접두어 검색 (CustomUserAdmin.search_fields)
+            models.Index(fields=["username"], name="user_username"),
+            # admin list_filter 조합. InnoDB 보조 인덱스는 끝에 pk 를 포함하므로
+            # 필터를 고정한 뒤 changelist 기본 정렬(-pk) 도 인덱스 순서로 읽는다.
+            models.Index(fields=["social_type", "is_active", "email_is_verified"], name="user_admin_social_active"),
+            models.Index(fields=["is_active", "email_is_verified"], name="user_admin_active_verified"),
+            models.Index(fields=["is_superuser"], name="user_admin_superuser"),
+            # 탈퇴 회원 실제 삭제 (DeletedUserPurger)
+            models.Index(fields=["deleted_at"], name="user_deleted_at"),
+        ]
+        constraints = [
+            # save() 를 거치지 않는 쓰기(bulk_create, update)에서도 대소문자만 다른 이메일이 생기지 않도록 막는다.
+            models.UniqueConstraint(Lower("email"), name="user_email_lower_unique"),
+        ]
+
     def save(self, *args, **kwargs):
-        self.email = self.email.lower()
+        self.email = CustomUserManager.canonical_email(self.email)
         super().save(*args, **kwargs)
 
+    def get_session_auth_hash(self):
+        # user_cache 에서 꺼낸 사용자는 password 없이 미리 계산해 둔 값을 쓴다.
+        # 비밀번호를 읽거나 바꿔서 password 가 로드되면 그 값으로 다시 계산한다.
+        if "password" not in self.__dict__ and hasattr(self, "_session_auth_hash"):
+            return self._session_auth_hash
+
+        return super().get_session_auth_hash()
+
+    def soft_delete(self):
+        """
+        회원 탈퇴: 계정을 바로 숨기고, 회원이 가진 데이터의 삭제는 DeletedUserPurger 에 맡긴다.
+
+        - 이메일을 tombstone 주소로 바꾸고 소셜 연결을 지우므로 이메일/소셜 로그인으로 더 이상 찾을 수 없고,
+          같은 이메일로 바로 다시 가입할 수 있다.
+        - 다른 기기의 세션은 UserSession 색인으로 바로 지운다. 색인에 없는 세션도 is_active=False 와
+          사용할 수 없는 비밀번호 때문에 다음 요청에서 끊긴다. (EmailBackend.get_user, session auth hash)
+        """
+        with transaction.atomic():
+            self.social_identities.all().delete()
+
+            self.email = f"deleted-{self.pk}@{DELETED_EMAIL_DOMAIN}"
+            self.is_active = False
+            self.deleted_at = timezone.now()
+            self.set_unusable_password()
+            self.save(update_fields=["email", "is_active", "deleted_at", "password"])
+
+        UserSession.objects.revoke(self)
+
+    async def asoft_delete(self):
+        await sync_to_async(self.soft_delete)()
+
     def __str__(self):
         return self.email
+
+
+class SocialIdentity(models.Model):
+    """
+    소셜 provider 의 사용자 식별자(kakao id, google sub, naver id) -> CustomUser 연결
+
+    provider 가 이메일을 주지 않거나 바꿔도 같은 회원으로 로그인되도록,
+    소셜 로그인은 이메일 대신 (social_type, provider_user_id) 로 회원을 찾는다.
+    """
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="social_identities")
+    social_type = models.CharField(max_length=20, choices=CustomUser.SocialChoices.choices)
+    provider_user_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SocialIdentityManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["social_type", "provider_user_id"], name="social_identity_provider_uid"),
+        ]
+
+    def __str__(self):
+        return f"{self.social_type}:{self.provider_user_id} -> {self.user_id}"
+
+
+class UserSession(models.Model):
+    """
+    회원 -> 세션 키 색인 ("모든 기기에서 로그아웃", 비밀번호/이메일 변경 시 다른 세션 끊기)
+
+    user_logged_in / user_logged_out 신호로 유지한다. (accounts.signals)
+    """
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="sessions")
+    session_key = models.CharField(max_length=40, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = UserSessionManager()
+
+    def __str__(self):
+        return f"{self.user_id}: {self.session_key}"
+
+
+class OutboundEmail(models.Model):
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(
+        max_length=10,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_attempt"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class AuthEvent(models.Model):
+    """
+    인증 이벤트 감사 로그 (append-only)
+
+    accounts.events.auth_events 가 메모리에 모았다가 bulk_create 한다. 회원이 삭제되어도 기록은 남도록
+    user 는 FK 가 아닌 id 로만 저장한다.
+    """
+
+    class EventChoices(models.TextChoices):
+        LOGIN = "login", "Login"
+        LOGIN_FAILED = "login_failed", "Login failed"
+        REGISTER = "register", "Register"
+        ACTIVATE = "activate", "Activate"
+        PASSWORD_RESET = "password_reset", "Password reset"
+
+    event = models.CharField(max_length=20, choices=EventChoices.choices)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+    ip = models.GenericIPAddressField(null=True, blank=True)
+    social_type = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "created_at"], name="auth_event_user_created"),
+            models.Index(fields=["event", "created_at"], name="auth_event_event_created"),
+            models.Index(fields=["created_at"], name="auth_event_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.created_at:%Y-%m-%d %H:%M:%S} {self.event} {self.email or self.user_id}"
@@ -1,7 +1,19 @@
 from rest_framework.permissions import BasePermission
 
 
-class IsEmailVerified(BasePermission):
+class AsyncPermission(BasePermission):
+    """
+    async 뷰(accounts.decorators.async_api_view) 에서 쓰는 ahas_permission 을 추가한 BasePermission
+
+    async 뷰에서는 request.user 를 await request.auser() 로 먼저 채워두므로,
+    여기서는 DB 조회 없이 속성만 확인한다.
+    """
+
+    async def ahas_permission(self, request, view):
+        return self.has_permission(request, view)
+
+
+class IsEmailVerified(AsyncPermission):
     message = (
         "Your email is not verified. Please verify your email to access this resource."
     )
@@ -10,14 +22,14 @@ class IsEmailVerified(BasePermission):
         return request.user and request.user.email_is_verified
 
 
-class IsCommonUser(BasePermission):
+class IsCommonUser(AsyncPermission):
     message = "Your account is social account. You can't change email or password."
 
     def has_permission(self, request, view):
         return request.user.social_type == "common"
 
 
-class IsLoggedIn(BasePermission):
+class IsLoggedIn(AsyncPermission):
     message = "Your account is logged in."
 
     def has_permission(self, request, view):
@@ -0,0 +1,213 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from coreapp.db import wait_for_replication
+
+from .models import CustomUser
+
+
+class UserPurger:
+    """
+    회원을 pk 순서로 조금씩 지우는 작업의 공통 부분 (InactiveUserPurger, DeletedUserPurger)
+
+    - candidates(cutoff) 에 해당하는 회원을 batch_size 명씩 keyset pagination 하고, batch 마다 따로 커밋한다.
+    - 삭제는 Collector 를 거치므로 관련 행도 같은 트랜잭션에서 지워지고 post_delete 로 user_cache 도 비워진다.
+    - batch 가 max_batch_seconds 보다 오래 걸리면 batch 크기를 줄이고, 빠르면 처음 크기까지 다시 늘린다.
+    - batch 사이에 sleep 초 쉬고, 복제 지연이 max_lag 초를 넘으면 줄어들 때까지 기다린다.
+    - 진행 상황은 cache 의 progress_cache_key 에 남겨서 다른 프로세스에서 볼 수 있다. (--status)
+    """
+
+    settings_name = None
+    progress_cache_key = None
+
+    def __init__(self, batch_size=500, sleep=0.5, max_lag=5, max_batch_seconds=0.5, dry_run=False):
+        self.max_batch_size = batch_size
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.max_lag = max_lag
+        self.max_batch_seconds = max_batch_seconds
+        self.dry_run = dry_run
+
+        self._stopped = False
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        config = {key.lower(): value for key, value in getattr(settings, cls.settings_name, {}).items()}
+        config.pop("poll_interval", None)
+        config.update({key: value for key, value in overrides.items() if value is not None})
+
+        return cls(**config)
+
+    @classmethod
+    def progress(cls):
+        return cache.get(cls.progress_cache_key)
+
+    def get_cutoff(self):
+        raise NotImplementedError
+
+    def candidates(self, cutoff):
+        raise NotImplementedError
+
+    def purge_batch(self, cutoff, last_pk):
+        """
+        last_pk 다음부터 batch_size 명을 지운다. (찾은 pk 목록, 지운 회원 수, 같이 지운 관련 행 수) 를 돌려준다.
+        """
+        pks = list(
+            self.candidates(cutoff)
+            .filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[: self.batch_size]
+        )
+
+        if not pks or self.dry_run:
+            return pks, len(pks), 0
+
+        with transaction.atomic():
+            # 조회와 삭제 사이에 활성화한 회원은 조건을 다시 걸어서 빼낸다.
+            total, per_model = self.candidates(cutoff).filter(pk__in=pks).delete()
+
+        deleted = per_model.get(CustomUser._meta.label, 0)
+        return pks, deleted, total - deleted
+
+    def adjust_batch_size(self, seconds):
+        if seconds > self.max_batch_seconds and self.batch_size > 1:
+            self.batch_size = max(1, self.batch_size // 2)
+
+        elif seconds < self.max_batch_seconds / 4:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+
+    def publish(self, stats):
+        cache.set(self.progress_cache_key, stats, None)
+
+    def stop(self, *args):
+        self._stopped = True
+
+    def run(self, log=None):
+        cutoff = self.get_cutoff()
+        started_at = time.monotonic()
+        stats = {
+            "dry_run": self.dry_run,
+            "cutoff": cutoff.isoformat(),
+            "started_at": timezone.now().isoformat(),
+            "finished": False,
+            "batches": 0,
+            "deleted": 0,
+            "related_deleted": 0,
+            "last_pk": 0,
+            "batch_size": self.batch_size,
+            "slowest_batch": 0.0,
+            "lag_wait": 0.0,
+            "elapsed": 0.0,
+            "rate": 0.0,
+        }
+
+        while not self._stopped:
+            batch_started_at = time.monotonic()
+            pks, deleted, related = self.purge_batch(cutoff, stats["last_pk"])
+            seconds = time.monotonic() - batch_started_at
+
+            if not pks:
+                break
+
+            stats["batches"] += 1
+            stats["deleted"] += deleted
+            stats["related_deleted"] += related
+            stats["last_pk"] = pks[-1]
+            stats["slowest_batch"] = max(stats["slowest_batch"], seconds)
+
+            self.adjust_batch_size(seconds)
+            stats["batch_size"] = self.batch_size
+
+            if not self.dry_run:
+                if self.sleep:
+                    time.sleep(self.sleep)
+
+                stats["lag_wait"] += wait_for_replication(self.max_lag, should_stop=lambda: self._stopped)
+
+            stats["elapsed"] = time.monotonic() - started_at
+            stats["rate"] = stats["deleted"] / stats["elapsed"] if stats["elapsed"] else 0.0
+            self.publish(stats)
+
+            if log is not None:
+                log(stats)
+
+        stats["finished"] = not self._stopped
+        stats["elapsed"] = time.monotonic() - started_at
+        stats["rate"] = stats["deleted"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        self.publish(stats)
+
+        return stats
+
+    def run_until_stopped(self, log=None):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        return self.run(log)
+
+    def run_forever(self, poll_interval=10, log=None):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self._stopped:
+            self.run(log)
+            time.sleep(poll_interval)
+
+
+class InactiveUserPurger(UserPurger):
+    """
+    가입 후 이메일 인증(계정 활성화)을 하지 않은 회원 정리 (manage.py purge_inactive_users)
+
+    - 대상: is_active=False, email_is_verified=False, 로그인한 적 없음, 일반 회원, 가입 후 inactive_days 경과
+      (이메일 변경 중인 회원은 is_active=True 라서 대상이 아니다)
+    - 조건은 (is_active, email_is_verified) 인덱스로 찾으므로 batch 하나가 잡는 락은 그 행들 뿐이다.
+    - 활성화하지 않은 회원은 로그인할 수 없으므로 세션은 없다.
+    """
+
+    settings_name = "ACCOUNT_PURGE"
+    progress_cache_key = "accounts:purge:progress"
+
+    def __init__(self, inactive_days=7, **kwargs):
+        super().__init__(**kwargs)
+        self.inactive_days = inactive_days
+
+    def get_cutoff(self):
+        return timezone.now() - timedelta(days=self.inactive_days)
+
+    def candidates(self, cutoff):
+        return CustomUser.objects.filter(
+            is_active=False,
+            email_is_verified=False,
+            last_login__isnull=True,
+            is_staff=False,
+            is_superuser=False,
+            date_joined__lt=cutoff,
+            deleted_at__isnull=True,
+        )
+
+
+class DeletedUserPurger(UserPurger):
+    """
+    탈퇴한 회원(CustomUser.soft_delete)의 실제 삭제 (manage.py hard_delete_users)
+
+    탈퇴 요청은 계정을 숨기기만 하고, 그룹/권한/admin 로그 등 회원이 가진 데이터의 cascade 삭제는
+    이 워커가 batch 단위로 나눠서 한다. 탈퇴 후 grace_seconds 가 지난 회원만 지운다.
+    """
+
+    settings_name = "ACCOUNT_HARD_DELETE"
+    progress_cache_key = "accounts:hard_delete:progress"
+
+    def __init__(self, grace_seconds=0, **kwargs):
+        super().__init__(**kwargs)
+        self.grace_seconds = grace_seconds
+
+    def get_cutoff(self):
+        return timezone.now() - timedelta(seconds=self.grace_seconds)
+
+    def candidates(self, cutoff):
+        return CustomUser.objects.filter(deleted_at__isnull=False, deleted_at__lte=cutoff)
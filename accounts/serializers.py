@@ -1,11 +1,69 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.serializers import as_serializer_error
 
+from . import hashing
+from .backends import EmailBackend
 from .models import CustomUser
 
 import re
 
 
+class AsyncValidationMixin:
+    """
+    async 뷰에서 쓰는 is_valid() / save() 대응 (ais_valid / asave)
+
+    필드 검증(to_internal_value, validators)은 DB 를 쓰지 않으므로 그대로 하고,
+    DB 조회나 비밀번호 검증이 있는 validate() / create() / update() 대신
+    avalidate() / acreate() / aupdate() 를 await 한다.
+    """
+
+    async def avalidate(self, data):
+        return self.validate(data)
+
+    async def arun_validation(self, data=empty):
+        (is_empty_value, data) = self.validate_empty_values(data)
+        if is_empty_value:
+            return data
+
+        value = self.to_internal_value(data)
+        try:
+            self.run_validators(value)
+            value = await self.avalidate(value)
+
+        except (ValidationError, DjangoValidationError) as exc:
+            raise ValidationError(detail=as_serializer_error(exc))
+
+        return value
+
+    async def ais_valid(self):
+        if not hasattr(self, "_validated_data"):
+            try:
+                self._validated_data = await self.arun_validation(self.initial_data)
+
+            except ValidationError as exc:
+                self._validated_data = {}
+                self._errors = exc.detail
+
+            else:
+                self._errors = {}
+
+        return not bool(self._errors)
+
+    async def asave(self, **kwargs):
+        validated_data = {**self.validated_data, **kwargs}
+
+        if self.instance is not None:
+            self.instance = await self.aupdate(self.instance, validated_data)
+        else:
+            self.instance = await self.acreate(validated_data)
+
+        return self.instance
+
+
 class PasswordValidate(serializers.Serializer):
 
     def validate(self, data):
@@ -60,7 +118,7 @@ class UserSerializer(serializers.ModelSerializer):
         ]
 
 
-class UserRegisterSerializer(PasswordValidate, serializers.ModelSerializer):
+class UserRegisterSerializer(AsyncValidationMixin, PasswordValidate, serializers.ModelSerializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
     password2 = serializers.CharField(write_only=True)
@@ -85,7 +143,7 @@ class UserRegisterSerializer(PasswordValidate, serializers.ModelSerializer):
     def validate(self, data):
         super().validate(data)
 
-        if CustomUser.objects.filter(email=data["email"]).exists():
+        if CustomUser.objects.email_exists(data["email"]):
             raise ValidationError({"message": "Email already taken!"})
 
         return data
@@ -93,13 +151,29 @@ class UserRegisterSerializer(PasswordValidate, serializers.ModelSerializer):
     def create(self, validated_data):
         password = validated_data.pop("password")
         validated_data.pop("password2")
-        user = CustomUser.objects.create(**validated_data)
-        user.set_password(password)
+        user = CustomUser(**validated_data)
+        hashing.set_password(user, password)
         user.save()
         return user
 
+    async def avalidate(self, data):
+        super().validate(data)
 
-class UserLoginSerializer(serializers.Serializer):
+        if await CustomUser.objects.aemail_exists(data["email"]):
+            raise ValidationError({"message": "Email already taken!"})
+
+        return data
+
+    async def acreate(self, validated_data):
+        password = validated_data.pop("password")
+        validated_data.pop("password2")
+        user = CustomUser(**validated_data)
+        await hashing.aset_password(user, password)
+        await user.asave()
+        return user
+
+
+class UserLoginSerializer(AsyncValidationMixin, serializers.Serializer):
 
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
@@ -108,28 +182,48 @@ class UserLoginSerializer(serializers.Serializer):
         email = data["email"]
         password = data["password"]
 
-        try:
-            user = CustomUser.objects.get(email=email)
+        user = EmailBackend.get_user_by_email(email)
 
-        except CustomUser.DoesNotExist:
+        if user is None:
             raise ValidationError({"message": "Email doesn't exist!"})
 
         if not user.is_active:
             raise ValidationError({"message": "User is not active!"})
 
-        if not user.check_password(password):
+        if not hashing.check_password(user, password):
             raise ValidationError({"message": "Invalid password"})
 
+        data["user"] = user
+
+        return data
+
+    async def avalidate(self, data):
+        email = data["email"]
+        password = data["password"]
+
+        user = await EmailBackend.aget_user_by_email(email)
+
+        if user is None:
+            raise ValidationError({"message": "Email doesn't exist!"})
+
+        if not user.is_active:
+            raise ValidationError({"message": "User is not active!"})
+
+        if not await hashing.acheck_password(user, password):
+            raise ValidationError({"message": "Invalid password"})
+
+        data["user"] = user
+
         return data
 
 
-class UserChangeEmailSerializer(serializers.Serializer):
+class UserChangeEmailSerializer(AsyncValidationMixin, serializers.Serializer):
     old_email = serializers.EmailField()
     new_email = serializers.EmailField()
 
     def validate(self, data):
-        old_email = data["old_email"]
-        new_email = data["new_email"]
+        old_email = CustomUser.objects.canonical_email(data["old_email"])
+        new_email = CustomUser.objects.canonical_email(data["new_email"])
 
         user = self.context["request"].user
 
@@ -139,7 +233,7 @@ class UserChangeEmailSerializer(serializers.Serializer):
         if old_email == new_email:
             raise ValidationError({"message": "Old email and New email must not match"})
 
-        if CustomUser.objects.filter(email=new_email).exists():
+        if CustomUser.objects.email_exists(new_email):
             raise ValidationError({"message": "New Email already taken!"})
 
         return data
@@ -150,8 +244,31 @@ class UserChangeEmailSerializer(serializers.Serializer):
         user.save()
         return user
 
+    async def avalidate(self, data):
+        old_email = CustomUser.objects.canonical_email(data["old_email"])
+        new_email = CustomUser.objects.canonical_email(data["new_email"])
 
-class UserResetPasswordSerializer(PasswordValidate, serializers.Serializer):
+        user = self.context["request"].user
+
+        if user.email != old_email:
+            raise ValidationError({"message": "Email doesn't match"})
+
+        if old_email == new_email:
+            raise ValidationError({"message": "Old email and New email must not match"})
+
+        if await CustomUser.objects.aemail_exists(new_email):
+            raise ValidationError({"message": "New Email already taken!"})
+
+        return data
+
+    async def aupdate(self, user, validated_data):
+        user.email = validated_data.get("new_email")
+        user.email_is_verified = False
+        await user.asave()
+        return user
+
+
+class UserResetPasswordSerializer(AsyncValidationMixin, PasswordValidate, serializers.Serializer):
     old_password = serializers.CharField(write_only=True)
     password = serializers.CharField(write_only=True)
     password2 = serializers.CharField(write_only=True)
@@ -162,7 +279,7 @@ class UserResetPasswordSerializer(PasswordValidate, serializers.Serializer):
 
         user = self.context["request"].user
 
-        if not user.check_password(old_password):
+        if not hashing.check_password(user, old_password):
             raise ValidationError({"message": "Invalid password"})
 
         if old_password == data["password"] or old_password == data["password2"]:
@@ -173,28 +290,40 @@ class UserResetPasswordSerializer(PasswordValidate, serializers.Serializer):
         return data
 
     def update(self, user, validated_data):
-        user.set_password(validated_data.get("password"))
+        hashing.set_password(user, validated_data.get("password"))
         user.save()
         return user
 
+    async def avalidate(self, data):
+        super().validate(data)
+        old_password = data["old_password"]
+
+        user = self.context["request"].user
+
+        if not await hashing.acheck_password(user, old_password):
+            raise ValidationError({"message": "Invalid password"})
+
+        if old_password == data["password"] or old_password == data["password2"]:
+            raise ValidationError(
+                {"message": "New password cannot be the same as the old password."}
+            )
+
+        return data
+
+    async def aupdate(self, user, validated_data):
+        await hashing.aset_password(user, validated_data.get("password"))
+        await user.asave()
+        return user
+
 
 class SocialRegisterSerializer(serializers.Serializer):
+    """
+    provider 에서 받은 사용자 정보의 형식만 검증한다.
+    이메일 중복 확인과 생성은 CustomUser.objects.create_social_user 가 INSERT 한 번으로 처리한다.
+    """
+
     email = serializers.EmailField()
     username = serializers.CharField()
     social_type = serializers.ChoiceField(
         choices=CustomUser.SocialChoices.choices,
     )
-
-    def validate(self, data):
-        if CustomUser.objects.filter(email=data["email"]).exists():
-            raise ValidationError({"message": "Email already taken!"})
-
-        return data
-
-    def create(self, validated_data):
-        user = CustomUser.objects.create(**validated_data)
-        user.is_active = True
-        user.email_is_verified = True
-        user.set_unusable_password()
-        user.save()
-        return user
@@ -1,34 +1,78 @@
+import asyncio
+import json
+import threading
+import time
 from abc import abstractmethod
+from collections import deque
 
+import aiohttp
 import requests
-from django.contrib.auth import login
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import alogin, aupdate_session_auth_hash, login, update_session_auth_hash
 from django.core import signing
-from django.core.signing import TimestampSigner, SignatureExpired
+from django.core.signing import SignatureExpired
+from django.http import HttpResponseNotAllowed, JsonResponse
 
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from accounts.models import CustomUser
+from accounts.events import auth_events
+from accounts.models import CustomUser, SocialIdentity, UserSession
 from accounts.permissions import IsLoggedIn
 from accounts.serializers import SocialRegisterSerializer
+from accounts.tokens import email_token_generator
 from coreapp.settings.development import GOOGLE_CONFIG
 
+# 다른 가입 방식으로 이미 쓰이는 이메일 (SocialRegisterSerializer 검증 오류와 같은 형식)
+EMAIL_TAKEN_ERROR = {"message": ["Email already taken!"]}
+
+
+def revoke_other_sessions(request, user, password_changed=False):
+    """
+    비밀번호/이메일 변경 후 현재 세션만 남기고 그 회원의 다른 세션을 모두 끊는다. 끊은 세션 수를 돌려준다.
+
+    비밀번호를 바꾼 경우 현재 세션은 새 session auth hash 로 갱신해서 로그인 상태를 유지한다.
+    (update_session_auth_hash 가 세션 키를 바꾸므로 색인도 옮긴다)
+    """
+    session_key = request.session.session_key
+    revoked = UserSession.objects.revoke(user, keep=session_key)
+
+    if password_changed:
+        update_session_auth_hash(request, user)
+        UserSession.objects.rekey(user, session_key, request.session.session_key)
+
+    return revoked
+
+
+async def arevoke_other_sessions(request, user, password_changed=False):
+    session_key = request.session.session_key
+    revoked = await UserSession.objects.arevoke(user, keep=session_key)
+
+    if password_changed:
+        await aupdate_session_auth_hash(request, user)
+        await sync_to_async(UserSession.objects.rekey)(user, session_key, request.session.session_key)
+
+    return revoked
+
 
 class CommonDecodeSignerUser:
 
+    # accounts.tokens.EmailTokenGenerator.purposes 중 하나 ("activate", "verify")
+    token_purpose = None
+
     def __init__(self):
         self.code = None
-        self.signer = None
+        self.signer = email_token_generator
         self.user = None
 
     def decode_signer(self, request):
         self.code = request.GET.get("code", "")
-        self.signer = TimestampSigner()
         try:
-            decoded_user_email = signing.loads(self.code)
-            email = self.signer.unsign(decoded_user_email, max_age=60 * 3)
-            self.user = CustomUser.objects.get(email=email)
+            self.user = self.signer.check_token(self.code, self.token_purpose)
 
         except SignatureExpired:
             return Response({"error": "expired time"}, status=status.HTTP_400_BAD_REQUEST)
@@ -43,23 +87,296 @@ class CommonDecodeSignerUser:
         pass
 
 
-def social_login_or_register(request, data, email, social_type, response):
+def social_login_or_register(request, data, email, social_type, response, provider_user_id=None):
+    # provider 식별자로 먼저 찾고, 아직 연결되지 않은 회원만 (email, social_type) 으로 찾는다.
+    user = SocialIdentity.objects.get_user(social_type, provider_user_id)
+
+    if user is None:
+        user = CustomUser.objects.filter_by_email(email).filter(social_type=social_type).first()
+
+        if user is None:
+            serializer = SocialRegisterSerializer(data=data)
+
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            user = CustomUser.objects.create_social_user(**serializer.validated_data)
+
+            if user is None:
+                return Response(EMAIL_TAKEN_ERROR, status=status.HTTP_400_BAD_REQUEST)
+
+            auth_events.record("register", request, user, social_type=social_type)
+
+        # 식별자 테이블이 생기기 전에 가입한 회원은 첫 로그인 때 연결된다.
+        SocialIdentity.objects.link(user, social_type, provider_user_id)
+
+    login(request, user)
+
+    return Response(response, status=status.HTTP_200_OK)
+
+
+async def asocial_login_or_register(request, data, email, social_type, response, provider_user_id=None):
+    user = await SocialIdentity.objects.aget_user(social_type, provider_user_id)
+
+    if user is None:
+        user = await CustomUser.objects.filter_by_email(email).filter(social_type=social_type).afirst()
+
+        if user is None:
+            serializer = SocialRegisterSerializer(data=data)
+
+            if not serializer.is_valid():
+                return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            user = await CustomUser.objects.acreate_social_user(**serializer.validated_data)
+
+            if user is None:
+                return JsonResponse(EMAIL_TAKEN_ERROR, status=status.HTTP_400_BAD_REQUEST)
+
+            await auth_events.arecord("register", request, user, social_type=social_type)
+
+        await SocialIdentity.objects.alink(user, social_type, provider_user_id)
+
+    await alogin(request, user)
+
+    return JsonResponse(response, status=status.HTTP_200_OK)
 
-    if CustomUser.objects.filter(email=email, social_type=social_type).exists():
-        user = CustomUser.objects.get(email=email)
-        login(request, user)
 
-        return Response(response, status=status.HTTP_200_OK)
+class LatencyStats:
 
-    serializer = SocialRegisterSerializer(data=data)
+    def __init__(self, window=1000):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
 
-    if serializer.is_valid():
-        user = serializer.save()
-        login(request, user)
+    def record(self, elapsed, error=False):
+        with self._lock:
+            self.count += 1
+            self.errors += int(error)
+            self.total += elapsed
+            self.max = max(self.max, elapsed)
+            self._recent.append(elapsed)
 
-        return Response(response, status=status.HTTP_200_OK)
+    def percentile(self, samples, percent):
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
 
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._recent)
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "p50_ms": self.percentile(samples, 50) * 1000,
+                "p95_ms": self.percentile(samples, 95) * 1000,
+                "max_ms": self.max * 1000,
+            }
+
+
+class ProviderHTTPClient:
+    """
+    소셜 로그인 provider 별로 하나씩 쓰는 HTTP 클라이언트
+
+    - requests.Session 을 재사용해서 DNS/TCP/TLS 연결을 keep-alive 로 유지한다.
+    - connect/read timeout 을 항상 지정해서 provider 가 멈춰도 워커가 묶이지 않는다.
+    - 재시도는 connect 오류(요청이 전송되지 않은 경우)와 GET 의 5xx 에만 한다.
+      인가 코드는 한 번만 쓸 수 있으므로 토큰 POST 는 응답 대기 중 실패하면 재시도하지 않는다.
+    """
+
+    def __init__(self, provider, pool_size=10, connect_timeout=3, read_timeout=5, retries=2, backoff_factor=0.2):
+        self.provider = provider
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = LatencyStats()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_settings(cls, provider):
+        config = getattr(settings, "SOCIAL_HTTP_CLIENT", {})
+
+        return cls(
+            provider,
+            pool_size=config.get("POOL_SIZE", 10),
+            connect_timeout=config.get("CONNECT_TIMEOUT", 3),
+            read_timeout=config.get("READ_TIMEOUT", 5),
+            retries=config.get("RETRIES", 2),
+            backoff_factor=config.get("BACKOFF_FACTOR", 0.2),
+        )
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        error = True
+
+        try:
+            response = self.session.request(method, url, **kwargs)
+            error = response.status_code >= 500
+            return response
+
+        finally:
+            self.stats.record(time.perf_counter() - start, error=error)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_provider_clients = {}
+_provider_clients_lock = threading.Lock()
+
+
+def get_provider_client(provider):
+    client = _provider_clients.get(provider)
+
+    if client is None:
+        with _provider_clients_lock:
+            client = _provider_clients.get(provider)
+            if client is None:
+                client = _provider_clients[provider] = ProviderHTTPClient.from_settings(provider)
+
+    return client
+
+
+class ProviderResponse:
+    """
+    aiohttp 응답 본문을 읽어둔 객체 (requests.Response 처럼 status_code, json() 을 제공)
+    """
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncProviderHTTPClient:
+    """
+    ProviderHTTPClient 의 asyncio 버전 (aiohttp.ClientSession)
+
+    - 이벤트 루프 하나에서 수천 개의 provider 요청을 동시에 기다릴 수 있다.
+    - 재시도는 connect 오류(요청이 전송되지 않은 경우)에만 한다.
+    """
+
+    def __init__(self, provider, pool_size=1000, connect_timeout=3, read_timeout=5, retries=2, backoff_factor=0.2):
+        self.provider = provider
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.stats = LatencyStats()
+
+        self._session = None
+
+    @classmethod
+    def from_settings(cls, provider):
+        config = getattr(settings, "SOCIAL_HTTP_CLIENT", {})
+
+        return cls(
+            provider,
+            pool_size=config.get("ASYNC_POOL_SIZE", 1000),
+            connect_timeout=config.get("CONNECT_TIMEOUT", 3),
+            read_timeout=config.get("READ_TIMEOUT", 5),
+            retries=config.get("RETRIES", 2),
+            backoff_factor=config.get("BACKOFF_FACTOR", 0.2),
+        )
+
+    @property
+    def session(self):
+        # ClientSession 은 실행 중인 이벤트 루프 안에서 만들어야 한다.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=self.timeout,
+            )
+
+        return self._session
+
+    async def request(self, method, url, **kwargs):
+        start = time.perf_counter()
+        error = True
+
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        provider_response = ProviderResponse(response.status, await response.read())
+                        break
+
+                except aiohttp.ClientConnectorError:
+                    if attempt == self.retries:
+                        raise
+                    await asyncio.sleep(self.backoff_factor * 2**attempt)
+
+            error = provider_response.status_code >= 500
+            return provider_response
+
+        finally:
+            self.stats.record(time.perf_counter() - start, error=error)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# aiohttp.ClientSession 은 생성된 이벤트 루프에서만 쓸 수 있으므로 루프별로 보관한다.
+_async_provider_clients = {}
+
+
+def get_async_provider_client(provider):
+    loop = asyncio.get_running_loop()
+    loop_clients = _async_provider_clients.get(loop)
+
+    if loop_clients is None:
+        loop_clients = _async_provider_clients[loop] = {}
+        for closed_loop in [key for key in _async_provider_clients if key.is_closed()]:
+            del _async_provider_clients[closed_loop]
+
+    client = loop_clients.get(provider)
+    if client is None:
+        client = loop_clients[provider] = AsyncProviderHTTPClient.from_settings(provider)
+
+    return client
+
+
+def provider_stats():
+    stats = {provider: client.stats.snapshot() for provider, client in _provider_clients.items()}
+
+    for loop_clients in list(_async_provider_clients.values()):
+        for provider, client in loop_clients.items():
+            stats[f"{provider} (async)"] = client.stats.snapshot()
+
+    return stats
 
 
 class SocialLogin:
@@ -95,6 +412,7 @@ class SocialLoginCallback:
     permission_classes = (AllowAny, IsLoggedIn)
 
     def __init__(self):
+        self.provider = None
         self.grant_type = None
         self.client_id = None
         self.client_secret = None
@@ -158,7 +476,7 @@ class SocialLoginCallback:
 
     def requests_post_token(self, token_uri, token_request_data, **kwargs):
         try:
-            self.token_response = requests.post(
+            self.token_response = get_provider_client(self.provider).post(
                 token_uri,
                 data=token_request_data,
                 headers=kwargs.get("token_headers"),
@@ -180,7 +498,7 @@ class SocialLoginCallback:
 
     def requests_get_user(self, profile_uri, auth_headers):
         try:
-            self.user_info_response = requests.get(
+            self.user_info_response = get_provider_client(self.provider).get(
                 profile_uri,
                 headers=auth_headers,
             )
@@ -237,3 +555,91 @@ class SocialLoginCallback:
         self.user_data = {"email": email, "username": username, "social_type": social_type}
 
         return self.user_data
+
+
+class AsyncSocialLoginCallback:
+    """
+    소셜 로그인 콜백 뷰(SocialLoginCallback + APIView) 앞에 붙여서 async 로 동작하게 하는 mixin
+
+    - DRF 의 동기 dispatch 대신 async dispatch 를 사용한다. (ASGI 에서 스레드를 점유하지 않음)
+    - provider 호출은 AsyncProviderHTTPClient(aiohttp), DB 조회와 로그인은 async ORM / alogin 을 사용한다.
+    - 사용자 정보 파싱(get_user_fields, get_provider_user_id)과 설정 값은 동기 콜백 뷰의 것을 그대로 쓴다.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = request
+        self.args = args
+        self.kwargs = kwargs
+
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+
+        user = await request.auser()
+        if user.is_authenticated:
+            return JsonResponse({"detail": IsLoggedIn.message}, status=status.HTTP_403_FORBIDDEN)
+
+        return await self.aget(request)
+
+    async def aget(self, request):
+        self.code = request.GET.get("code")
+        if not self.code:
+            return JsonResponse({"error": "Code Not Found"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if self.provider == "naver":
+            self.state = request.GET.get("state")
+            if not self.state:
+                return JsonResponse({"error": "State Not Found"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_info_json = await self.aget_user_info_json(host=self.host, state=self.state)
+            email, username = self.get_user_fields(user_info_json)
+            provider_user_id = self.get_provider_user_id(user_info_json)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, AttributeError) as e:
+            return JsonResponse({"error get user": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = self.get_user_data(email=email, username=username, social_type=self.provider)
+
+        return await asocial_login_or_register(
+            request,
+            data=data,
+            email=email,
+            social_type=self.provider,
+            response=data,
+            provider_user_id=provider_user_id,
+        )
+
+    async def aget_user_info_json(self, **kwargs):
+        self.token_request_data, self.token_headers = self.token_data(
+            grant_type=self.grant_type,
+            client_id=self.client_id,
+            client_secret=self.client_secret,
+            redirect_uri=self.redirect_uri,
+            code=self.code,
+            content_type=self.content_type,
+        )
+
+        # Google
+        if kwargs.get("host"):
+            self.token_request_data["host"] = self.host
+
+        # Naver
+        elif kwargs.get("state"):
+            self.token_request_data["state"] = self.state
+
+        client = get_async_provider_client(self.provider)
+
+        self.token_response = await client.post(
+            self.token_uri,
+            # requests 와 같이 값이 None 인 항목은 보내지 않는다.
+            data={key: value for key, value in self.token_request_data.items() if value is not None},
+            headers={key: value for key, value in self.token_headers.items() if value is not None},
+        )
+
+        self.auth_headers = self.transfer_token(token_response=self.token_response)
+
+        self.user_info_response = await client.get(self.profile_uri, headers=self.auth_headers)
+
+        return self.user_info_json(self.user_info_response)
@@ -0,0 +1,65 @@
+from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from coreapp.sessions.sweeper import sessions_swept
+
+from .cache import user_cache
+from .events import auth_events
+from .hashing import rehash_buffer
+from .last_login import last_login_buffer
+from .models import CustomUser, UserSession
+
+
+@receiver(request_finished)
+def flush_password_rehashes(sender, **kwargs):
+    if len(rehash_buffer):
+        rehash_buffer.flush()
+
+
+@receiver(request_finished)
+def flush_last_logins(sender, **kwargs):
+    last_login_buffer.flush_if_due()
+
+
+@receiver(request_finished)
+def flush_auth_events(sender, **kwargs):
+    auth_events.flush_if_due()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(user_logged_in)
+def index_user_session(sender, request, user, **kwargs):
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        UserSession.objects.register(user, session_key)
+
+
+@receiver(user_logged_out)
+def unindex_user_session(sender, request, user, **kwargs):
+    session_key = getattr(getattr(request, "session", None), "session_key", None)
+    if session_key:
+        UserSession.objects.forget(session_key)
+
+
+@receiver(sessions_swept)
+def unindex_swept_sessions(sender, session_keys, **kwargs):
+    UserSession.objects.filter(session_key__in=session_keys).delete()
+
+
+# 일반/소셜/admin 로그인 모두 user_logged_in 을 거친다.
+@receiver(user_logged_in)
+def record_login(sender, request, user, **kwargs):
+    auth_events.record("login", request, user, social_type=user.social_type)
+
+
+# authenticate() 를 거치는 로그인(admin) 의 실패. API 로그인 실패는 accounts.views 에서 기록한다.
+@receiver(user_login_failed)
+def record_login_failed(sender, credentials, request=None, **kwargs):
+    auth_events.record("login_failed", request, email=credentials.get("email") or credentials.get("username", ""))
@@ -1,3 +1,1469 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core import mail, management
+from django.core.handlers.asgi import ASGIHandler
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+
+import requests
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.test import APIClient
+
+from coreapp.middleware import HealthCheckMiddleware, SessionActivityMiddleware
+from coreapp.paginators import EstimatedCountPaginator
+from coreapp.sessions import local_session_cache
+from coreapp.sessions.sweeper import ExpiredSessionSweeper
+from coreapp.sessions.tiered_db import SessionStore
+
+from .backends import EmailBackend
+from .cache import user_cache
+from .management.commands.loadtest_social_callbacks import FakeProvider
+from .hashing import HashingPoolFull, PasswordHashingPool, rehash_buffer
+from .events import AuthEventLog, JsonlSegmentSink, auth_events
+from .exporters import export_users, iter_user_rows
+from .importers import UserImporter
+from .last_login import LastLoginBuffer, last_login_buffer
+from .manager import normalize_stored_emails
+from .mail import AnnouncementMailer, MailOutboxWorker, enqueue_mail
+from .purge import DeletedUserPurger, InactiveUserPurger
+from .throttling import LocalBucketStore, parse_rate, rate_limit_store
+from .models import AuthEvent, CustomUser, OutboundEmail, SocialIdentity, UserSession
+from .services import AsyncProviderHTTPClient, ProviderHTTPClient, social_login_or_register
+from . import hashing, views
+from .views import AsyncKakaoLoginCallback
+from .tokens import email_token_generator
+
+
+class UserLoginTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.password = "Password1!"
+        self.user = CustomUser.objects.create_user(
+            email="login@example.com",
+            password=self.password,
+            username="login",
+            is_active=True,
+            email_is_verified=True,
+        )
+
+    def test_login_uses_single_user_select_and_single_hash(self):
+        hasher = get_hasher()
+        calls = []
+        verify = hasher.verify
+
+        def counting_verify(password, encoded):
+            calls.append(password)
+            return verify(password, encoded)
+
+        hasher.verify = counting_verify
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse("user_login"),
+                    {"email": self.user.email, "password": self.password},
+                    format="json",
+                )
+        finally:
+            del hasher.verify
+
+        user_selects = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and CustomUser._meta.db_table in query["sql"]
+        ]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(len(user_selects), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.user.pk)
+
+    def test_login_wrong_password(self):
+        response = self.client.post(
+            reverse("user_login"),
+            {"email": self.user.email, "password": "Wrong1!"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_login_email_is_case_insensitive(self):
+        response = self.client.post(
+            reverse("user_login"),
+            {"email": " Login@Example.COM", "password": self.password},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "login@example.com")
+
+    def test_register_rejects_case_variant_email(self):
+        response = self.client.post(
+            reverse("user_register"),
+            {"username": "dup", "email": "LOGIN@example.com", "password": "Password1!", "password2": "Password1!"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"message": ["Email already taken!"]})
+
+
+class NormalizeEmailsTest(TestCase):
+
+    def test_normalizes_legacy_rows_in_chunks(self):
+        users = [CustomUser.objects.create_user(email=f"user{i}@example.com", password=None) for i in range(5)]
+        CustomUser.objects.filter(pk=users[1].pk).update(email="User1@Example.com")
+        CustomUser.objects.filter(pk=users[3].pk).update(email="USER3@EXAMPLE.COM")
+
+        chunks = []
+        stats = normalize_stored_emails(CustomUser, chunk_size=2, log=lambda stats: chunks.append(stats["scanned"]))
+
+        self.assertEqual(stats["scanned"], 5)
+        self.assertEqual(stats["updated"], 2)
+        self.assertEqual(chunks, [2, 4, 5])
+        self.assertEqual(CustomUser.objects.get_by_email("User3@example.com").pk, users[3].pk)
+        self.assertFalse(CustomUser.objects.filter(email="USER3@EXAMPLE.COM").exists())
+
+
+class ImportUsersTest(TestCase):
+
+    def setUp(self):
+        CustomUser.objects.create_user(email="existing@example.com", password=None)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_import_csv(self):
+        password_hash = get_hasher("default").encode("Password1!", "salt1234")
+        path = self.write(
+            "users.csv",
+            "email,username,password,password_hash,is_active\n"
+            "New@Example.com,new,Password1!,,1\n"
+            "new@example.com,dup,,,1\n"
+            "EXISTING@example.com,dup,,,1\n"
+            f"hashed@example.com,hashed,,{password_hash},true\n"
+            "not-an-email,bad,,,1\n",
+        )
+        rejects = os.path.join(self.tmpdir.name, "rejects.jsonl")
+
+        result = UserImporter(batch_size=2, workers=1, rejects_path=rejects).run(path)
+
+        self.assertEqual((result["created"], result["duplicates"], result["rejected"]), (2, 2, 1))
+        self.assertTrue(CustomUser.objects.get(email="new@example.com").check_password("Password1!"))
+        self.assertTrue(CustomUser.objects.get(email="hashed@example.com").check_password("Password1!"))
+        with open(rejects) as f:
+            self.assertEqual(json.loads(f.read())["email"], "not-an-email")
+
+    def test_resume_from_checkpoint(self):
+        path = self.write(
+            "users.jsonl", "".join(json.dumps({"email": f"user{i}@example.com"}) + "\n" for i in range(5))
+        )
+        checkpoint = os.path.join(self.tmpdir.name, "import.ckpt")
+        with open(checkpoint, "w") as f:
+            json.dump({"line": 3, "created": 3, "duplicates": 0, "rejected": 0}, f)
+
+        result = UserImporter(batch_size=2, workers=1, checkpoint_path=checkpoint).run(path, resume=True)
+
+        self.assertEqual((result["created"], result["line"]), (5, 5))
+        self.assertFalse(CustomUser.objects.filter(email="user0@example.com").exists())
+        self.assertTrue(CustomUser.objects.filter(email="user4@example.com").exists())
+        with open(checkpoint) as f:
+            self.assertEqual(json.load(f)["line"], 5)
+
+
+class PurgeInactiveUsersTest(TestCase):
+
+    def setUp(self):
+        old = timezone.now() - timedelta(days=30)
+        self.stale = [CustomUser.objects.create_user(email=f"stale{i}@example.com", password=None) for i in range(5)]
+        SocialIdentity.objects.link(self.stale[0], "kakao", "1")
+        self.recent = CustomUser.objects.create_user(email="recent@example.com", password=None)
+        self.active = CustomUser.objects.create_user(email="active@example.com", password=None, is_active=True)
+        # 이메일 변경 중인 회원은 email_is_verified 가 False 지만 활성 상태다.
+        CustomUser.objects.exclude(pk=self.recent.pk).update(date_joined=old)
+
+    def test_purges_in_batches(self):
+        purger = InactiveUserPurger(inactive_days=7, batch_size=2, sleep=0, max_lag=None)
+        stats = purger.run()
+
+        self.assertEqual((stats["deleted"], stats["related_deleted"], stats["batches"]), (5, 1, 3))
+        self.assertTrue(stats["finished"])
+        self.assertEqual(InactiveUserPurger.progress()["deleted"], 5)
+        self.assertEqual(
+            set(CustomUser.objects.values_list("email", flat=True)), {"recent@example.com", "active@example.com"}
+        )
+        self.assertFalse(SocialIdentity.objects.exists())
+
+    def test_dry_run(self):
+        stats = InactiveUserPurger(inactive_days=7, batch_size=2, sleep=0, max_lag=None, dry_run=True).run()
+
+        self.assertEqual(stats["deleted"], 5)
+        self.assertEqual(CustomUser.objects.count(), 7)
+
+    def test_user_activated_after_lookup_is_kept(self):
+        purger = InactiveUserPurger(inactive_days=7, batch_size=10, sleep=0, max_lag=None)
+        cutoff = timezone.now() - timedelta(days=7)
+        original = purger.candidates
+        calls = []
+
+        def candidates(cutoff):
+            # pk 를 찾은 뒤 삭제 전에 활성화된 경우
+            if calls:
+                CustomUser.objects.filter(pk=self.stale[1].pk).update(is_active=True)
+            calls.append(cutoff)
+            return original(cutoff)
+
+        with mock.patch.object(purger, "candidates", side_effect=candidates):
+            pks, deleted, _ = purger.purge_batch(cutoff, 0)
+
+        self.assertEqual((len(pks), deleted), (5, 4))
+        self.assertTrue(CustomUser.objects.filter(pk=self.stale[1].pk).exists())
+
+
+class SoftDeleteTest(TestCase):
+
+    def setUp(self):
+        self.password = "Password1!"
+        self.user = CustomUser.objects.create_user(
+            email="leaving@example.com", password=self.password, is_active=True, email_is_verified=True
+        )
+        SocialIdentity.objects.link(self.user, "kakao", "42")
+        self.other_device = APIClient()
+
+    def login(self, client):
+        response = client.post(
+            reverse("user_login"), {"email": "leaving@example.com", "password": self.password}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_hides_account_and_ends_sessions(self):
+        client = APIClient()
+        self.login(client)
+        self.login(self.other_device)
+
+        response = client.delete(reverse("user_profile"))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.other_device.get(reverse("user_profile")).status_code, 403)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.deleted_at)
+        self.assertFalse(CustomUser.objects.email_exists("leaving@example.com"))
+        self.assertIsNone(SocialIdentity.objects.get_user("kakao", "42"))
+
+        # 같은 이메일로 바로 다시 가입할 수 있다.
+        CustomUser.objects.create_user(email="leaving@example.com", password=None)
+
+    def test_worker_hard_deletes(self):
+        self.user.soft_delete()
+        CustomUser.objects.create_user(email="stays@example.com", password=None)
+
+        stats = DeletedUserPurger(batch_size=10, sleep=0, max_lag=None).run()
+
+        self.assertEqual(stats["deleted"], 1)
+        self.assertFalse(CustomUser.objects.filter(pk=self.user.pk).exists())
+        self.assertTrue(CustomUser.objects.filter(email="stays@example.com").exists())
+
+
+class UserSessionIndexTest(TestCase):
+
+    def setUp(self):
+        self.password = "Password1!"
+        self.user = CustomUser.objects.create_user(
+            email="sessions@example.com", password=self.password, is_active=True, email_is_verified=True
+        )
+        self.laptop = self.login()
+        self.phone = self.login()
+
+    def login(self):
+        client = APIClient()
+        response = client.post(
+            reverse("user_login"), {"email": "sessions@example.com", "password": self.password}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return client
+
+    def is_logged_in(self, client):
+        return client.get(reverse("user_profile")).status_code == 200
+
+    def test_login_and_logout_keep_index(self):
+        self.assertEqual(UserSession.objects.filter(user=self.user).count(), 2)
+
+        self.phone.post(reverse("user_logout"))
+
+        self.assertEqual(UserSession.objects.filter(user=self.user).count(), 1)
+
+    def test_logout_everywhere(self):
+        response = self.laptop.post(reverse("user_logout_all"))
+
+        self.assertEqual(response.json(), {"success": True, "revoked": 2})
+        self.assertFalse(self.is_logged_in(self.laptop))
+        self.assertFalse(self.is_logged_in(self.phone))
+        self.assertFalse(UserSession.objects.exists())
+
+    def test_reset_password_revokes_other_sessions(self):
+        response = self.laptop.post(
+            reverse("reset_password"),
+            {"old_password": self.password, "password": "NewPassword2@", "password2": "NewPassword2@"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.is_logged_in(self.laptop))
+        self.assertFalse(self.is_logged_in(self.phone))
+        self.assertEqual(
+            list(UserSession.objects.values_list("session_key", flat=True)), [self.laptop.session.session_key]
+        )
+
+    def test_change_email_revokes_other_sessions(self):
+        response = self.laptop.post(
+            reverse("user_change_email"),
+            {"old_email": "sessions@example.com", "new_email": "moved@example.com"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.is_logged_in(self.phone))
+        self.assertEqual(UserSession.objects.count(), 1)
+
+    def test_admin_action(self):
+        admin_user = CustomUser.objects.create_superuser("admin@example.com", "Password1!")
+        self.client.force_login(admin_user)
+
+        response = self.client.post(
+            reverse("admin:accounts_customuser_changelist"),
+            {"action": "logout_everywhere", "_selected_action": [self.user.pk]},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(self.is_logged_in(self.laptop))
+        self.assertFalse(self.is_logged_in(self.phone))
+
+
+class ExpiredSessionSweeperTest(TestCase):
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(email="sweep@example.com", password=None)
+        now = timezone.now()
+
+        for i in range(5):
+            Session.objects.create(
+                session_key=f"expired{i}", session_data="", expire_date=now - timedelta(minutes=i + 1)
+            )
+            UserSession.objects.create(user=user, session_key=f"expired{i}")
+
+        Session.objects.create(session_key="alive", session_data="", expire_date=now + timedelta(minutes=5))
+        UserSession.objects.create(user=user, session_key="alive")
+
+    def test_sweeps_in_batches(self):
+        sweeper = ExpiredSessionSweeper(batch_size=2, sleep=0, max_rows_per_second=None, max_lag=None)
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = sweeper.run()
+
+        self.assertEqual((stats["deleted"], stats["batches"]), (5, 3))
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["alive"])
+        self.assertEqual(list(UserSession.objects.values_list("session_key", flat=True)), ["alive"])
+        self.assertIn("ORDER BY", queries[0]["sql"])
+        self.assertEqual(ExpiredSessionSweeper.progress()["deleted"], 5)
+
+    def test_sessions_extended_during_sweep_keep_their_index(self):
+        sweeper = ExpiredSessionSweeper(batch_size=2, sleep=0, max_rows_per_second=None, max_lag=None)
+        real_delete = QuerySet.delete
+        calls = []
+
+        # 첫 batch (가장 오래된 expired4, expired3) 를 조회한 뒤 삭제하기 전에 두 세션이 연장된다.
+        def extend_then_delete(queryset):
+            if queryset.model is Session and not calls:
+                calls.append(queryset)
+                Session.objects.filter(session_key__in=["expired3", "expired4"]).update(
+                    expire_date=timezone.now() + timedelta(minutes=5)
+                )
+            return real_delete(queryset)
+
+        with mock.patch.object(QuerySet, "delete", autospec=True, side_effect=extend_then_delete):
+            stats = sweeper.run()
+
+        alive = ["alive", "expired3", "expired4"]
+        self.assertEqual(stats["deleted"], 3)
+        self.assertEqual(sorted(Session.objects.values_list("session_key", flat=True)), alive)
+        self.assertEqual(sorted(UserSession.objects.values_list("session_key", flat=True)), alive)
+
+    def test_throttle(self):
+        sweeper = ExpiredSessionSweeper(batch_size=5, sleep=0, max_rows_per_second=10, max_lag=None)
+
+        with mock.patch("coreapp.sessions.sweeper.time.sleep") as sleep:
+            stats = sweeper.run()
+
+        # 5 행을 초당 10 행으로 제한하면 약 0.5 초 쉰다.
+        self.assertAlmostEqual(sleep.call_args[0][0], 0.5, places=1)
+        self.assertAlmostEqual(stats["throttle_wait"], 0.5, places=1)
+
+    def test_clearsessions_uses_sweeper(self):
+        management.call_command("clearsessions")
+
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class UserAdminTest(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser("admin@example.com", "Password1!")
+        self.client.force_login(self.admin)
+        for i in range(3):
+            CustomUser.objects.create_user(email=f"member{i}@example.com", username=f"member{i}", social_type="kakao")
+
+    def test_changelist_prefix_search(self):
+        response = self.client.get(reverse("admin:accounts_customuser_changelist"), {"q": "member1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([user.email for user in response.context["cl"].result_list], ["member1@example.com"])
+
+        # 접두어 검색이라 중간 문자열로는 찾지 않는다.
+        response = self.client.get(reverse("admin:accounts_customuser_changelist"), {"q": "ember1"})
+        self.assertEqual(len(response.context["cl"].result_list), 0)
+
+    def test_export_action_streams_csv(self):
+        response = self.client.post(
+            reverse("admin:accounts_customuser_changelist"),
+            {"action": "export_csv", "_selected_action": list(CustomUser.objects.values_list("pk", flat=True))},
+        )
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "email", "username"])
+        self.assertEqual(len(lines), 5)
+
+    def test_export_keyset_pagination(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(iter_user_rows(chunk_size=2))
+
+        self.assertEqual([row["id"] for row in rows], sorted(CustomUser.objects.values_list("pk", flat=True)))
+        # 4 명을 2 명씩: 두 chunk + 빈 chunk 확인
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("OFFSET", queries[1]["sql"])
+
+        lines = list(export_users(CustomUser.objects.filter(email="member1@example.com"), "jsonl"))
+        self.assertEqual(json.loads(lines[0])["username"], "member1")
+        self.assertNotIn("password", json.loads(lines[0]))
+
+    def test_paginator_uses_estimate_above_threshold(self):
+        queryset = CustomUser.objects.order_by("-pk")
+
+        with mock.patch("coreapp.paginators.estimate_count", return_value=5_000_000):
+            self.assertEqual(EstimatedCountPaginator(queryset, 100, threshold=100_000).count, 5_000_000)
+
+        with mock.patch("coreapp.paginators.estimate_count", return_value=10):
+            self.assertEqual(EstimatedCountPaginator(queryset, 100, threshold=100_000).count, 4)
+
+        # sqlite 는 추정할 수 없으므로 정확한 COUNT(*) 를 한다.
+        self.assertEqual(EstimatedCountPaginator(queryset, 100, threshold=1).count, 4)
+
+
+class PasswordHashingPoolTest(TestCase):
+
+    def test_rejects_when_queue_is_full(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=0)
+        release = threading.Event()
+
+        try:
+            future = pool.submit(release.wait)
+
+            with self.assertRaises(HashingPoolFull):
+                pool.submit(release.wait)
+
+            release.set()
+            future.result(timeout=1)
+            self.assertTrue(pool.submit(lambda: True).result(timeout=1))
+
+        finally:
+            release.set()
+            pool.shutdown()
+
+    def test_timeout_is_reported_as_pool_full(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=1, timeout=0.01)
+        release = threading.Event()
+
+        try:
+            with self.assertRaises(HashingPoolFull):
+                pool.run(release.wait)
+
+            release.set()
+            self.assertTrue(pool.run(lambda: True))
+
+        finally:
+            release.set()
+            pool.shutdown()
+
+    async def test_async_timeout_is_reported_as_pool_full(self):
+        pool = PasswordHashingPool(max_workers=1, max_queue=1, timeout=0.01)
+        release = threading.Event()
+
+        try:
+            with self.assertRaises(HashingPoolFull):
+                await pool.arun(release.wait)
+
+            release.set()
+            self.assertTrue(await pool.arun(lambda: True))
+
+        finally:
+            release.set()
+            pool.shutdown()
+
+
+@override_settings(PASSWORD_HASHERS=["accounts.hashers.CalibratedPBKDF2PasswordHasher"])
+class PasswordRehashTest(TestCase):
+
+    def test_login_upgrades_hash_after_response(self):
+        with override_settings(PASSWORD_HASHER_ITERATIONS=1000):
+            user = CustomUser.objects.create_user(
+                email="rehash@example.com",
+                password="Password1!",
+                is_active=True,
+            )
+
+        client = APIClient()
+
+        with override_settings(PASSWORD_HASHER_ITERATIONS=2000):
+            response = client.post(
+                reverse("user_login"),
+                {"email": user.email, "password": "Password1!"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+
+            rehash_buffer.flush()
+
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
+
+            # 세션 해시가 새 해시 기준으로 만들어져 로그인이 유지된다.
+            user.email_is_verified = True
+            user.save()
+            self.assertEqual(client.get(reverse("user_profile")).status_code, 200)
+
+    def test_flush_skips_password_changed_in_between(self):
+        user = CustomUser.objects.create_user(email="changed@example.com", password="Password1!")
+        rehash_buffer.add(user.pk, "stale-hash", "new-hash")
+
+        self.assertEqual(rehash_buffer.flush(), 0)
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, "new-hash")
+
+    def test_failed_flush_requeues_pending_rehashes(self):
+        user = CustomUser.objects.create_user(email="requeue@example.com", password="Password1!")
+        rehash_buffer.add(user.pk, user.password, "new-hash")
+
+        with (
+            mock.patch.object(type(rehash_buffer), "update_batch", side_effect=RuntimeError("db down")),
+            self.assertLogs("accounts.hashing", "ERROR"),
+        ):
+            self.assertEqual(rehash_buffer.flush(), 0)
+
+        self.assertEqual(len(rehash_buffer), 1)
+        self.assertEqual(rehash_buffer.flush(), 1)
+        user.refresh_from_db()
+        self.assertEqual(user.password, "new-hash")
+
+
+class LastLoginBufferTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email="last-login@example.com", password="Password1!", is_active=True, email_is_verified=True
+        )
+
+    def test_login_defers_update(self):
+        client = APIClient()
+
+        with mock.patch.object(last_login_buffer, "flush_interval", 60), CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                reverse("user_login"), {"email": self.user.email, "password": "Password1!"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries if "last_login" in q["sql"] and "UPDATE" in q["sql"]])
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        last_login_buffer.flush()
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_coalesces_and_keeps_newest(self):
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=100, batch_size=10)
+        other = CustomUser.objects.create_user(email="other@example.com", password=None)
+        now = timezone.now()
+        CustomUser.objects.filter(pk=other.pk).update(last_login=now)
+
+        buffer.add(self.user.pk, now - timedelta(seconds=2))
+        buffer.add(self.user.pk, now - timedelta(seconds=1))
+        buffer.add(self.user.pk, now - timedelta(seconds=3))
+        # DB 에 더 최근 값이 있으면 덮어쓰지 않는다.
+        buffer.add(other.pk, now - timedelta(seconds=10))
+
+        with CaptureQueriesContext(connection) as queries:
+            buffer.flush()
+
+        self.assertEqual(len([q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]), 1)
+        self.user.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.user.last_login, now - timedelta(seconds=1))
+        self.assertEqual(other.last_login, now)
+
+    def test_flush_when_due_or_full(self):
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=2, batch_size=10)
+
+        buffer.add(self.user.pk, timezone.now())
+        buffer.flush_if_due()
+        self.assertEqual(len(buffer), 1)
+
+        buffer.add(self.user.pk + 1, timezone.now())
+        self.assertEqual(len(buffer), 0)
+
+    def test_failed_flush_requeues_and_keeps_newest(self):
+        buffer = LastLoginBuffer(flush_interval=60, max_pending=2, batch_size=10)
+        now = timezone.now()
+        buffer.add(self.user.pk, now - timedelta(seconds=5))
+
+        with (
+            mock.patch.object(LastLoginBuffer, "update_batch", side_effect=RuntimeError("db down")),
+            self.assertLogs("accounts.last_login", "ERROR"),
+        ):
+            # max_pending 에 닿아 add() 안에서 flush 해도 예외가 올라오지 않는다.
+            buffer.add(self.user.pk + 1, now)
+
+        self.assertEqual(len(buffer), 2)
+
+        buffer.add(self.user.pk, now)
+        buffer.flush()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+
+
+class AuthEventLogTest(TestCase):
+
+    def setUp(self):
+        auth_events.flush()
+        AuthEvent.objects.all().delete()
+        self.user = CustomUser.objects.create_user(
+            email="audit@example.com", password="Password1!", is_active=True, email_is_verified=True
+        )
+
+    def test_records_are_buffered_then_bulk_inserted(self):
+        client = APIClient()
+        client.post(reverse("user_login"), {"email": "audit@example.com", "password": "wrong"}, format="json")
+        client.post(reverse("user_login"), {"email": "audit@example.com", "password": "Password1!"}, format="json")
+
+        self.assertFalse(AuthEvent.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(auth_events.flush(), 2)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            list(AuthEvent.objects.order_by("pk").values_list("event", "user_id", "email", "ip")),
+            [
+                ("login_failed", None, "audit@example.com", "127.0.0.1"),
+                ("login", self.user.pk, "audit@example.com", "127.0.0.1"),
+            ],
+        )
+
+    def test_ring_buffer_drops_oldest_and_requeues_on_failure(self):
+        sink = mock.Mock()
+        log = AuthEventLog(sink, capacity=3, flush_interval=60, batch_size=100)
+
+        for i in range(5):
+            log.record("login_failed", email=f"user{i}@example.com")
+
+        self.assertEqual((len(log), log.dropped), (3, 2))
+
+        sink.write.side_effect = RuntimeError("db down")
+        with self.assertLogs("accounts.events", "ERROR"):
+            self.assertEqual(log.flush(), 0)
+        self.assertEqual(len(log), 3)
+
+        sink.write.side_effect = None
+        log.flush()
+        self.assertEqual(
+            [record[2] for record in sink.write.call_args[0][0]], [f"user{i}@example.com" for i in (2, 3, 4)]
+        )
+
+    def test_broken_sink_does_not_fail_login(self):
+        with (
+            mock.patch.object(auth_events, "batch_size", 1),
+            mock.patch.object(auth_events.sink, "write", side_effect=RuntimeError("db down")),
+            self.assertLogs("accounts.events", "ERROR"),
+        ):
+            response = APIClient().post(
+                reverse("user_login"), {"email": "audit@example.com", "password": "Password1!"}, format="json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([record[0] for record in auth_events._buffer], ["login"])
+
+    def test_jsonl_segments_and_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            log = AuthEventLog(JsonlSegmentSink(directory, max_bytes=200), flush_interval=60, batch_size=1)
+
+            log.record("register", user=self.user)
+            log.record("activate", user=self.user)
+            log.record("login_failed", email="other@example.com")
+
+            self.assertEqual(len(log.sink.segments()), 2)
+            events = list(log.query(user_id=self.user.pk))
+            self.assertEqual([event["event"] for event in events], ["register", "activate"])
+
+        AuthEvent.objects.create(
+            event="login", user_id=self.user.pk, email="audit@example.com", created_at=timezone.now()
+        )
+        AuthEvent.objects.create(
+            event="login",
+            user_id=self.user.pk,
+            email="audit@example.com",
+            created_at=timezone.now() - timedelta(days=2),
+        )
+
+        out = io.StringIO()
+        management.call_command("auth_events", "--event", "login", "--since", "1d", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 1)
+        self.assertEqual(json.loads(out.getvalue())["email"], "audit@example.com")
+
+
+class RateLimitTest(TestCase):
+
+    def setUp(self):
+        rate_limit_store.clear()
+        self.client = APIClient(REMOTE_ADDR="10.0.0.1")
+        self.user = CustomUser.objects.create_user(
+            email="limited@example.com", password="Password1!", is_active=True, email_is_verified=True
+        )
+
+    def test_token_bucket_refills_over_time(self):
+        store = LocalBucketStore()
+        capacity, refill_rate = parse_rate("2/min")
+
+        with mock.patch("accounts.throttling.time.monotonic", return_value=1000.0):
+            self.assertEqual(store.consume("k", capacity, refill_rate), (True, 0.0))
+            self.assertEqual(store.consume("k", capacity, refill_rate), (True, 0.0))
+            self.assertEqual(store.consume("k", capacity, refill_rate), (False, 30.0))
+
+        # 30초가 지나면 한 개가 다시 채워진다.
+        with mock.patch("accounts.throttling.time.monotonic", return_value=1030.0):
+            self.assertTrue(store.consume("k", capacity, refill_rate)[0])
+            self.assertFalse(store.consume("k", capacity, refill_rate)[0])
+
+    @override_settings(RATE_LIMIT={"RATES": {"login_ip": "100/min", "login_email": "3/min"}})
+    def test_login_is_limited_per_email_with_retry_after(self):
+        # 비밀번호 해시 시간에 따라 Retry-After 가 달라지지 않도록 시각을 고정한다.
+        with mock.patch("accounts.throttling.time.monotonic", return_value=1000.0):
+            for _ in range(3):
+                response = self.client.post(
+                    reverse("user_login"), {"email": "limited@example.com", "password": "wrong"}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+
+            # 대소문자만 다른 이메일도 같은 bucket 이다.
+            response = self.client.post(
+                reverse("user_login"), {"email": "Limited@Example.com", "password": "Password1!"}, format="json"
+            )
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response["Retry-After"], "20")
+
+        response = self.client.post(
+            reverse("user_login"), {"email": "other@example.com", "password": "wrong"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_login_with_non_dict_body_is_rejected_by_the_view(self):
+        response = self.client.post(reverse("user_login"), ["limited@example.com"], format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ROOT_URLCONF="accounts.tests")
+    async def test_async_login_with_non_dict_body_is_rejected_by_the_view(self):
+        client = AsyncClient(REMOTE_ADDR="10.0.0.3")
+
+        response = await client.post("/account/login/", "[1]", content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ROOT_URLCONF="accounts.tests", RATE_LIMIT={"RATES": {"register_ip": "1/hour"}})
+    async def test_async_register_is_limited_per_ip(self):
+        client = AsyncClient(REMOTE_ADDR="10.0.0.2")
+        data = {"username": "new", "email": "ip1@example.com", "password": "Password1!", "password2": "Password1!"}
+
+        response = await client.post("/account/register/", json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+        data["email"] = "ip2@example.com"
+        response = await client.post("/account/register/", json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "3600")
+        self.assertFalse(await CustomUser.objects.filter(email="ip2@example.com").aexists())
+
+
+class HealthCheckMiddlewareTest(TestCase):
+
+    async def test_runs_async_without_adapting(self):
+        async def get_response(request):
+            return HttpResponse("view")
+
+        middleware = HealthCheckMiddleware(get_response)
+
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertEqual((await middleware(AsyncRequestFactory().get("/health"))).content, b"ok")
+        self.assertEqual((await middleware(AsyncRequestFactory().get("/account/profile/"))).content, b"view")
+
+    def test_runs_sync(self):
+        middleware = HealthCheckMiddleware(lambda request: HttpResponse("view"))
+
+        self.assertFalse(iscoroutinefunction(middleware))
+        self.assertEqual(middleware(RequestFactory().get("/health")).content, b"ok")
+
+
+class SessionActivityTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="activity@example.com",
+            password="Password1!",
+            is_active=True,
+            email_is_verified=True,
+        )
+        self.client.force_login(self.user)
+
+    def session_writes(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("user_profile"))
+
+        self.assertEqual(response.status_code, 200)
+
+        return [
+            query["sql"] for query in queries.captured_queries if query["sql"].startswith('UPDATE "django_session"')
+        ]
+
+    def test_activity_within_granularity_does_not_write_session(self):
+        self.session_writes()
+
+        self.assertEqual(self.session_writes(), [])
+
+    @override_settings(SESSION_ACTIVITY_GRANULARITY=0)
+    def test_activity_past_granularity_writes_session(self):
+        self.session_writes()
+        time.sleep(0.01)
+
+        self.assertEqual(len(self.session_writes()), 1)
+
+    @override_settings(ROOT_URLCONF="accounts.tests")
+    async def test_async_activity_is_recorded_in_cache(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+
+        response = await client.get("/account/profile/")
+
+        self.assertEqual(response.status_code, 200)
+        session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertIsNotNone(await cache.aget(SessionActivityMiddleware.cache_prefix + session_key))
+
+    @override_settings(DEBUG=True)
+    def test_asgi_middleware_chain_is_not_adapted(self):
+        # sync 전용 미들웨어가 있으면 Django 가 (DEBUG 일 때) "Synchronous handler adapted ..." 를 남기고 스레드로 감싼다.
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+
+class TieredSessionTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="session@example.com",
+            password="Password1!",
+            is_active=True,
+            email_is_verified=True,
+        )
+        self.client.force_login(self.user)
+
+    def test_session_is_read_without_db_query(self):
+        self.client.get(reverse("user_profile"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("user_profile"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any("django_session" in query["sql"] for query in queries.captured_queries))
+
+    def test_cold_local_cache_loads_from_backend(self):
+        session_key = self.client.session.session_key
+        local_session_cache.clear()
+
+        response = self.client.get(reverse("user_profile"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(local_session_cache.get(session_key))
+
+    async def test_cold_local_cache_aload(self):
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        local_session_cache.clear()
+
+        store = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+
+        self.assertEqual(await store.aget("_auth_user_id"), str(self.user.pk))
+        self.assertIsNotNone(local_session_cache.get(session_key))
+
+    def test_logout_evicts_local_session(self):
+        session_key = self.client.session.session_key
+        self.client.get(reverse("user_profile"))
+
+        self.client.post(reverse("user_logout"))
+
+        self.assertIsNone(local_session_cache.get(session_key))
+        self.assertEqual(self.client.get(reverse("user_profile")).status_code, 403)
+
+
+class UserCacheTest(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            email="cache@example.com",
+            password="Password1!",
+            is_active=True,
+            email_is_verified=True,
+        )
+        self.client.force_login(self.user)
+
+    def user_selects(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("user_profile"))
+
+        self.assertEqual(response.status_code, 200)
+
+        return [query for query in queries.captured_queries if CustomUser._meta.db_table in query["sql"]]
+
+    def test_request_user_is_served_from_cache(self):
+        self.user_selects()
+        hits = user_cache.hits
+
+        self.assertEqual(self.user_selects(), [])
+        self.assertEqual(user_cache.hits, hits + 1)
+
+    def test_save_invalidates_cached_user(self):
+        self.user_selects()
+
+        self.user.username = "renamed"
+        self.user.save()
+
+        self.assertEqual(len(self.user_selects()), 1)
+        self.assertEqual(self.client.get(reverse("user_profile")).data["username"], "renamed")
+
+    def test_password_hash_is_not_cached(self):
+        self.user_selects()
+
+        _, (fields, session_auth_hash) = cache.get(user_cache.data_key(self.user.pk))
+        self.assertNotIn("password", fields)
+        self.assertEqual(session_auth_hash, self.user.get_session_auth_hash())
+
+        user = EmailBackend().get_user(self.user.pk)
+        self.assertEqual(user.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+        # 비밀번호를 확인할 때만 DB 에서 읽는다.
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password("Password1!"))
+
+    async def test_async_password_check_on_cached_user(self):
+        await EmailBackend().aget_user(self.user.pk)
+        user = await EmailBackend().aget_user(self.user.pk)
+
+        self.assertIn("password", user.get_deferred_fields())
+        self.assertTrue(await hashing.acheck_password(user, "Password1!"))
+
+
+class MailOutboxTest(TestCase):
+
+    def test_register_enqueues_mail_and_worker_sends_it(self):
+        response = APIClient().post(
+            reverse("user_register"),
+            {
+                "username": "outbox",
+                "email": "outbox@example.com",
+                "password": "Password1!",
+                "password2": "Password1!",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+
+        worker = MailOutboxWorker()
+        self.assertEqual(worker.drain(), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["outbox@example.com"])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.StatusChoices.SENT)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        outbound = enqueue_mail("subject", "message", "from@example.com", ["to@example.com"])
+        worker = MailOutboxWorker(max_attempts=2)
+
+        with mock.patch.object(MailOutboxWorker, "send", side_effect=OSError("smtp down")):
+            self.assertEqual(worker.drain(), 0)
+
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.StatusChoices.PENDING)
+        self.assertEqual(outbound.attempts, 1)
+        self.assertGreater(outbound.next_attempt_at, timezone.now())
+        self.assertEqual(outbound.last_error, "smtp down")
+
+    def test_sends_outside_the_claim_transaction(self):
+        outbound = enqueue_mail("subject", "message", "from@example.com", ["to@example.com"])
+        worker = MailOutboxWorker(lease=300)
+        depth = len(connection.savepoint_ids)
+        seen = {}
+
+        def send(outbound):
+            claimed = OutboundEmail.objects.get(pk=outbound.pk)
+            seen.update(
+                depth=len(connection.savepoint_ids),
+                attempts=claimed.attempts,
+                leased_until=claimed.next_attempt_at,
+                reclaimed=worker.claim(timezone.now()),
+            )
+
+        with mock.patch.object(MailOutboxWorker, "send", side_effect=send):
+            self.assertEqual(worker.drain(), 1)
+
+        # 발송 중에는 claim 트랜잭션이 이미 끝났고, 행은 lease 로 다른 워커에게서 가려져 있다.
+        self.assertEqual(seen["depth"], depth)
+        self.assertEqual(seen["attempts"], 1)
+        self.assertGreater(seen["leased_until"], timezone.now() + timedelta(seconds=200))
+        self.assertEqual(seen["reclaimed"], [])
+
+        outbound.refresh_from_db()
+        self.assertEqual(outbound.status, OutboundEmail.StatusChoices.SENT)
+
+    def test_crash_after_send_keeps_earlier_rows_sent(self):
+        first = enqueue_mail("first", "message", "from@example.com", ["a@example.com"])
+        second = enqueue_mail("second", "message", "from@example.com", ["b@example.com"])
+        worker = MailOutboxWorker()
+
+        with (
+            mock.patch.object(MailOutboxWorker, "send", side_effect=[None, KeyboardInterrupt()]),
+            self.assertRaises(KeyboardInterrupt),
+        ):
+            worker.drain()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        # 이미 보낸 메일은 sent 로 남아 다시 보내지 않고, 보내지 못한 메일은 lease 가 끝나면 다시 보낸다.
+        self.assertEqual(first.status, OutboundEmail.StatusChoices.SENT)
+        self.assertEqual(second.status, OutboundEmail.StatusChoices.PENDING)
+        self.assertGreater(second.next_attempt_at, timezone.now())
+
+
+class AnnouncementMailerTest(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            CustomUser.objects.create_user(
+                email=f"announce{i}@example.com",
+                password=None,
+                username=f"announce{i}",
+                email_is_verified=i != 0,
+            )
+
+    def test_sends_to_verified_users_and_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "announcement.json")
+            mailer = AnnouncementMailer(
+                subject="Hi {{ username }}",
+                body="Hello {{ username }}",
+                parallelism=2,
+                chunk_size=2,
+                checkpoint_path=checkpoint_path,
+            )
+
+            result = mailer.run()
+
+            self.assertEqual(result["sent"], 4)
+            self.assertEqual(
+                sorted(message.subject for message in mail.outbox), [f"Hi announce{i}" for i in range(1, 5)]
+            )
+
+            mail.outbox.clear()
+            self.assertEqual(mailer.run(resume=True)["sent"], 4)
+            self.assertEqual(mail.outbox, [])
+
+    def test_resume_retries_failed_recipients(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoint_path = os.path.join(tmp_dir, "announcement.json")
+            mailer = AnnouncementMailer(
+                subject="Hi {{ username }}", body="Hello", parallelism=2, chunk_size=2, checkpoint_path=checkpoint_path
+            )
+            failing = CustomUser.objects.get(email="announce2@example.com")
+
+            with mock.patch.object(
+                AnnouncementMailer, "send", autospec=True, side_effect=lambda _, message: message.to != [failing.email]
+            ):
+                result = mailer.run()
+
+            self.assertEqual((result["sent"], result["failed"], result["failed_ids"]), (3, 1, [failing.pk]))
+
+            result = mailer.run(resume=True)
+
+            self.assertEqual((result["sent"], result["failed"], result["failed_ids"]), (4, 0, []))
+            self.assertEqual([message.to for message in mail.outbox], [[failing.email]])
+
+
+class EmailTokenTest(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="token@example.com", password="Password1!")
+
+    def activate(self, token):
+        return APIClient().get(reverse("activate_user"), {"code": token})
+
+    def test_activation_token_is_single_use(self):
+        token = email_token_generator.make_token(self.user, "activate")
+
+        self.assertEqual(self.activate(token).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+
+        self.assertEqual(self.activate(token).status_code, 400)
+
+    def test_rejects_expired_wrong_purpose_and_changed_email(self):
+        expired = email_token_generator.make_token(self.user, "activate", timestamp=time.time() - 3600)
+        verify_token = email_token_generator.make_token(self.user, "verify")
+        old_email_token = email_token_generator.make_token(self.user, "activate")
+
+        self.user.email = "token-changed@example.com"
+        self.user.save()
+
+        self.assertEqual(self.activate(expired).data, {"error": "expired time"})
+        self.assertEqual(self.activate(verify_token).status_code, 400)
+        self.assertEqual(self.activate(old_email_token).status_code, 400)
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_GET(self):
+        FakeProviderHandler.connections.add(self.client_address)
+
+        if self.path == "/slow":
+            time.sleep(0.5)
+
+        body = b'{"id": 1}'
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        except BrokenPipeError:
+            # 클라이언트가 timeout 으로 먼저 연결을 끊은 경우
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ProviderHTTPClientTest(TestCase):
+
+    def setUp(self):
+        FakeProviderHandler.connections = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeProviderHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.client = ProviderHTTPClient("fake", read_timeout=0.2, retries=0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_connection_and_records_latency(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(f"{self.base_url}/me").json(), {"id": 1})
+
+        self.assertEqual(len(FakeProviderHandler.connections), 1)
+        self.assertEqual(self.client.stats.snapshot()["count"], 3)
+
+    def test_read_timeout_is_enforced(self):
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.client.get(f"{self.base_url}/slow")
+
+        self.assertEqual(self.client.stats.snapshot()["errors"], 1)
+
+
+class AsyncSocialCallbackTest(TestCase):
+
+    def setUp(self):
+        self.provider = FakeProvider(latency=0)
+        self.provider.start()
+        base_url = f"http://127.0.0.1:{self.provider.port}"
+
+        self.config = mock.patch.dict(
+            "accounts.views.KAKAO_CONFIG",
+            {"TOKEN_URI": f"{base_url}/token", "PROFILE_URI": f"{base_url}/me"},
+        )
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.provider.stop()
+
+    async def test_async_kakao_callback_registers_and_logs_in(self):
+        client = AsyncProviderHTTPClient("kakao")
+        request = AsyncRequestFactory().get("/account/kakao/login/callback/", {"code": "abc"})
+        request.session = SessionStore()
+
+        async def anonymous():
+            return AnonymousUser()
+
+        request.auser = anonymous
+
+        try:
+            with mock.patch("accounts.services.get_async_provider_client", return_value=client):
+                response = await AsyncKakaoLoginCallback.as_view()(request)
+
+        finally:
+            await client.aclose()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["email"], "load@example.com")
+
+        user = await CustomUser.objects.aget(email="load@example.com")
+        self.assertEqual(user.social_type, "kakao")
+        self.assertEqual(request.session["_auth_user_id"], str(user.pk))
+        self.assertEqual(client.stats.snapshot()["count"], 2)
+        self.assertTrue(await SocialIdentity.objects.filter(user=user, provider_user_id="1234567890").aexists())
+
+
+class SocialLoginOrRegisterTest(TestCase):
+
+    def login_or_register(self, email, social_type="kakao", provider_user_id=None):
+        request = RequestFactory().get("/account/kakao/login/callback/")
+        request.session = SessionStore()
+        request.user = AnonymousUser()
+        data = {"email": email, "username": "social", "social_type": social_type}
+
+        response = social_login_or_register(
+            request,
+            data=data,
+            email=email,
+            social_type=social_type,
+            response=data,
+            provider_user_id=provider_user_id,
+        )
+        response.session = request.session
+
+        return response
+
+    def user_queries(self, queries):
+        return [q["sql"] for q in queries.captured_queries if "accounts_customuser" in q["sql"]]
+
+    def test_new_user_is_created_with_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login_or_register("social@example.com")
+
+        self.assertEqual(response.status_code, 200)
+
+        sql = self.user_queries(queries)
+        self.assertEqual(sum(q.startswith("SELECT") for q in sql), 1)
+        self.assertEqual(sum(q.startswith("INSERT") for q in sql), 1)
+        self.assertFalse(any(q.startswith("UPDATE") and "password" in q for q in sql))
+
+        user = CustomUser.objects.get(email="social@example.com")
+        self.assertTrue(user.is_active)
+        self.assertTrue(user.email_is_verified)
+        self.assertFalse(user.has_usable_password())
+
+    def test_existing_user_is_read_once(self):
+        CustomUser.objects.create_social_user("social@example.com", "social", "kakao")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login_or_register("social@example.com")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len([q for q in self.user_queries(queries) if q.startswith("SELECT")]), 1)
+
+    def test_concurrent_insert_rereads_user(self):
+        first = CustomUser.objects.create_social_user("race@example.com", "social", "kakao")
+        second = CustomUser.objects.create_social_user("race@example.com", "social", "kakao")
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(CustomUser.objects.filter(email="race@example.com").count(), 1)
+
+    def test_email_taken_by_other_social_type(self):
+        CustomUser.objects.create_social_user("taken@example.com", "social", "google")
+
+        response = self.login_or_register("taken@example.com", social_type="kakao")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"message": ["Email already taken!"]})
+
+    def test_existing_user_is_linked_on_first_login(self):
+        user = CustomUser.objects.create_social_user("legacy@example.com", "social", "kakao")
+
+        self.login_or_register("legacy@example.com", provider_user_id="42")
+
+        identity = SocialIdentity.objects.get(social_type="kakao", provider_user_id="42")
+        self.assertEqual(identity.user_id, user.pk)
+
+    def test_linked_user_is_found_without_email(self):
+        user = CustomUser.objects.create_social_user("linked@example.com", "social", "kakao")
+        SocialIdentity.objects.link(user, "kakao", "42")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login_or_register(None, provider_user_id="42")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.session["_auth_user_id"], str(user.pk))
+        self.assertEqual(len([q for q in self.user_queries(queries) if q.startswith("SELECT")]), 1)
+
+
+# AsyncAccountAPITest 에서 ROOT_URLCONF 로 사용 (ASYNC_ACCOUNTS_API=True 일 때의 라우팅)
+urlpatterns = [
+    path("account/profile/", views.auser_profile),
+    path("account/register/", views.auser_register),
+    path("account/login/", views.auser_login),
+    path("account/logout/", views.auser_logout),
+    path("account/change-email/", views.auser_change_email),
+    path("account/reset-password/", views.areset_password),
+]
+
+
+@override_settings(ROOT_URLCONF="accounts.tests")
+class AsyncAccountAPITest(TestCase):
+
+    def setUp(self):
+        self.client = AsyncClient()
+        self.password = "Password1!"
+        self.user = CustomUser.objects.create_user(
+            email="async@example.com",
+            password=self.password,
+            username="async",
+            is_active=True,
+            email_is_verified=True,
+        )
+
+    async def post(self, url, data):
+        return await self.client.post(url, json.dumps(data), content_type="application/json")
+
+    async def test_register_queues_activation_mail(self):
+        response = await self.post(
+            "/account/register/",
+            {"username": "new", "email": "new@example.com", "password": "Password1!", "password2": "Password1!"},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)["email"], "new@example.com")
+
+        user = await CustomUser.objects.aget(email="new@example.com")
+        self.assertTrue(user.check_password("Password1!"))
+        self.assertTrue(await OutboundEmail.objects.filter(recipients=["new@example.com"]).aexists())
+
+        response = await self.post(
+            "/account/register/",
+            {"username": "new", "email": "new@example.com", "password": "Password1!", "password2": "Password1!"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"message": ["Email already taken!"]})
+
+    async def test_login_profile_logout(self):
+        response = await self.post("/account/login/", {"email": "async@example.com", "password": "wrong"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"message": ["Invalid password"]})
+
+        response = await self.post("/account/login/", {"email": "async@example.com", "password": self.password})
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.client.get("/account/profile/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["email"], "async@example.com")
+
+        # 이미 로그인한 상태에서는 IsLoggedIn 에 걸린다.
+        response = await self.post("/account/login/", {"email": "async@example.com", "password": self.password})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content)["detail"], "Your account is logged in.")
+
+        response = await self.post("/account/logout/", {})
+        self.assertEqual(response.status_code, 200)
+
+        response = await self.client.get("/account/profile/")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content)["detail"], str(NotAuthenticated.default_detail))
+
+    async def test_reset_password(self):
+        await self.client.aforce_login(self.user)
+
+        response = await self.post(
+            "/account/reset-password/",
+            {"old_password": self.password, "password": "NewPassword2@", "password2": "NewPassword2@"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        await self.user.arefresh_from_db()
+        self.assertTrue(self.user.check_password("NewPassword2@"))
+
+        # 현재 세션은 유지된다.
+        response = await self.client.get("/account/profile/")
+        self.assertEqual(response.status_code, 200)
+
+    async def test_change_email(self):
+        await self.client.aforce_login(self.user)
+
+        response = await self.post(
+            "/account/change-email/", {"old_email": "async@example.com", "new_email": "changed@example.com"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        await self.user.arefresh_from_db()
+        self.assertEqual(self.user.email, "changed@example.com")
+        self.assertFalse(self.user.email_is_verified)
+        self.assertTrue(await OutboundEmail.objects.filter(recipients=["changed@example.com"]).aexists())
+
+    async def test_method_and_body_errors(self):
+        response = await self.client.get("/account/login/")
+        self.assertEqual(response.status_code, 405)
+
+        response = await self.client.post("/account/login/", "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JSON parse error", json.loads(response.content)["detail"])
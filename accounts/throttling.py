@@ -0,0 +1,238 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.throttling import BaseThrottle
+
+from .manager import CustomUserManager
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    "5/min" -> (용량 5, 초당 5/60 개 충전). DRF 의 rate 문자열과 같은 형식 (s, m, h, d 로 시작하는 단위)
+    """
+    count, period = rate.split("/")
+    count = int(count)
+
+    return count, count / PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """
+    프로세스 안에서만 쓰는 token bucket 저장소 (테스트, Redis 가 없는 로컬 환경용)
+
+    max_entries 를 넘으면 가장 오래 쓰지 않은 bucket 부터 버린다. (버려진 bucket 은 가득 찬 상태로 다시 시작)
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_rate
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+
+        return wait == 0.0, wait
+
+    async def aconsume(self, key, capacity, refill_rate):
+        return self.consume(key, capacity, refill_rate)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+# KEYS[1] = bucket, ARGV = 용량, 초당 충전량. 한 번의 왕복으로 충전 + 차감 + 만료 설정을 원자적으로 한다.
+# 시각은 Redis 서버의 TIME 을 써서 앱 서버들 사이의 시계 차이와 상관없게 한다.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """
+    Redis(REDIS_URL) 에 token bucket 을 두는 저장소. 모든 워커/서버가 같은 bucket 을 본다.
+
+    bucket 하나는 hash 하나(tokens, ts)이고, 가득 찰 때까지 걸리는 시간 뒤에 만료된다.
+    """
+
+    def __init__(self, url, prefix="ratelimit"):
+        self.url = url
+        self.prefix = prefix
+        self._script = None
+
+    def get_script(self):
+        if self._script is None:
+            # Django RedisCache 와 같이 redis 패키지는 실제로 쓸 때 import 한다.
+            import redis
+
+            client = redis.Redis.from_url(self.url)
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+        return self._script
+
+    def consume(self, key, capacity, refill_rate):
+        wait = float(self.get_script()(keys=[f"{self.prefix}:{key}"], args=[capacity, refill_rate]))
+
+        return wait == 0.0, wait
+
+    async def aconsume(self, key, capacity, refill_rate):
+        return await sync_to_async(self.consume)(key, capacity, refill_rate)
+
+
+def _store_from_settings():
+    store = getattr(settings, "RATE_LIMIT", {}).get("STORE", "auto")
+    redis_url = getattr(settings, "REDIS_URL", None)
+
+    if store == "auto":
+        store = "redis" if redis_url else "local"
+
+    if store == "redis":
+        if not redis_url:
+            raise ImproperlyConfigured("RATE_LIMIT store 'redis' requires REDIS_URL")
+
+        return RedisBucketStore(redis_url)
+
+    if store == "local":
+        return LocalBucketStore()
+
+    raise ImproperlyConfigured(f"Unknown RATE_LIMIT store {store!r}")
+
+
+rate_limit_store = _store_from_settings()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    token bucket 기반 DRF throttle
+
+    - scope 의 rate("5/min") 만큼 연속으로 허용하고, 그 뒤로는 rate 에 맞춰 한 개씩 다시 채워진다.
+      (고정 구간이 아니라 마지막 요청 이후 흐른 시간만큼 채워지므로 구간 경계에서 두 배가 몰리지 않는다)
+    - 검사는 bucket 하나를 읽고 쓰는 O(1) 이고, Redis 에서는 스크립트 한 번의 왕복이다.
+    - 거절하면 다음 토큰이 생길 때까지의 시간을 wait() 로 알려주고, DRF 가 Retry-After 헤더로 보낸다.
+
+    하위 클래스는 scope 와 get_ident_key() 를 정한다.
+    """
+
+    scope = None
+
+    def __init__(self):
+        rates = getattr(settings, "RATE_LIMIT", {}).get("RATES", {})
+        rate = rates.get(self.scope)
+        self.capacity, self.refill_rate = parse_rate(rate) if rate else (None, None)
+        self._wait = None
+
+    def get_ident_key(self, request):
+        """
+        bucket 을 나눌 값. None 이면 이 throttle 을 적용하지 않는다.
+        """
+        raise NotImplementedError
+
+    def get_cache_key(self, request):
+        ident = self.get_ident_key(request)
+        if self.capacity is None or ident is None:
+            return None
+
+        # 이메일 같은 값을 그대로 키에 남기지 않는다.
+        digest = hashlib.blake2b(str(ident).encode(), digest_size=12).hexdigest()
+        return f"{self.scope}:{digest}"
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request)
+        if key is None:
+            return True
+
+        allowed, self._wait = rate_limit_store.consume(key, self.capacity, self.refill_rate)
+        return allowed
+
+    async def aallow_request(self, request, view):
+        key = self.get_cache_key(request)
+        if key is None:
+            return True
+
+        allowed, self._wait = await rate_limit_store.aconsume(key, self.capacity, self.refill_rate)
+        return allowed
+
+    def wait(self):
+        # Retry-After 는 정수 초이므로 올림해서 그 시각에는 반드시 허용되게 한다.
+        return math.ceil(self._wait) if self._wait else None
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_ident_key(self, request):
+        # NUM_PROXIES 설정에 따라 X-Forwarded-For 를 고려한다. (DRF BaseThrottle.get_ident)
+        return self.get_ident(request)
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = "login_ip"
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    scope = "login_email"
+
+    def get_ident_key(self, request):
+        # 본문 검증은 view 가 하므로 dict 가 아닌 본문이나 이메일이 없는 요청은 IP 로 센다.
+        email = request.data.get("email") if isinstance(request.data, dict) else None
+        if not isinstance(email, str) or not email:
+            return f"ip:{self.get_ident(request)}"
+
+        return f"email:{CustomUserManager.canonical_email(email)}"
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = "register_ip"
+
+
+class MailResendIPThrottle(IPThrottle):
+    scope = "mail_resend_ip"
+
+
+class MailResendUserThrottle(TokenBucketThrottle):
+    scope = "mail_resend_user"
+
+    def get_ident_key(self, request):
+        return request.user.pk if request.user.is_authenticated else None
@@ -1,10 +1,105 @@
-# from django.contrib.auth.tokens import PasswordResetTokenGenerator
-#
-#
-# class TokenGenerator(PasswordResetTokenGenerator):
-#     def _make_hash_value(self, user, timestamp):
-#         return str(user.pk) + str(timestamp) + str(user.email_is_verified)
-#
-#
-# account_activation_token = TokenGenerator()
-# account_verification_token = TokenGenerator()
+import base64
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signing import BadSignature, SignatureExpired
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+from .models import CustomUser
+
+
+class ConsumedTokenStore:
+    """
+    이미 사용한 토큰을 만료 시간 동안만 기억하는 저장소 (공유 cache 사용)
+    cache.add 는 원자적이므로 같은 토큰을 동시에 두 번 써도 한 번만 성공한다.
+    """
+
+    prefix = "consumed-token:"
+
+    def consume(self, token_id, timeout):
+        return cache.add(self.prefix + token_id, 1, timeout)
+
+
+class EmailTokenGenerator:
+    """
+    이메일 인증/계정 활성화 링크용 토큰
+
+    형식: <user id(36진수)>.<purpose>.<발급 시각(36진수)>.<MAC>
+    - user id, purpose, 발급 시각과 현재 이메일을 HMAC 한 번으로 서명한다.
+    - 사용자는 pk 로 조회하고, 이메일이 바뀌면 이전 토큰은 MAC 이 맞지 않는다.
+    - 사용한 토큰은 ConsumedTokenStore 에 기록해서 재사용을 막는다.
+    """
+
+    key_salt = "accounts.tokens.EmailTokenGenerator"
+    purposes = {"activate": "a", "verify": "v"}
+    mac_bytes = 16
+
+    def __init__(self, max_age=None, consumed_store=None):
+        self.max_age = max_age or getattr(settings, "EMAIL_TOKEN_MAX_AGE", 60 * 3)
+        self.consumed_store = consumed_store or ConsumedTokenStore()
+
+    def mac(self, user_id, purpose_code, timestamp, email):
+        value = f"{user_id}:{purpose_code}:{timestamp}:{email}"
+        digest = salted_hmac(self.key_salt, value, algorithm="sha256").digest()[: self.mac_bytes]
+
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def make_token(self, user, purpose, timestamp=None):
+        purpose_code = self.purposes[purpose]
+        timestamp = int(time.time() if timestamp is None else timestamp)
+
+        return ".".join(
+            (
+                int_to_base36(user.pk),
+                purpose_code,
+                int_to_base36(timestamp),
+                self.mac(user.pk, purpose_code, timestamp, user.email),
+            )
+        )
+
+    def parse(self, token, purpose):
+        try:
+            user_id, purpose_code, timestamp, mac = token.split(".")
+            user_id = base36_to_int(user_id)
+            timestamp = base36_to_int(timestamp)
+
+        except ValueError:
+            raise BadSignature("Malformed token")
+
+        if purpose_code != self.purposes[purpose]:
+            raise BadSignature("Token purpose does not match")
+
+        return user_id, purpose_code, timestamp, mac
+
+    def verify(self, user, token, purpose):
+        user_id, purpose_code, timestamp, mac = self.parse(token, purpose)
+
+        if user_id != user.pk or not constant_time_compare(mac, self.mac(user_id, purpose_code, timestamp, user.email)):
+            raise BadSignature("Token signature does not match")
+
+        return timestamp
+
+    def check_token(self, token, purpose):
+        user_id, _, timestamp, mac = self.parse(token, purpose)
+
+        age = time.time() - timestamp
+        if age > self.max_age:
+            raise SignatureExpired(f"Token age {age:.0f} > {self.max_age} seconds")
+
+        try:
+            user = CustomUser.objects.get(pk=user_id)
+
+        except CustomUser.DoesNotExist:
+            raise BadSignature("Token signature does not match")
+
+        self.verify(user, token, purpose)
+
+        if not self.consumed_store.consume(mac, self.max_age):
+            raise BadSignature("Token has already been used")
+
+        return user
+
+
+email_token_generator = EmailTokenGenerator()
@@ -1,16 +1,50 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASGI 로 배포할 때는 소셜 로그인 콜백을 async 뷰로 처리한다. (coreapp.asgi 참고)
+if settings.ASYNC_SOCIAL_CALLBACKS:
+    kakao_callback = views.AsyncKakaoLoginCallback.as_view()
+    google_callback = views.AsyncGoogleLoginCallback.as_view()
+    naver_callback = views.AsyncNaverLoginCallback.as_view()
+else:
+    kakao_callback = views.KakaoLoginCallback.as_view()
+    google_callback = views.GoogleLoginCallback.as_view()
+    naver_callback = views.NaverLoginCallback.as_view()
+
+# 계정 API 도 ASGI 에서는 async 뷰로 처리한다.
+if settings.ASYNC_ACCOUNTS_API:
+    account_views = {
+        "profile": views.auser_profile,
+        "register": views.auser_register,
+        "login": views.auser_login,
+        "logout": views.auser_logout,
+        "logout_all": views.auser_logout_all,
+        "change_email": views.auser_change_email,
+        "reset_password": views.areset_password,
+    }
+else:
+    account_views = {
+        "profile": views.user_profile,
+        "register": views.user_register,
+        "login": views.user_login,
+        "logout": views.user_logout,
+        "logout_all": views.user_logout_all,
+        "change_email": views.user_change_email,
+        "reset_password": views.reset_password,
+    }
+
 urlpatterns = [
     # 계정 정보
-    path("profile/", views.user_profile, name="user_profile"),
+    path("profile/", account_views["profile"], name="user_profile"),
     # 일반 회원가입, 로그인, 로그아웃
-    path("register/", views.user_register, name="user_register"),
-    path("login/", views.user_login, name="user_login"),
-    path("logout/", views.user_logout, name="user_logout"),
+    path("register/", account_views["register"], name="user_register"),
+    path("login/", account_views["login"], name="user_login"),
+    path("logout/", account_views["logout"], name="user_logout"),
+    path("logout/all/", account_views["logout_all"], name="user_logout_all"),
     # 이메일 변경, 비밀번호 변경
-    path("change-email/", views.user_change_email, name="user_change_email"),
-    path("reset-password/", views.reset_password, name="reset_password"),
+    path("change-email/", account_views["change_email"], name="user_change_email"),
+    path("reset-password/", account_views["reset_password"], name="reset_password"),
     # 이메일 변경 메일 재전송 path
     path("send/change-email/", views.send_change_email_mail, name="send_change"),
     # 이메일 인증, 이메일 인증 및 계정 활성화
@@ -18,9 +52,11 @@ urlpatterns = [
     path("active/", views.ActivateUser.as_view(), name="activate_user"),
     # 소셜 회원가입, 로그인
     path("kakao/login/", views.KakaoLogin.as_view(), name="kakao_login"),
-    path("kakao/login/callback/", views.KakaoLoginCallback.as_view(), name="kakao_callback"),
+    path("kakao/login/callback/", kakao_callback, name="kakao_callback"),
     path("google/login/", views.GoogleLogin.as_view(), name="google_login"),
-    path("google/login/callback/", views.GoogleLoginCallback.as_view(), name="google_callback"),
+    path("google/login/callback/", google_callback, name="google_callback"),
     path("naver/login/", views.NaverLogin.as_view(), name="naver_login"),
-    path("naver/login/callback/", views.NaverLoginCallback.as_view(), name="naver_callback"),
+    path("naver/login/callback/", naver_callback, name="naver_callback"),
+    # 소셜 provider HTTP 호출 지연 시간 통계 (관리자)
+    path("social/stats/", views.social_http_stats, name="social_http_stats"),
 ]
@@ -1,13 +1,17 @@
-from django.contrib.auth import login, logout
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, alogout, login, logout
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from accounts.models import CustomUser
+from accounts.decorators import async_api_view
+from accounts.events import auth_events
+from accounts.models import CustomUser, UserSession
 from accounts.serializers import (
     UserSerializer,
     UserRegisterSerializer,
@@ -17,11 +21,22 @@ from accounts.serializers import (
 )
 from accounts.mail import EmailService
 from accounts.permissions import IsEmailVerified, IsCommonUser, IsLoggedIn
+from accounts.throttling import (
+    LoginEmailThrottle,
+    LoginIPThrottle,
+    MailResendIPThrottle,
+    MailResendUserThrottle,
+    RegisterIPThrottle,
+)
 from accounts.services import (
+    arevoke_other_sessions,
+    revoke_other_sessions,
     social_login_or_register,
+    provider_stats,
     CommonDecodeSignerUser,
     SocialLogin,
     SocialLoginCallback,
+    AsyncSocialLoginCallback,
 )
 from coreapp.settings.development import KAKAO_CONFIG, GOOGLE_CONFIG, NAVER_CONFIG
 
@@ -44,18 +59,21 @@ def user_profile(request):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     if request.method == "DELETE":
+        # cascade 삭제는 DeletedUserPurger 가 나중에 한다.
         logout(request)
-        user.delete()
+        user.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny, IsLoggedIn])
+@throttle_classes([RegisterIPThrottle])
 def user_register(request):
     serializer = UserRegisterSerializer(data=request.data)
 
     if serializer.is_valid():
         user = serializer.save()
+        auth_events.record("register", request, user)
 
         email_service = EmailService(user, request)
         email_service.send_register_mail()
@@ -73,19 +91,22 @@ def user_register(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny, IsLoggedIn])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def user_login(request):
     serializer = UserLoginSerializer(data=request.data)
 
     if not serializer.is_valid():
+        email = request.data.get("email", "") if isinstance(request.data, dict) else ""
+        auth_events.record("login_failed", request, email=email)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    user = CustomUser.objects.get(email=serializer.data["email"])
+    user = serializer.validated_data["user"]
 
     login(request, user)
 
     data = {
         "success": True,
-        "email": serializer.data["email"],
+        "email": user.email,
         "username": user.username,
     }
 
@@ -104,14 +125,30 @@ def user_logout(request):
     return Response(data, status=status.HTTP_200_OK)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def user_logout_all(request):
+    # 현재 세션을 포함한 모든 기기에서 로그아웃
+    revoked = UserSession.objects.revoke(request.user)
+    logout(request)
+
+    data = {
+        "success": True,
+        "revoked": revoked,
+    }
+
+    return Response(data, status=status.HTTP_200_OK)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsEmailVerified, IsCommonUser])
 def user_change_email(request):
     serializer = UserChangeEmailSerializer(data=request.data, context={"request": request})
 
     if serializer.is_valid():
-        user = CustomUser.objects.get(email=request.user.email)
+        user = CustomUser.objects.filter_by_email(request.user.email).get()
         user = serializer.update(user, serializer.validated_data)
+        revoke_other_sessions(request, user)
 
         email_service = EmailService(user, request)
         email_service.send_change_email_mail()
@@ -135,6 +172,8 @@ def reset_password(request):
         user = request.user
         user = serializer.update(user, serializer.validated_data)
         user.save()
+        revoke_other_sessions(request, user, password_changed=True)
+        auth_events.record("password_reset", request, user)
 
         return Response({"message": "Password reset successfully."}, status=status.HTTP_200_OK)
 
@@ -143,9 +182,10 @@ def reset_password(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsEmailVerified, IsCommonUser])
+@throttle_classes([MailResendIPThrottle, MailResendUserThrottle])
 def send_change_email_mail(request):
     try:
-        user = CustomUser.objects.get(email=request.user.email)
+        user = CustomUser.objects.filter_by_email(request.user.email).get()
         email_service = EmailService(user, request)
         email_service.send_change_email_mail()
 
@@ -159,6 +199,7 @@ def send_change_email_mail(request):
 class VerifyEmail(CommonDecodeSignerUser, APIView):
 
     permission_classes = (AllowAny,)
+    token_purpose = "verify"
 
     def get(self, request):
         return self.decode_signer(request)
@@ -174,6 +215,7 @@ class VerifyEmail(CommonDecodeSignerUser, APIView):
 class ActivateUser(CommonDecodeSignerUser, APIView):
 
     permission_classes = (AllowAny,)
+    token_purpose = "activate"
 
     def get(self, request):
         return self.decode_signer(request)
@@ -182,13 +224,152 @@ class ActivateUser(CommonDecodeSignerUser, APIView):
         self.user.is_active = True
         self.user.email_is_verified = True
         self.user.save()
+        auth_events.record("activate", request, self.user)
 
         return Response({"message": "Account activated successfully."}, status=status.HTTP_200_OK)
 
 
+"""Async Account API (ASGI)"""
+
+
+@async_api_view(["GET", "PUT", "DELETE"], permission_classes=[IsAuthenticated, IsEmailVerified])
+async def auser_profile(request):
+    user = request.user
+
+    if request.method == "GET":
+        serializer = UserSerializer(user)
+        return JsonResponse(serializer.data)
+
+    if request.method == "PUT":
+        # ModelSerializer 의 UniqueValidator 와 save() 는 동기 ORM 이라 스레드에서 실행한다.
+        serializer = UserSerializer(user, data=request.data, partial=True)
+        if await sync_to_async(serializer.is_valid)():
+            await sync_to_async(serializer.save)()
+            return JsonResponse(serializer.data, status=status.HTTP_200_OK)
+        else:
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == "DELETE":
+        await alogout(request)
+        await user.asoft_delete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+@async_api_view(["POST"], permission_classes=[AllowAny, IsLoggedIn], throttle_classes=[RegisterIPThrottle])
+async def auser_register(request):
+    serializer = UserRegisterSerializer(data=request.data)
+
+    if await serializer.ais_valid():
+        user = await serializer.asave()
+        await auth_events.arecord("register", request, user)
+
+        email_service = EmailService(user, request)
+        await email_service.asend_register_mail()
+
+        data = {
+            "success": True,
+            "email": serializer.data["email"],
+            "username": serializer.data["username"],
+        }
+
+        return JsonResponse(data, status=status.HTTP_201_CREATED)
+
+    return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@async_api_view(
+    ["POST"], permission_classes=[AllowAny, IsLoggedIn], throttle_classes=[LoginIPThrottle, LoginEmailThrottle]
+)
+async def auser_login(request):
+    serializer = UserLoginSerializer(data=request.data)
+
+    if not await serializer.ais_valid():
+        email = request.data.get("email", "") if isinstance(request.data, dict) else ""
+        await auth_events.arecord("login_failed", request, email=email)
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    user = serializer.validated_data["user"]
+
+    await alogin(request, user)
+
+    data = {
+        "success": True,
+        "email": user.email,
+        "username": user.username,
+    }
+
+    return JsonResponse(data, status=status.HTTP_200_OK)
+
+
+@async_api_view(["POST"], permission_classes=[IsAuthenticated])
+async def auser_logout(request):
+    await alogout(request)
+
+    data = {
+        "success": True,
+    }
+
+    return JsonResponse(data, status=status.HTTP_200_OK)
+
+
+@async_api_view(["POST"], permission_classes=[IsAuthenticated])
+async def auser_logout_all(request):
+    revoked = await UserSession.objects.arevoke(request.user)
+    await alogout(request)
+
+    data = {
+        "success": True,
+        "revoked": revoked,
+    }
+
+    return JsonResponse(data, status=status.HTTP_200_OK)
+
+
+@async_api_view(["POST"], permission_classes=[IsAuthenticated, IsEmailVerified, IsCommonUser])
+async def auser_change_email(request):
+    serializer = UserChangeEmailSerializer(data=request.data, context={"request": request})
+
+    if await serializer.ais_valid():
+        user = await CustomUser.objects.filter_by_email(request.user.email).aget()
+        user = await serializer.aupdate(user, serializer.validated_data)
+        await arevoke_other_sessions(request, user)
+
+        email_service = EmailService(user, request)
+        await email_service.asend_change_email_mail()
+
+        return JsonResponse(
+            {
+                "success": True,
+                "email": serializer.data["new_email"],
+            }
+        )
+
+    return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@async_api_view(["POST"], permission_classes=[IsAuthenticated, IsEmailVerified, IsCommonUser])
+async def areset_password(request):
+    serializer = UserResetPasswordSerializer(data=request.data, context={"request": request})
+
+    if await serializer.ais_valid():
+        user = await serializer.aupdate(request.user, serializer.validated_data)
+        await arevoke_other_sessions(request, user, password_changed=True)
+        await auth_events.arecord("password_reset", request, user)
+
+        return JsonResponse({"message": "Password reset successfully."}, status=status.HTTP_200_OK)
+
+    return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 """Social Account API"""
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def social_http_stats(request):
+    return Response(provider_stats(), status=status.HTTP_200_OK)
+
+
 # permission_classes = (AllowAny, IsLoggedIn)
 class KakaoLogin(SocialLogin, APIView):
 
@@ -241,6 +422,7 @@ class KakaoLoginCallback(SocialLoginCallback, APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.provider = "kakao"
         self.client_id = KAKAO_CONFIG["REST_API_KEY"]
         self.client_secret = KAKAO_CONFIG["CLIENT_SECRET_KEY"]
 
@@ -256,11 +438,8 @@ class KakaoLoginCallback(SocialLoginCallback, APIView):
         self.code = self.get_code(request)
         user_info_json = self.get_user_info_json()
 
-        kakao_account = user_info_json.get("kakao_account")
-        profile = kakao_account.get("profile")
-
-        email = kakao_account.get("email")
-        username = profile.get("nickname")
+        email, username = self.get_user_fields(user_info_json)
+        provider_user_id = self.get_provider_user_id(user_info_json)
         social_type = "kakao"
 
         data = self.get_user_data(email=email, username=username, social_type=social_type)
@@ -271,8 +450,20 @@ class KakaoLoginCallback(SocialLoginCallback, APIView):
             email=email,
             social_type=social_type,
             response=data,
+            provider_user_id=provider_user_id,
         )
 
+    def get_user_fields(self, user_info_json):
+        kakao_account = user_info_json.get("kakao_account")
+        profile = kakao_account.get("profile")
+
+        return kakao_account.get("email"), profile.get("nickname")
+
+    def get_provider_user_id(self, user_info_json):
+        provider_user_id = user_info_json.get("id")
+
+        return str(provider_user_id) if provider_user_id is not None else None
+
 
 # permission_classes = (AllowAny, IsLoggedIn)
 class GoogleLoginCallback(SocialLoginCallback, APIView):
@@ -281,6 +472,7 @@ class GoogleLoginCallback(SocialLoginCallback, APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.provider = "google"
         self.client_id = GOOGLE_CONFIG["CLIENT_ID"]
         self.client_secret = GOOGLE_CONFIG["CLIENT_SECRET"]
 
@@ -297,8 +489,8 @@ class GoogleLoginCallback(SocialLoginCallback, APIView):
         self.code = self.get_code(request)
         user_info_json = self.get_user_info_json(host=self.host)
 
-        email = user_info_json.get("email")
-        username = user_info_json.get("name")
+        email, username = self.get_user_fields(user_info_json)
+        provider_user_id = self.get_provider_user_id(user_info_json)
         social_type = "google"
 
         data = self.get_user_data(email=email, username=username, social_type=social_type)
@@ -309,8 +501,16 @@ class GoogleLoginCallback(SocialLoginCallback, APIView):
             email=email,
             social_type=social_type,
             response=data,
+            provider_user_id=provider_user_id,
         )
 
+    def get_user_fields(self, user_info_json):
+        return user_info_json.get("email"), user_info_json.get("name")
+
+    def get_provider_user_id(self, user_info_json):
+        # OpenID Connect userinfo(v3) 는 sub, v2 는 id 로 준다.
+        return user_info_json.get("sub") or user_info_json.get("id")
+
 
 # permission_classes = (AllowAny, IsLoggedIn)
 class NaverLoginCallback(SocialLoginCallback, APIView):
@@ -319,6 +519,7 @@ class NaverLoginCallback(SocialLoginCallback, APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.provider = "naver"
         self.client_id = NAVER_CONFIG["CLIENT_ID"]
         self.client_secret = NAVER_CONFIG["CLIENT_SECRET"]
 
@@ -337,9 +538,8 @@ class NaverLoginCallback(SocialLoginCallback, APIView):
 
         user_info_json = self.get_user_info_json(state=self.state)
 
-        naver_response = user_info_json.get("response")
-        email = naver_response.get("email")
-        username = naver_response.get("name")
+        email, username = self.get_user_fields(user_info_json)
+        provider_user_id = self.get_provider_user_id(user_info_json)
         social_type = "naver"
 
         data = self.get_user_data(email=email, username=username, social_type=social_type)
@@ -350,4 +550,28 @@ class NaverLoginCallback(SocialLoginCallback, APIView):
             email=email,
             social_type=social_type,
             response=data,
+            provider_user_id=provider_user_id,
         )
+
+    def get_user_fields(self, user_info_json):
+        naver_response = user_info_json.get("response")
+
+        return naver_response.get("email"), naver_response.get("name")
+
+    def get_provider_user_id(self, user_info_json):
+        return user_info_json.get("response").get("id")
+
+
+"""Async Social Account API (ASGI)"""
+
+
+class AsyncKakaoLoginCallback(AsyncSocialLoginCallback, KakaoLoginCallback):
+    pass
+
+
+class AsyncGoogleLoginCallback(AsyncSocialLoginCallback, GoogleLoginCallback):
+    pass
+
+
+class AsyncNaverLoginCallback(AsyncSocialLoginCallback, NaverLoginCallback):
+    pass
@@ -11,6 +11,16 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coreapp.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coreapp.settings.development")
+# ASGI 에서는 소셜 로그인 콜백과 계정 API 를 async 뷰로 처리한다. (accounts.urls)
+os.environ.setdefault("ASYNC_SOCIAL_CALLBACKS", "True")
+os.environ.setdefault("ASYNC_ACCOUNTS_API", "True")
 
 application = get_asgi_application()
+
+# 서버 프로세스에서는 last_login 과 인증 이벤트를 요청이 없어도 주기적으로 반영한다. (accounts.buffers)
+from accounts.events import auth_events  # noqa: E402
+from accounts.last_login import last_login_buffer  # noqa: E402
+
+last_login_buffer.start()
+auth_events.start()
@@ -0,0 +1,75 @@
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+def replication_lag():
+    """
+    복제 지연(초)을 돌려준다. 복제를 쓰지 않거나 알 수 없으면 None.
+
+    - MySQL: settings.REPLICA_DATABASE_ALIAS 로 지정한 replica 에서 SHOW REPLICA STATUS 의 Seconds_Behind_Source
+    - PostgreSQL: primary 의 pg_stat_replication 에서 가장 늦은 replay_lag
+    """
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", None)
+
+    try:
+        if alias and alias in settings.DATABASES and connections[alias].vendor == "mysql":
+            return _mysql_replica_lag(connections[alias])
+
+        if connections["default"].vendor == "postgresql":
+            return _postgresql_replay_lag(connections["default"])
+
+    except DatabaseError:
+        return None
+
+    return None
+
+
+def _mysql_replica_lag(connection):
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+            key = "Seconds_Behind_Source"
+
+        except DatabaseError:
+            # MySQL 8.0.22 이전
+            cursor.execute("SHOW SLAVE STATUS")
+            key = "Seconds_Behind_Master"
+
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        columns = [column[0] for column in cursor.description]
+
+    lag = dict(zip(columns, row)).get(key)
+    return float(lag) if lag is not None else None
+
+
+def _postgresql_replay_lag(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXTRACT(EPOCH FROM MAX(replay_lag)) FROM pg_stat_replication")
+        row = cursor.fetchone()
+
+    return float(row[0]) if row and row[0] is not None else None
+
+
+def wait_for_replication(max_lag, backoff=1.0, max_backoff=30.0, should_stop=None):
+    """
+    복제 지연이 max_lag 초 이하가 될 때까지 지수 백오프로 기다린다. 기다린 시간(초)을 돌려준다.
+
+    대량 삭제/수정 작업이 chunk 사이에 호출해서 replica 가 따라올 시간을 준다.
+    """
+    waited = 0.0
+
+    while max_lag is not None and not (should_stop and should_stop()):
+        lag = replication_lag()
+        if lag is None or lag <= max_lag:
+            break
+
+        time.sleep(backoff)
+        waited += backoff
+        backoff = min(backoff * 2, max_backoff)
+
+    return waited
@@ -1,11 +1,151 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
 from django.http import HttpResponse
+from django.shortcuts import redirect
+from django_session_timeout.middleware import SESSION_TIMEOUT_KEY
 
 
 class HealthCheckMiddleware:
+    # ASGI 에서 async 뷰까지 스레드를 거치지 않도록 sync / async 모두 지원한다. (django.utils.deprecation.MiddlewareMixin 과 같은 방식)
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
 
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         if request.path == "/health":
             return HttpResponse("ok")
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path == "/health":
+            return HttpResponse("ok")
+        return await self.get_response(request)
+
+
+class SessionActivityMiddleware:
+    """
+    django_session_timeout 의 SessionTimeoutMiddleware 를 대체하는 미들웨어
+
+    - 마지막 활동 시각은 매 요청마다 cache 에만 기록한다.
+    - 세션(django_session)에는 SESSION_ACTIVITY_GRANULARITY 초 이상 움직였을 때만 기록해서
+      요청마다 발생하던 세션 UPDATE 를 없앤다.
+    - 만료 판단은 cache 와 세션 중 더 최근 값을 사용하므로, cache 가 비어도
+      최대 SESSION_ACTIVITY_GRANULARITY 초만큼 일찍 만료될 뿐 늦게 만료되지는 않는다.
+    """
+
+    cache_prefix = "session-activity:"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.expire_seconds = getattr(settings, "SESSION_EXPIRE_SECONDS", settings.SESSION_COOKIE_AGE)
+        self.after_last_activity = getattr(settings, "SESSION_EXPIRE_AFTER_LAST_ACTIVITY", False)
+        self.granularity = getattr(settings, "SESSION_ACTIVITY_GRANULARITY", 60)
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.process_request(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # ASGI 에서는 cache / 세션을 async API 로 다뤄서 요청마다 스레드를 거치지 않는다.
+        response = await self.aprocess_request(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
+
+    def process_request(self, request):
+        session = getattr(request, "session", None)
+        if session is None or session.is_empty():
+            return None
+
+        now = time.time()
+        stored = session.setdefault(SESSION_TIMEOUT_KEY, now)
+
+        if session.session_key is None:
+            return None
+
+        if not self.after_last_activity:
+            return self.expire(request) if now - stored > self.expire_seconds else None
+
+        cache_key = self.cache_prefix + session.session_key
+        last_activity = max(stored, cache.get(cache_key, stored))
+
+        if now - last_activity > self.expire_seconds:
+            cache.delete(cache_key)
+            return self.expire(request)
+
+        cache.set(cache_key, now, self.expire_seconds)
+
+        if now - stored > self.granularity:
+            session[SESSION_TIMEOUT_KEY] = now
+
+        return None
+
+    async def aprocess_request(self, request):
+        session = getattr(request, "session", None)
+        if session is None or session.is_empty():
+            return None
+
+        now = time.time()
+        stored = await session.asetdefault(SESSION_TIMEOUT_KEY, now)
+
+        if session.session_key is None:
+            return None
+
+        if not self.after_last_activity:
+            return await self.aexpire(request) if now - stored > self.expire_seconds else None
+
+        cache_key = self.cache_prefix + session.session_key
+        last_activity = max(stored, await cache.aget(cache_key, stored))
+
+        if now - last_activity > self.expire_seconds:
+            await cache.adelete(cache_key)
+            return await self.aexpire(request)
+
+        await cache.aset(cache_key, now, self.expire_seconds)
+
+        if now - stored > self.granularity:
+            await session.aset(SESSION_TIMEOUT_KEY, now)
+
+        return None
+
+    def expire(self, request):
+        request.session.flush()
+
+        return self.expired_response(request)
+
+    async def aexpire(self, request):
+        await request.session.aflush()
+
+        return self.expired_response(request)
+
+    @staticmethod
+    def expired_response(request):
+        redirect_url = getattr(settings, "SESSION_TIMEOUT_REDIRECT", None)
+
+        if redirect_url:
+            return redirect(redirect_url)
+
+        return redirect_to_login(next=request.path)
@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_count(queryset):
+    """
+    COUNT(*) 없이 DB 통계로 행 수를 추정한다. 추정할 수 없으면 None.
+
+    - 조건이 없으면 테이블 통계 (MySQL information_schema.TABLES.TABLE_ROWS, PostgreSQL pg_class.reltuples)
+    - 조건이 있으면 EXPLAIN 의 예상 행 수
+    """
+    connection = connections[queryset.db]
+
+    if connection.vendor not in ("mysql", "postgresql"):
+        return None
+
+    if not queryset.query.where:
+        return _estimate_table_rows(connection, queryset.model._meta.db_table)
+
+    return _estimate_plan_rows(queryset)
+
+
+def _estimate_table_rows(connection, table):
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        else:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+
+        row = cursor.fetchone()
+
+    # PostgreSQL 은 ANALYZE 전이면 -1 을 돌려준다.
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+def _estimate_plan_rows(queryset):
+    plan = json.loads(queryset.order_by().explain(format="json"))
+
+    # PostgreSQL: [{"Plan": {"Plan Rows": n}}], MySQL: {"query_block": {..., "rows_produced_per_join": n}}
+    if isinstance(plan, list):
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    return _find_key(plan, "rows_produced_per_join")
+
+
+def _find_key(node, key):
+    if isinstance(node, dict):
+        if key in node:
+            return int(node[key])
+        children = node.values()
+
+    elif isinstance(node, list):
+        children = node
+
+    else:
+        return None
+
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    행 수가 threshold 이상이면 COUNT(*) 대신 DB 통계로 추정한 값을 쓰는 Paginator (admin changelist 용)
+
+    추정치가 threshold 보다 작으면 정확한 COUNT(*) 를 한다. 작은 결과에서는 페이지 수가 정확하고,
+    큰 결과에서는 마지막 몇 페이지가 비어 있을 수 있는 대신 전체 스캔을 하지 않는다.
+    """
+
+    def __init__(self, *args, threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold or getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 100_000)
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, "query") else None
+
+        if estimate is None or estimate < self.threshold:
+            return super().count
+
+        return estimate
@@ -0,0 +1,131 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LocalSessionCache:
+    """
+    프로세스 안에서만 쓰는 크기 제한 LRU + TTL 세션 캐시
+
+    - 다른 워커에서 삭제(logout 등)된 세션은 최대 TTL 초 동안만 이 워커에 남는다.
+    - 요청 사이에 세션 dict 를 공유하지 않도록 넣고 꺼낼 때 복사한다.
+    """
+
+    def __init__(self, max_entries=10000, ttl=5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        return copy.deepcopy(data)
+
+    def set(self, key, data, timeout=None):
+        ttl = self.ttl if timeout is None else min(self.ttl, timeout)
+        if ttl <= 0:
+            self.delete(key)
+            return
+
+        entry = (time.monotonic() + ttl, copy.deepcopy(data))
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _local_cache_from_settings():
+    config = getattr(settings, "SESSION_LOCAL_CACHE", {})
+
+    return LocalSessionCache(
+        max_entries=config.get("MAX_ENTRIES", 10000),
+        ttl=config.get("TTL", 5),
+    )
+
+
+local_session_cache = _local_cache_from_settings()
+
+
+class LocalTierMixin:
+    """
+    cache / cached_db SessionStore 앞에 프로세스 로컬 LRU 를 두는 mixin
+    """
+
+    local_cache = local_session_cache
+
+    def load(self):
+        if self._session_key:
+            data = self.local_cache.get(self._session_key)
+            if data is not None:
+                return data
+
+        data = super().load()
+
+        if self._session_key and data:
+            # self._session 이 아직 비어 있으므로 get_expiry_age() 가 다시 load() 하지 않도록 expiry 를 넘긴다.
+            self.local_cache.set(self._session_key, data, self.get_expiry_age(expiry=data.get("_session_expiry")))
+
+        return data
+
+    async def aload(self):
+        if self._session_key:
+            data = self.local_cache.get(self._session_key)
+            if data is not None:
+                return data
+
+        data = await super().aload()
+
+        if self._session_key and data:
+            self.local_cache.set(
+                self._session_key, data, await self.aget_expiry_age(expiry=data.get("_session_expiry"))
+            )
+
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        self.local_cache.set(self.session_key, self._session, self.get_expiry_age())
+
+    async def asave(self, must_create=False):
+        await super().asave(must_create)
+        self.local_cache.set(self.session_key, self._session, await self.aget_expiry_age())
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        super().delete(session_key)
+
+        if session_key:
+            self.local_cache.delete(session_key)
+
+    async def adelete(self, session_key=None):
+        session_key = session_key or self.session_key
+        await super().adelete(session_key)
+
+        if session_key:
+            self.local_cache.delete(session_key)
@@ -0,0 +1,145 @@
+import signal
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.utils import timezone
+
+from coreapp.db import wait_for_replication
+
+# 만료 세션을 지운 뒤 지운 세션 키 목록(session_keys)과 함께 보낸다. (accounts 의 UserSession 색인 정리)
+sessions_swept = Signal()
+
+
+class ExpiredSessionSweeper:
+    """
+    django_session 의 만료 세션을 조금씩 지우는 작업 (manage.py sweep_sessions, clearsessions)
+
+    clearsessions 의 DELETE ... WHERE expire_date < now 한 번은 만료 행이 많으면 테이블을 오래 잠그고
+    복제 지연을 키우므로, expire_date 인덱스 순서로 batch_size 개씩 나눠서 따로 커밋한다.
+
+    - max_rows_per_second 로 초당 삭제 행 수를 제한하고, batch 사이에 sleep 초 쉰다.
+    - 복제 지연이 max_lag 초를 넘으면 줄어들 때까지 지수 백오프로 기다린다.
+    - 진행 상황(지운 행 수, 초당 삭제 수, 대기 시간)은 cache 의 PROGRESS_CACHE_KEY 에 남긴다.
+    """
+
+    PROGRESS_CACHE_KEY = "sessions:sweeper:progress"
+
+    def __init__(self, batch_size=1000, sleep=0.05, max_rows_per_second=None, max_lag=5):
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.max_rows_per_second = max_rows_per_second
+        self.max_lag = max_lag
+
+        self._stopped = False
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        config = {key.lower(): value for key, value in getattr(settings, "SESSION_SWEEPER", {}).items()}
+        config.pop("poll_interval", None)
+        config.update({key: value for key, value in overrides.items() if value is not None})
+
+        return cls(**config)
+
+    @classmethod
+    def progress(cls):
+        return cache.get(cls.PROGRESS_CACHE_KEY)
+
+    def sweep_batch(self, now):
+        """
+        만료 세션을 batch_size 개까지 지운다. (조회한 행 수, 지운 행 수) 를 돌려준다.
+        """
+        session_keys = list(
+            Session.objects.filter(expire_date__lt=now)
+            .order_by("expire_date")
+            .values_list("session_key", flat=True)[: self.batch_size]
+        )
+
+        selected = len(session_keys)
+        if not selected:
+            return 0, 0
+
+        # 조회와 삭제 사이에 다시 저장(연장)된 세션은 지우지 않는다.
+        deleted, _ = Session.objects.filter(session_key__in=session_keys, expire_date__lt=now).delete()
+
+        if deleted:
+            # 실제로 지워진 키만 알린다. 남아 있는 (연장된) 세션의 색인까지 지우면 나중에 revoke 할 수 없다.
+            if deleted < selected:
+                alive = set(Session.objects.filter(session_key__in=session_keys).values_list("session_key", flat=True))
+                session_keys = [key for key in session_keys if key not in alive]
+
+            sessions_swept.send(sender=self.__class__, session_keys=session_keys)
+
+        return selected, deleted
+
+    def throttle(self, deleted, seconds):
+        # 이번 batch 가 max_rows_per_second 에 맞는 시간보다 빨리 끝났으면 그만큼 쉰다.
+        wait = self.sleep
+        if self.max_rows_per_second:
+            wait = max(wait, deleted / self.max_rows_per_second - seconds)
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return max(wait, 0.0)
+
+    def stop(self, *args):
+        self._stopped = True
+
+    def run(self, log=None):
+        now = timezone.now()
+        started_at = time.monotonic()
+        stats = {
+            "started_at": now.isoformat(),
+            "finished": False,
+            "batches": 0,
+            "deleted": 0,
+            "throttle_wait": 0.0,
+            "lag_wait": 0.0,
+            "elapsed": 0.0,
+            "rate": 0.0,
+        }
+
+        while not self._stopped:
+            batch_started_at = time.monotonic()
+            selected, deleted = self.sweep_batch(now)
+
+            # 한 batch 가 모두 연장되어 지운 행이 없어도 뒤에 만료 행이 남아 있을 수 있으므로 조회 결과가 없을 때만 멈춘다.
+            if not selected:
+                break
+
+            stats["batches"] += 1
+            stats["deleted"] += deleted
+
+            stats["throttle_wait"] += self.throttle(deleted, time.monotonic() - batch_started_at)
+            stats["lag_wait"] += wait_for_replication(self.max_lag, should_stop=lambda: self._stopped)
+
+            stats["elapsed"] = time.monotonic() - started_at
+            stats["rate"] = stats["deleted"] / stats["elapsed"]
+            cache.set(self.PROGRESS_CACHE_KEY, stats, None)
+
+            if log is not None:
+                log(stats)
+
+        stats["finished"] = not self._stopped
+        stats["elapsed"] = time.monotonic() - started_at
+        stats["rate"] = stats["deleted"] / stats["elapsed"] if stats["elapsed"] else 0.0
+        cache.set(self.PROGRESS_CACHE_KEY, stats, None)
+
+        return stats
+
+    def run_until_stopped(self, log=None):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        return self.run(log)
+
+    def run_forever(self, poll_interval=60, log=None):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self._stopped:
+            self.run(log)
+            time.sleep(poll_interval)
@@ -0,0 +1,11 @@
+"""
+프로세스 로컬 LRU -> 공유 cache(Redis) 로만 구성된 세션 엔진 (DB 를 사용하지 않음)
+"""
+
+from django.contrib.sessions.backends.cache import SessionStore as CacheStore
+
+from . import LocalTierMixin
+
+
+class SessionStore(LocalTierMixin, CacheStore):
+    pass
@@ -0,0 +1,19 @@
+"""
+프로세스 로컬 LRU -> 공유 cache(Redis) -> DB 순서로 읽는 세션 엔진
+
+DB 는 cache 가 비었을 때를 위한 영구 저장소로만 사용한다.
+"""
+
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+from . import LocalTierMixin
+
+
+class SessionStore(LocalTierMixin, CachedDBStore):
+
+    @classmethod
+    def clear_expired(cls):
+        # clearsessions 도 한 번의 큰 DELETE 대신 batch 로 나눠서 지운다.
+        from .sweeper import ExpiredSessionSweeper
+
+        ExpiredSessionSweeper.from_settings().run()
@@ -35,12 +35,14 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # custom middlewares
     "coreapp.middleware.HealthCheckMiddleware",
-    # third party middlewares
-    "django_session_timeout.middleware.SessionTimeoutMiddleware",
+    "coreapp.middleware.SessionActivityMiddleware",
 ]
 
 ROOT_URLCONF = "coreapp.urls"
 AUTH_USER_MODEL = "accounts.CustomUser"
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.EmailBackend",
+]
 
 TEMPLATES = [
     {
@@ -79,6 +81,30 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+PASSWORD_HASHERS = [
+    "accounts.hashers.CalibratedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# `manage.py calibrate_hashers --write` 로 측정한 PBKDF2 반복 횟수 (없으면 Django 기본값)
+PASSWORD_HASHER_ITERATIONS = int(os.getenv("PASSWORD_HASHER_ITERATIONS", 0)) or None
+
+# 로그인 시 재해시된 비밀번호를 모아서 한 번에 UPDATE 하는 배치 크기
+PASSWORD_REHASH_BATCH_SIZE = 100
+
+# 비밀번호 해시 전용 스레드 풀 (accounts.hashing)
+PASSWORD_HASHING_POOL = {
+    "MAX_WORKERS": int(os.getenv("PASSWORD_HASHING_MAX_WORKERS", os.cpu_count() or 4)),
+    "MAX_QUEUE": int(os.getenv("PASSWORD_HASHING_MAX_QUEUE", 64)),
+    "TIMEOUT": 10,
+}
+
+# 이 행 수 이상이면 admin changelist 가 COUNT(*) 대신 DB 통계로 추정한다. (coreapp.paginators)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [  # 기본적으로 모든 api에 적용 되는 permissionclass
         "rest_framework.permissions.IsAuthenticated",
@@ -103,7 +129,83 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Redis 가 설정되지 않은 환경(로컬, 테스트)에서는 프로세스 로컬 메모리 캐시를 사용
+REDIS_URL = os.getenv("REDIS_URL")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    ),
+}
+
+# 이메일 인증/계정 활성화 링크 유효 시간(초)
+EMAIL_TOKEN_MAX_AGE = 60 * 3
+
+# request.user 조회 캐시 (accounts.cache.UserCache)
+USER_CACHE_TIMEOUT = 300
+USER_CACHE_STATS_FLUSH_EVERY = 100
+
+# last_login 지연 반영 (accounts.last_login.LastLoginBuffer). DB 의 last_login 은 최대 FLUSH_INTERVAL 초 늦다.
+LAST_LOGIN_BUFFER = {
+    "FLUSH_INTERVAL": 5,
+    "MAX_PENDING": 1000,
+    "BATCH_SIZE": 100,
+}
+
+# 인증 이벤트 로그 (accounts.events.AuthEventLog). SINK 는 "db" (AuthEvent 테이블) 또는 "jsonl" (SEGMENT_DIR)
+AUTH_EVENT_LOG = {
+    "SINK": os.getenv("AUTH_EVENT_SINK", "db"),
+    "SEGMENT_DIR": os.getenv("AUTH_EVENT_SEGMENT_DIR", str(BASE_DIR / "auth-events")),
+    "SEGMENT_MAX_BYTES": 64 * 1024 * 1024,
+    "CAPACITY": 10000,
+    "FLUSH_INTERVAL": 2,
+    "BATCH_SIZE": 500,
+}
+
+# token bucket rate limit (accounts.throttling). STORE: "auto" (REDIS_URL 이 있으면 redis, 없으면 local), "redis", "local"
+# RATES 는 연속으로 허용할 요청 수 / 그만큼 다시 채워지는 시간
+RATE_LIMIT = {
+    "STORE": os.getenv("RATE_LIMIT_STORE", "auto"),
+    "RATES": {
+        "login_ip": "30/min",
+        "login_email": "10/min",
+        "register_ip": "20/hour",
+        "mail_resend_ip": "20/hour",
+        "mail_resend_user": "5/hour",
+    },
+}
+
+# 세션: 프로세스 로컬 LRU -> cache -> (선택) DB
+SESSION_DB_FALLBACK = os.getenv("SESSION_DB_FALLBACK", "True") == "True"
+SESSION_ENGINE = "coreapp.sessions.tiered_db" if SESSION_DB_FALLBACK else "coreapp.sessions.tiered"
+# TTL 은 다른 워커에서 로그아웃/삭제된 세션이 이 워커에서 살아있을 수 있는 최대 시간(초)
+SESSION_LOCAL_CACHE = {
+    "MAX_ENTRIES": 10000,
+    "TTL": 5,
+}
+
 SESSION_EXPIRE_SECONDS = 3000
 SESSION_EXPIRE_AFTER_LAST_ACTIVITY = True
 SESSION_TIMEOUT_REDIRECT = "/account/login"
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
+# 마지막 활동 시각을 세션에 기록하는 최소 간격(초), 그 사이에는 cache 에만 기록
+SESSION_ACTIVITY_GRANULARITY = 60
+# 저장소(cache, django_session)의 세션 만료 시각. 기본값(2주) 대신 SessionActivityMiddleware 가 만료시키는 시각 이후로
+# 맞춰서, 비활성으로 끝난 세션이 바로 만료 행이 되어 sweeper 가 지울 수 있게 한다. (활동 시각은 granularity 간격으로 저장됨)
+SESSION_COOKIE_AGE = SESSION_EXPIRE_SECONDS + SESSION_ACTIVITY_GRANULARITY
+
+# 만료 세션 정리 (coreapp.sessions.sweeper.ExpiredSessionSweeper, manage.py sweep_sessions)
+SESSION_SWEEPER = {
+    "BATCH_SIZE": 1000,
+    "SLEEP": 0.05,
+    "MAX_ROWS_PER_SECOND": 5000,
+    "MAX_LAG": 5,
+    "POLL_INTERVAL": 60,
+}
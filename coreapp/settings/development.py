@@ -17,12 +17,69 @@ DATABASES = {
     }
 }
 
+# 복제 지연을 확인할 MySQL replica (coreapp.db.replication_lag). PostgreSQL 은 primary 에서 확인한다.
+if os.getenv("DATABASE_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("DATABASE_REPLICA_HOST"),
+        "PORT": os.getenv("DATABASE_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASE_ALIAS = "replica" if "replica" in DATABASES else None
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+EMAIL_TIMEOUT = 10
+
+# `manage.py send_queued_mail` 워커 설정 (accounts.mail.MailOutboxWorker)
+EMAIL_OUTBOX = {
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "BACKOFF_BASE": 30,
+    "BACKOFF_MAX": 3600,
+    # 가져간 batch 를 다른 워커가 다시 가져가지 않는 시간(초). batch 하나를 보내는 시간보다 길어야 한다.
+    "LEASE": 300,
+    "POLL_INTERVAL": 2,
+}
+
+# 활성화하지 않은 회원 정리 (accounts.purge.InactiveUserPurger)
+ACCOUNT_PURGE = {
+    "INACTIVE_DAYS": 7,
+    "BATCH_SIZE": 500,
+    "SLEEP": 0.5,
+    "MAX_LAG": 5,
+    "MAX_BATCH_SECONDS": 0.5,
+}
+
+# 탈퇴 회원 실제 삭제 (accounts.purge.DeletedUserPurger)
+ACCOUNT_HARD_DELETE = {
+    "GRACE_SECONDS": 0,
+    "BATCH_SIZE": 50,
+    "SLEEP": 0.1,
+    "MAX_LAG": 5,
+    "MAX_BATCH_SECONDS": 0.5,
+    "POLL_INTERVAL": 10,
+}
+
+# 소셜 provider 호출용 HTTP 클라이언트 (accounts.services.ProviderHTTPClient)
+SOCIAL_HTTP_CLIENT = {
+    "POOL_SIZE": 10,
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 5,
+    "RETRIES": 2,
+    "BACKOFF_FACTOR": 0.2,
+    # async 콜백(aiohttp) 의 이벤트 루프당 최대 연결 수
+    "ASYNC_POOL_SIZE": 1000,
+}
+
+# coreapp.asgi 에서 True 로 설정된다.
+ASYNC_SOCIAL_CALLBACKS = os.getenv("ASYNC_SOCIAL_CALLBACKS", "False") == "True"
+ASYNC_ACCOUNTS_API = os.getenv("ASYNC_ACCOUNTS_API", "False") == "True"
 
 KAKAO_CONFIG = {
     # key
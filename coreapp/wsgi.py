@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coreapp.settings")
 
 application = get_wsgi_application()
+
+# 서버 프로세스에서는 last_login 과 인증 이벤트를 요청이 없어도 주기적으로 반영한다. (accounts.buffers)
+from accounts.events import auth_events  # noqa: E402
+from accounts.last_login import last_login_buffer  # noqa: E402
+
+last_login_buffer.start()
+auth_events.start()